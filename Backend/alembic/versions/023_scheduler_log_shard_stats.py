@@ -0,0 +1,22 @@
+"""Add run duration and per-shard timing to scheduler_log
+
+Revision ID: 023
+Revises: 022
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "023"
+down_revision = "022"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE scheduler_log ADD COLUMN IF NOT EXISTS duration_ms INTEGER")
+    op.execute("ALTER TABLE scheduler_log ADD COLUMN IF NOT EXISTS shard_stats TEXT")
+
+
+def downgrade():
+    op.execute("ALTER TABLE scheduler_log DROP COLUMN IF EXISTS shard_stats")
+    op.execute("ALTER TABLE scheduler_log DROP COLUMN IF EXISTS duration_ms")
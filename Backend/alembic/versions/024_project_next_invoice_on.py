@@ -0,0 +1,30 @@
+"""Add projects.next_invoice_on with a partial index for the daily scheduler
+
+Revision ID: 024
+Revises: 023
+Create Date: 2026-10-18
+
+Existing rows are left NULL: the daily job fills in every active project
+without a next_invoice_on before selecting due ones, with the current rules
+of services/invoice_scheduler.py.
+"""
+from alembic import op
+
+revision = "024"
+down_revision = "023"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE projects ADD COLUMN IF NOT EXISTS next_invoice_on DATE")
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_projects_next_invoice_on
+        ON projects (next_invoice_on)
+        WHERE is_active AND NOT is_internal
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_projects_next_invoice_on")
+    op.execute("ALTER TABLE projects DROP COLUMN IF EXISTS next_invoice_on")
@@ -0,0 +1,36 @@
+"""Add export_jobs table for background PDF/XLSX exports
+
+Revision ID: 025
+Revises: 024
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "025"
+down_revision = "024"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS export_jobs (
+            id              VARCHAR PRIMARY KEY,
+            kind            VARCHAR NOT NULL,
+            params          TEXT,
+            status          VARCHAR NOT NULL DEFAULT 'queued',
+            file_name       VARCHAR,
+            file_path       VARCHAR,
+            media_type      VARCHAR,
+            file_size       INTEGER,
+            error_message   TEXT,
+            created_at      TIMESTAMP NOT NULL DEFAULT NOW(),
+            started_at      TIMESTAMP,
+            finished_at     TIMESTAMP
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_export_jobs_created_at ON export_jobs(created_at)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS export_jobs")
@@ -0,0 +1,65 @@
+"""Composite and partial indexes for hot query paths
+
+Revision ID: 026
+Revises: 025
+Create Date: 2026-10-18
+
+Also makes invoice_time_entries.time_entry_id unique: a time entry can be
+billed on one invoice only. Exact duplicate links (same invoice, same entry)
+are collapsed first; an entry linked to two different invoices aborts the
+migration so it can be resolved by hand instead of silently unbilled.
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = "026"
+down_revision = "025"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_time_entries_project_date", "time_entries (project_id, date)"),
+    ("ix_time_entries_user_date", "time_entries (user_id, date)"),
+    ("ix_time_entries_date_id", "time_entries (date, id)"),
+    ("ix_time_entries_billable_project_date",
+     "time_entries (project_id, date) WHERE billable AND status = 'normal'"),
+    ("ix_invoice_time_entries_invoice_id", "invoice_time_entries (invoice_id)"),
+    ("ix_invoices_project_issue_date", "invoices (project_id, issue_date)"),
+    ("ix_notifications_user_created", "notifications (user_id, created_at)"),
+    ("ix_notifications_user_unread", "notifications (user_id, created_at) WHERE NOT is_read"),
+]
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    conflicts = conn.execute(text("""
+        SELECT time_entry_id FROM invoice_time_entries
+        GROUP BY time_entry_id HAVING COUNT(DISTINCT invoice_id) > 1
+        LIMIT 20
+    """)).scalars().all()
+    if conflicts:
+        raise RuntimeError(
+            "Time entries linked to more than one invoice, resolve before upgrading: "
+            + ", ".join(conflicts)
+        )
+    op.execute("""
+        DELETE FROM invoice_time_entries ite
+        USING invoice_time_entries dup
+        WHERE ite.time_entry_id = dup.time_entry_id
+          AND ite.invoice_id = dup.invoice_id
+          AND (ite.created_at, ite.id) > (dup.created_at, dup.id)
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_invoice_time_entries_time_entry_id
+        ON invoice_time_entries (time_entry_id)
+    """)
+
+    for name, definition in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("DROP INDEX IF EXISTS ux_invoice_time_entries_time_entry_id")
@@ -0,0 +1,41 @@
+"""Add the unbilled_hours ledger maintained by triggers
+
+Revision ID: 027
+Revises: 026
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "027"
+down_revision = "026"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    from models.unbilled_hours import UNBILLED_LEDGER_DDL, UNBILLED_LEDGER_REBUILD_SQL
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS unbilled_hours (
+            project_id  VARCHAR NOT NULL,
+            user_id     VARCHAR NOT NULL,
+            day         DATE NOT NULL,
+            hours       NUMERIC(12, 2) NOT NULL DEFAULT 0,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (project_id, user_id, day)
+        )
+    """)
+    # Block writers while the backfill runs so no delta slips in between
+    op.execute("LOCK TABLE time_entries, invoice_time_entries IN SHARE ROW EXCLUSIVE MODE")
+    for ddl in UNBILLED_LEDGER_DDL:
+        op.execute(ddl)
+    op.execute("DELETE FROM unbilled_hours")
+    op.execute(UNBILLED_LEDGER_REBUILD_SQL)
+
+
+def downgrade():
+    from models.unbilled_hours import UNBILLED_LEDGER_DROP_DDL
+
+    for ddl in UNBILLED_LEDGER_DROP_DDL:
+        op.execute(ddl)
+    op.execute("DROP TABLE IF EXISTS unbilled_hours")
@@ -0,0 +1,31 @@
+"""Indexes for the skill coverage query
+
+Revision ID: 028
+Revises: 027
+Create Date: 2026-10-18
+
+The coverage query walks required skills -> project assignments -> the
+assigned employees' skills; neither employee_projects nor employee_skills had
+an index beyond the primary key.
+"""
+from alembic import op
+
+revision = "028"
+down_revision = "027"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_employee_projects_project_user", "employee_projects (project_id, user_id)"),
+    ("ix_employee_skills_employee_catalog", "employee_skills (employee_id, skill_catalog_id)"),
+]
+
+
+def upgrade():
+    for name, definition in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,55 @@
+"""Trigram and full-text indexes for search
+
+Revision ID: 029
+Revises: 028
+Create Date: 2026-10-18
+
+GIN trigram indexes make name ILIKE '%term%' filters (employee, client,
+project and skill search) index scans, and back the fuzzy matching of
+/search. GIN tsvector indexes serve its full-text mode over notes and
+descriptions; their expressions must match services/search.py exactly.
+
+pg_trgm has to be allow-listed on managed servers (azure.extensions on Azure
+Database for PostgreSQL). Where it cannot be created the trigram indexes are
+skipped and /search falls back to plain ILIKE; re-run the migration after
+enabling the extension (downgrade to 028, upgrade again).
+"""
+from alembic import op
+from sqlalchemy import exc, text
+
+revision = "029"
+down_revision = "028"
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = [
+    ("ix_employees_name_trgm", "employees USING gin (name gin_trgm_ops)"),
+    ("ix_clients_name_trgm", "clients USING gin (name gin_trgm_ops)"),
+    ("ix_projects_name_trgm", "projects USING gin (name gin_trgm_ops)"),
+    ("ix_skill_catalog_name_trgm", "skill_catalog USING gin (name gin_trgm_ops)"),
+]
+
+FULL_TEXT_INDEXES = [
+    ("ix_employees_notes_fts", "employees USING gin (to_tsvector('english', coalesce(notes, '')))"),
+    ("ix_clients_notes_fts", "clients USING gin (to_tsvector('english', coalesce(notes, '')))"),
+    ("ix_projects_description_fts", "projects USING gin (to_tsvector('english', coalesce(description, '')))"),
+]
+
+
+def upgrade():
+    conn = op.get_bind()
+    try:
+        with conn.begin_nested():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        trigram = True
+    except exc.DBAPIError as e:
+        trigram = False
+        print(f"[029] pg_trgm unavailable, trigram indexes skipped: {e.orig}")
+
+    for name, definition in (TRIGRAM_INDEXES if trigram else []) + FULL_TEXT_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade():
+    for name, _ in reversed(TRIGRAM_INDEXES + FULL_TEXT_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
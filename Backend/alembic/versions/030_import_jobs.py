@@ -0,0 +1,38 @@
+"""Add import_jobs table for background CRM imports
+
+Revision ID: 030
+Revises: 029
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "030"
+down_revision = "029"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS import_jobs (
+            id              VARCHAR PRIMARY KEY,
+            source          VARCHAR NOT NULL,
+            params          TEXT,
+            status          VARCHAR NOT NULL DEFAULT 'queued',
+            total           INTEGER NOT NULL DEFAULT 0,
+            processed       INTEGER NOT NULL DEFAULT 0,
+            imported        INTEGER NOT NULL DEFAULT 0,
+            updated         INTEGER NOT NULL DEFAULT 0,
+            failed          INTEGER NOT NULL DEFAULT 0,
+            errors          TEXT,
+            error_message   TEXT,
+            created_at      TIMESTAMP NOT NULL DEFAULT NOW(),
+            started_at      TIMESTAMP,
+            finished_at     TIMESTAMP
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_import_jobs_created_at ON import_jobs(created_at)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS import_jobs")
@@ -0,0 +1,100 @@
+"""Apply unbilled ledger deltas in key order
+
+Revision ID: 031
+Revises: 030
+Create Date: 2026-10-18
+
+The ledger triggers of migration 027 passed their per-key deltas to
+unbilled_ledger_apply in arbitrary order, so two concurrent bulk writes over
+overlapping (project, user, day) keys could lock ledger rows in opposite
+orders and deadlock. The functions are replaced with versions that aggregate
+and upsert in (project_id, user_id, day) order; the triggers stay as they are.
+
+The SQL is written out here rather than imported from models.unbilled_hours
+so later edits to the model do not change what this migration does.
+"""
+from alembic import op
+
+revision = "031"
+down_revision = "030"
+branch_labels = None
+depends_on = None
+
+_UNBILLED = (
+    "{r}.billable AND {r}.status = 'normal' "
+    "AND NOT EXISTS (SELECT 1 FROM invoice_time_entries l WHERE l.time_entry_id = {r}.id)"
+)
+
+_KEY_ORDER = "ORDER BY d.project_id, d.user_id, d.day"
+
+
+def _trigger_function(name: str, deltas: str) -> str:
+    arrays = ", ".join(
+        f"array_agg(d.{column} {_KEY_ORDER})" for column in ("project_id", "user_id", "day", "hours", "entry_count")
+    )
+    return f"""
+CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM unbilled_ledger_apply({arrays})
+    FROM (
+        SELECT project_id, user_id, day, SUM(hours) AS hours, SUM(entry_count)::int AS entry_count
+        FROM ({deltas}) x
+        GROUP BY project_id, user_id, day
+    ) d;
+    RETURN NULL;
+END $$;
+"""
+
+
+def _entry_deltas(rows: str, sign: str) -> str:
+    return (
+        f"SELECT t.project_id, t.user_id, t.date AS day, {sign}t.hours AS hours, {sign}1 AS entry_count "
+        f"FROM {rows} t WHERE {_UNBILLED.format(r='t')}"
+    )
+
+
+FUNCTIONS = [
+    """
+CREATE OR REPLACE FUNCTION unbilled_ledger_apply(
+    p_project VARCHAR[], p_user VARCHAR[], p_day DATE[], p_hours NUMERIC[], p_count INTEGER[]
+) RETURNS void LANGUAGE sql AS $$
+    INSERT INTO unbilled_hours AS u (project_id, user_id, day, hours, entry_count)
+    SELECT * FROM unnest(p_project, p_user, p_day, p_hours, p_count) ORDER BY 1, 2, 3
+    ON CONFLICT (project_id, user_id, day) DO UPDATE
+    SET hours = u.hours + EXCLUDED.hours, entry_count = u.entry_count + EXCLUDED.entry_count;
+
+    DELETE FROM unbilled_hours u
+    USING unnest(p_project, p_user, p_day) AS k(project_id, user_id, day)
+    WHERE u.project_id = k.project_id AND u.user_id = k.user_id AND u.day = k.day
+      AND u.entry_count <= 0;
+$$;
+""",
+    _trigger_function("unbilled_ledger_te_insert", _entry_deltas("new_rows", "")),
+    _trigger_function(
+        "unbilled_ledger_te_update",
+        _entry_deltas("new_rows", "") + " UNION ALL " + _entry_deltas("old_rows", "-"),
+    ),
+    _trigger_function("unbilled_ledger_te_delete", _entry_deltas("old_rows", "-")),
+    _trigger_function(
+        "unbilled_ledger_link_insert",
+        "SELECT t.project_id, t.user_id, t.date AS day, -t.hours AS hours, -1 AS entry_count "
+        "FROM time_entries t JOIN (SELECT DISTINCT time_entry_id FROM new_rows) n ON n.time_entry_id = t.id "
+        "WHERE t.billable AND t.status = 'normal'",
+    ),
+    _trigger_function(
+        "unbilled_ledger_link_delete",
+        "SELECT t.project_id, t.user_id, t.date AS day, t.hours AS hours, 1 AS entry_count "
+        "FROM time_entries t JOIN (SELECT DISTINCT time_entry_id FROM old_rows) o ON o.time_entry_id = t.id "
+        f"WHERE {_UNBILLED.format(r='t')}",
+    ),
+]
+
+
+def upgrade():
+    for ddl in FUNCTIONS:
+        op.execute(ddl)
+
+
+def downgrade():
+    # The unordered versions only differ in lock order; nothing to restore
+    pass
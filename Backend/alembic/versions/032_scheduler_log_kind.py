@@ -0,0 +1,25 @@
+"""Mark scheduler_log rows written by the daily job
+
+Revision ID: 032
+Revises: 031
+Create Date: 2026-10-18
+
+Daily runs were told apart from manual POST /invoices/generate-monthly runs
+only by period_start = period_end, which a manual single-day run also has.
+Only the daily job writes shard_stats, so existing rows are backfilled from it.
+"""
+from alembic import op
+
+revision = "032"
+down_revision = "031"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE scheduler_log ADD COLUMN IF NOT EXISTS kind VARCHAR NOT NULL DEFAULT 'manual'")
+    op.execute("UPDATE scheduler_log SET kind = 'daily' WHERE shard_stats IS NOT NULL")
+
+
+def downgrade():
+    op.execute("ALTER TABLE scheduler_log DROP COLUMN IF EXISTS kind")
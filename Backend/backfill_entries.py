@@ -2,10 +2,8 @@
 Backfill time entries for all employees from Nov 1, 2025 to today.
 Skips weekends and dates that already have an entry for that employee+project.
 """
-import uuid
 import random
 from datetime import date, timedelta
-from decimal import Decimal
 
 from config.database import engine, Base, SessionLocal
 import models  # ensure all models are registered
@@ -13,10 +11,7 @@ import models  # ensure all models are registered
 from models.employees import Employee
 from models.employee_projects import EmployeeProject
 from models.time_entries import TimeEntry
-
-
-def uid():
-    return str(uuid.uuid4())
+from services.time_entries import bulk_create_time_entries
 
 
 def weekdays_between(start: date, end: date):
@@ -67,29 +62,24 @@ def seed_entries():
                 existing.add(key)
 
                 hours = random.choice(hours_options)
-                new_entries.append(TimeEntry(
-                    id=uid(),
-                    user_id=assignment.user_id,
-                    project_id=assignment.project_id,
-                    role_id=assignment.role_id,
-                    date=day,
-                    hours=Decimal(str(hours)),
-                    billable=True,
-                    notes=None,
-                ))
+                new_entries.append({
+                    "user_id": assignment.user_id,
+                    "project_id": assignment.project_id,
+                    "role_id": assignment.role_id,
+                    "date": day,
+                    "hours": hours,
+                    "billable": True,
+                    "notes": None,
+                })
 
         if not new_entries:
             print("No new entries to insert — everything already exists.")
             return
 
-        # Insert in batches
-        batch_size = 500
-        for i in range(0, len(new_entries), batch_size):
-            db.add_all(new_entries[i:i + batch_size])
-            db.flush()
-
-        db.commit()
-        print(f"Inserted {len(new_entries)} time entries from {start} to {end}.")
+        result = bulk_create_time_entries(db, new_entries)
+        print(f"Inserted {result['inserted']} time entries from {start} to {end}.")
+        for err in result["errors"]:
+            print(f"  row {err['index']}: {err['status']} — {err['detail']}")
 
     except Exception as e:
         db.rollback()
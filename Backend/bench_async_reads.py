@@ -0,0 +1,194 @@
+"""
+Load benchmark: sync vs async read endpoints under concurrent clients.
+
+Serves the four list endpoints twice from one uvicorn server — /async/... are
+the real routes (AsyncSession via get_async_db), /sync/... call the sync
+services through get_db in FastAPI's threadpool — and hammers each with N
+concurrent httpx clients, reporting throughput and latency percentiles.
+
+Seeds bench-* rows into the database in DATABASE_URL (use a scratch database)
+and deletes them afterwards.
+
+Usage:  DATABASE_URL=postgresql://.../scratch python bench_async_reads.py \\
+            [--concurrency 1 10 50] [--requests 500]
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+import httpx
+import uvicorn
+from fastapi import APIRouter, Depends, FastAPI
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from config.database import Base, SessionLocal, engine, get_db
+import models  # noqa - registers all models
+
+from models.clients import Client
+from models.employees import Employee
+from models.invoice import Invoice
+from models.notifications import Notification
+from models.projects import Project
+from models.time_entries import TimeEntry
+from routers.invoice import invoice_router
+from routers.notifications import notifications_router
+from routers.projects import projects_router, _with_manager_name
+from routers.time_entries import time_entries_router
+from schemas.invoice import InvoiceOut
+from schemas.notifications import NotificationOut
+from schemas.projects import ProjectOut
+from schemas.time_entries import TimeEntryOut
+from services.invoice import get_invoices
+from services.notifications import get_notifications
+from services.projects import get_projects
+from services.time_entries import get_time_entries
+
+PORT = 8765
+EMPLOYEES, PROJECTS, ENTRIES, INVOICES, NOTIFICATIONS = 50, 100, 20_000, 2_000, 5_000
+
+ENDPOINTS = [
+    ("invoices", "/invoices/?project_id=bench-prj-3"),
+    ("time-entries", "/time-entries/?project_id=bench-prj-3"),
+    ("notifications", "/notifications/?user_id=bench-emp-3"),
+    ("projects", "/projects/?client_id=bench-client"),
+]
+
+
+def sync_router() -> APIRouter:
+    """The pre-async implementations of the same routes."""
+    router = APIRouter(prefix="/sync")
+
+    @router.get("/invoices/", response_model=List[InvoiceOut])
+    def invoices(project_id: Optional[str] = None, status: Optional[str] = None, db: Session = Depends(get_db)):
+        return get_invoices(db, project_id=project_id, status=status)
+
+    @router.get("/time-entries/", response_model=List[TimeEntryOut])
+    def time_entries(project_id: Optional[str] = None, db: Session = Depends(get_db)):
+        return get_time_entries(db, project_id=project_id)
+
+    @router.get("/notifications/", response_model=List[NotificationOut])
+    def notifications(user_id: str, unread_only: bool = False, db: Session = Depends(get_db)):
+        return get_notifications(db, user_id=user_id, unread_only=unread_only)
+
+    @router.get("/projects/", response_model=List[ProjectOut])
+    def projects(client_id: Optional[str] = None, db: Session = Depends(get_db)):
+        return [_with_manager_name(p, db) for p in get_projects(db, client_id=client_id)]
+
+    return router
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    for router in (invoice_router, time_entries_router, notifications_router, projects_router):
+        app.include_router(router, prefix="/async")
+    app.include_router(sync_router())
+    return app
+
+
+def seed():
+    now = datetime.now(timezone.utc)
+    today = date.today()
+    with SessionLocal() as db:
+        db.execute(insert(Client), [{"id": "bench-client", "name": "Bench Client"}])
+        db.execute(insert(Employee), [
+            {"id": f"bench-emp-{n}", "user_id": f"bench-user-{n}", "name": f"Employee {n}",
+             "email": f"bench{n}@example.com"}
+            for n in range(EMPLOYEES)
+        ])
+        db.execute(insert(Project), [
+            {"id": f"bench-prj-{n}", "client_id": "bench-client", "name": f"Project {n}",
+             "manager_id": f"bench-emp-{n % EMPLOYEES}"}
+            for n in range(PROJECTS)
+        ])
+        db.execute(insert(TimeEntry), [
+            {"id": f"bench-te-{n}", "user_id": f"bench-emp-{n % EMPLOYEES}", "project_id": f"bench-prj-{n % PROJECTS}",
+             "date": today - timedelta(days=n % 365), "hours": 1 + n % 8, "created_at": now}
+            for n in range(ENTRIES)
+        ])
+        db.execute(insert(Invoice), [
+            {"id": f"bench-inv-{n}", "project_id": f"bench-prj-{n % PROJECTS}", "status": "paid",
+             "issue_date": today - timedelta(days=n % 365), "created_at": now, "updated_at": now}
+            for n in range(INVOICES)
+        ])
+        db.execute(insert(Notification), [
+            {"id": f"bench-ntf-{n}", "user_id": f"bench-emp-{n % EMPLOYEES}", "type": "bench",
+             "title": f"Notification {n}", "is_read": n % 3 == 0, "created_at": now - timedelta(minutes=n)}
+            for n in range(NOTIFICATIONS)
+        ])
+        db.commit()
+
+
+def cleanup():
+    with SessionLocal() as db:
+        for model in (Notification, Invoice, TimeEntry, Project, Employee, Client):
+            db.execute(delete(model).where(model.id.like("bench-%")))
+        db.commit()
+
+
+async def run_load(client: httpx.AsyncClient, path: str, concurrency: int, total: int) -> dict:
+    latencies = []
+    remaining = [total]
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            resp = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            resp.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def bench(concurrency_levels: List[int], total: int):
+    limits = httpx.Limits(max_connections=max(concurrency_levels))
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as client:
+        print(f"{'endpoint':<15}{'clients':>8}  {'sync req/s':>11}{'p50 ms':>9}{'p95 ms':>9}"
+              f"  {'async req/s':>12}{'p50 ms':>9}{'p95 ms':>9}")
+        for name, path in ENDPOINTS:
+            await client.get(f"/sync{path}")
+            await client.get(f"/async{path}")
+            for concurrency in concurrency_levels:
+                s = await run_load(client, f"/sync{path}", concurrency, total)
+                a = await run_load(client, f"/async{path}", concurrency, total)
+                print(f"{name:<15}{concurrency:>8}  {s['rps']:>11.0f}{s['p50']:>9.1f}{s['p95']:>9.1f}"
+                      f"  {a['rps']:>12.0f}{a['p50']:>9.1f}{a['p95']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint and concurrency level")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    print("Seeding...")
+    seed()
+    server = uvicorn.Server(uvicorn.Config(build_app(), host="127.0.0.1", port=PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        while not server.started:
+            time.sleep(0.05)
+        asyncio.run(bench(args.concurrency, args.requests))
+    finally:
+        server.should_exit = True
+        thread.join()
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark for the invoice edit-data assembler.
+
+Seeds a throwaway in-memory SQLite database with invoices of increasing line
+counts and reports how many SQL statements build_edit_data issues for each.
+The count must stay flat as lines grow — a rising count means an N+1 crept
+back into services/invoice_edit_data.py.
+
+Usage:  python bench_edit_data.py
+"""
+import time
+import uuid
+from datetime import date
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from config.database import Base
+import models  # noqa - registers all models
+
+from models.clients import Client
+from models.employees import Employee
+from models.projects import Project
+from models.time_entries import TimeEntry
+from models.invoice import Invoice
+from models.invoice_lines import InvoiceLine
+from models.invoice_time_entries import InvoiceTimeEntry
+from models.invoice_expenses import InvoiceExpense
+from models.user_roles import UserRole
+from services.invoice_edit_data import build_edit_data
+
+LINE_COUNTS = [1, 10, 40, 200]
+
+
+def uid():
+    return str(uuid.uuid4())
+
+
+def seed_invoice(db, n_lines: int) -> str:
+    client = Client(id=uid(), name=f"Client {n_lines}")
+    project = Project(id=uid(), client_id=client.id, name=f"Project {n_lines}")
+    invoice = Invoice(id=uid(), project_id=project.id, invoice_number=f"BENCH{n_lines}", issue_date=date.today())
+    db.add_all([client, project, invoice])
+    for i in range(n_lines):
+        emp = Employee(id=uid(), user_id=uid(), name=f"Employee {i}", email=f"{uid()}@bench.local")
+        entry = TimeEntry(id=uid(), user_id=emp.id, project_id=project.id, date=date.today(), hours=8)
+        db.add_all([
+            emp,
+            entry,
+            UserRole(id=uid(), user_id=emp.id, role="employee"),
+            InvoiceLine(id=uid(), invoice_id=invoice.id, user_id=emp.id, employee_name=emp.name,
+                        hours=8, rate_snapshot=100, amount=800),
+            InvoiceTimeEntry(id=uid(), invoice_id=invoice.id, time_entry_id=entry.id),
+        ])
+    db.add(InvoiceExpense(id=uid(), invoice_id=invoice.id, date=date.today(), category="Other", amount_usd=10))
+    db.commit()
+    return invoice.id
+
+
+def main():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_args):
+        statements["count"] += 1
+
+    seed_db = Session()
+    invoice_ids = {n: seed_invoice(seed_db, n) for n in LINE_COUNTS}
+    seed_db.close()
+
+    print(f"{'lines':>6} {'queries':>8} {'ms':>8}")
+    for n, invoice_id in invoice_ids.items():
+        db = Session()
+        statements["count"] = 0
+        started = time.perf_counter()
+        data = build_edit_data(db, invoice_id)
+        elapsed = (time.perf_counter() - started) * 1000
+        assert len(data["lines"]) == n
+        print(f"{n:>6} {statements['count']:>8} {elapsed:>8.1f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
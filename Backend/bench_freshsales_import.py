@@ -0,0 +1,184 @@
+"""
+Load benchmark: FreshSales bulk import against a local stub server.
+
+Starts a stub of the FreshSales accounts/contacts API on localhost — fixed
+latency per request, a server-side quota answering 429 with Retry-After once
+it is exceeded, and a few unknown accounts — then imports N accounts:
+
+  1. freshsales_service.import_accounts at each --concurrency, timed, with
+     the requests, 429s and rate-limiter pauses it took;
+  2. the same accounts again through POST /integrations/freshsales/import-jobs
+     (all updates this time), polling the job until it is done.
+
+Writes clients with freshsales_id >= 9_000_000 into the database in
+DATABASE_URL (use a scratch database) and deletes them afterwards.
+
+Usage:  DATABASE_URL=postgresql://.../scratch python bench_freshsales_import.py \\
+            [--accounts 200] [--concurrency 1 8] [--latency-ms 50] [--quota 40]
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+
+PORT = 8766
+BASE_ID = 9_000_000
+
+os.environ["FRESHSALES_API_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ.setdefault("FRESHSALES_DOMAIN", "stub")
+os.environ.setdefault("FRESHSALES_API_KEY", "stub")
+os.environ.setdefault("IMPORT_PROGRESS_INTERVAL_SECONDS", "0.2")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Query  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+
+from config.database import Base, SessionLocal, engine  # noqa: E402
+import models  # noqa: E402,F401 - registers all models
+from models.clients import Client  # noqa: E402
+from routers.freshsales import freshsales_router  # noqa: E402
+from services import freshsales_service  # noqa: E402
+from utils.http_clients import http_clients  # noqa: E402
+
+
+class StubFreshSales:
+    """Accounts BASE_ID.., every 25th missing; at most `quota` requests per second."""
+
+    def __init__(self, latency: float, quota: int):
+        self.latency = latency
+        self.quota = quota
+        self.window = 0
+        self.in_window = 0
+        self.requests = 0
+        self.throttled = 0
+        self.app = FastAPI()
+        self.app.get("/accounts/{account_id}")(self.account)
+        self.app.get("/contacts")(self.contacts)
+
+    def _throttle(self):
+        self.requests += 1
+        second = int(time.monotonic())
+        if second != self.window:
+            self.window, self.in_window = second, 0
+        self.in_window += 1
+        remaining = max(0, self.quota - self.in_window)
+        headers = {"X-RateLimit-Limit": str(self.quota), "X-RateLimit-Remaining": str(remaining)}
+        if self.in_window > self.quota:
+            self.throttled += 1
+            headers["Retry-After"] = "1"
+            return JSONResponse({"errors": {"message": "Rate limit exceeded"}}, status_code=429, headers=headers)
+        return headers
+
+    async def account(self, account_id: int):
+        await asyncio.sleep(self.latency)
+        result = self._throttle()
+        if isinstance(result, JSONResponse):
+            return result
+        if account_id % 25 == 0:
+            return JSONResponse({"errors": {"message": "Not found"}}, status_code=404, headers=result)
+        return JSONResponse({"account": {
+            "id": account_id,
+            "name": f"Bench Account {account_id}",
+            "email": f"ap{account_id}@example.com",
+            "website": "https://example.com",
+            "address": {"city": "Bogotá", "country": "Colombia"},
+            "industry_type": {"name": "Software"},
+            "owner": {"name": "Bench Rep"} if account_id % 2 else None,
+            "created_at": "2025-01-02T03:04:05Z",
+            "updated_at": "2026-01-02T03:04:05Z",
+        }}, headers=result)
+
+    async def contacts(self, filter: str = Query(""), per_page: int = 1):
+        await asyncio.sleep(self.latency)
+        result = self._throttle()
+        if isinstance(result, JSONResponse):
+            return result
+        account_id = int(filter.split(":")[1])
+        contacts = [] if account_id % 3 == 0 else [{
+            "first_name": "Ana", "last_name": f"Contact {account_id}",
+            "email": f"ana{account_id}@example.com", "job_title": "CFO",
+        }]
+        return JSONResponse({"contacts": contacts}, headers=result)
+
+
+def serve(stub: StubFreshSales) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(stub.app, port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def cleanup():
+    with SessionLocal() as db:
+        db.execute(delete(Client).where(Client.freshsales_id >= BASE_ID))
+        db.commit()
+
+
+async def run_direct(stub: StubFreshSales, ids: list, concurrency: int):
+    freshsales_service.FRESHSALES_IMPORT_CONCURRENCY = concurrency
+    limiter = freshsales_service.rate_limiter
+    requests, throttled, pauses = stub.requests, stub.throttled, limiter.pauses
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        result = await freshsales_service.import_accounts(db, ids)
+    elapsed = time.perf_counter() - start
+    print(
+        f"  concurrency {concurrency:>3}: {elapsed:7.2f} s  "
+        f"imported {result['imported']:>4}  updated {result['updated']:>4}  errors {len(result['errors']):>3}  "
+        f"requests {stub.requests - requests:>5}  429s {stub.throttled - throttled:>3}  "
+        f"pauses {limiter.pauses - pauses:>3}"
+    )
+
+
+async def run_job(ids: list):
+    app = FastAPI()
+    app.include_router(freshsales_router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        start = time.perf_counter()
+        r = await client.post("/integrations/freshsales/import-jobs", json={"account_ids": ids})
+        assert r.status_code == 202, r.text
+        job = r.json()
+        print(f"  job {job['id']} {job['status']}, {job['total']} accounts")
+        while job["status"] in ("queued", "running"):
+            await asyncio.sleep(0.5)
+            job = (await client.get(f"/integrations/freshsales/import-jobs/{job['id']}")).json()
+            print(f"    {time.perf_counter() - start:6.1f} s  {job['status']:<8} {job['processed']}/{job['total']}")
+        print(
+            f"  {job['status']} in {time.perf_counter() - start:.2f} s: imported {job['imported']}, "
+            f"updated {job['updated']}, failed {job['failed']} {job['error_message'] or ''}"
+        )
+
+
+async def main(args):
+    stub = StubFreshSales(args.latency_ms / 1000, args.quota)
+    server = serve(stub)
+    Base.metadata.create_all(bind=engine)
+    cleanup()
+    ids = list(range(BASE_ID, BASE_ID + args.accounts))
+    rate = freshsales_service.FRESHSALES_RATE_PER_SECOND
+    budget = f"{rate}/s, burst {freshsales_service.FRESHSALES_RATE_BURST}" if rate > 0 else "none (429/headers only)"
+    print(f"Stub FreshSales: {args.latency_ms} ms/request, {args.quota} requests/s; client budget {budget}")
+    try:
+        print(f"Direct import of {len(ids)} accounts")
+        for concurrency in args.concurrency:
+            cleanup()
+            await run_direct(stub, ids, concurrency)
+        print("Import job (re-import)")
+        await run_job(ids)
+    finally:
+        await http_clients.aclose()
+        cleanup()
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--latency-ms", type=int, default=50)
+    parser.add_argument("--quota", type=int, default=40)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,141 @@
+"""
+Schedule check for the daily invoice job.
+
+Runs auto_generate_daily_invoices once per simulated day over --days days
+(generation itself stubbed to record the billed period) for one project per
+billing period, plus:
+  - a run missed on day 10, caught up on day 11;
+  - a weekly project deactivated on day 20 and reactivated on day 40.
+
+Checks that unanchored weekly/biweekly/custom projects are invoiced exactly
+one cycle apart with contiguous periods (no day billed twice or never), that
+monthly projects are invoiced on their billing day, and that a reactivated
+project waits for its next billing day.
+
+The database in DATABASE_URL is used as is (use a scratch database); by
+default a throwaway SQLite file.
+
+Usage:  python check_invoice_schedule.py [--days 120]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+_default_db = os.path.join(tempfile.mkdtemp(prefix="schedule-"), "check.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_default_db}")
+os.environ.setdefault("SCHEDULER_LEADER_BACKEND", "local")
+
+from config.database import Base, SessionLocal, engine  # noqa: E402
+import models  # noqa: E402,F401 - registers all models
+from models.clients import Client  # noqa: E402
+from models.projects import Project  # noqa: E402
+from schemas.projects import ProjectUpdate  # noqa: E402
+import services.invoice_generator as invoice_generator  # noqa: E402
+import services.invoice_scheduler as invoice_scheduler  # noqa: E402
+import services.projects as project_service  # noqa: E402
+
+START = date(2026, 1, 5)
+MISSED_DAY, DEACTIVATE_DAY, REACTIVATE_DAY = 10, 20, 40
+
+PROJECTS = {
+    # id: (billing_period, billing_day_of_period, custom_period_days)
+    "chk-weekly": ("weekly", None, None),
+    "chk-biweekly": ("biweekly", None, None),
+    "chk-custom": ("custom", None, 10),
+    "chk-monthly": ("monthly", 3, None),
+    "chk-reactivated": ("weekly", None, None),
+}
+CYCLE_DAYS = {"weekly": 7, "biweekly": 14}
+
+
+class _SimulatedDate(date):
+    current = START
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add(Client(id="chk-client", name="Schedule check"))
+        for project_id, (period, day, custom_days) in PROJECTS.items():
+            db.add(Project(
+                id=project_id, client_id="chk-client", name=project_id,
+                billing_period=period, billing_day_of_period=day, custom_period_days=custom_days,
+            ))
+        db.commit()
+
+
+def run(days: int) -> dict:
+    billed: dict = {project_id: [] for project_id in PROJECTS}
+
+    def record(db, projects, period_start, period_end, before_project=None):
+        for project in projects:
+            before_project(project.id)
+            billed[project.id].append((invoice_scheduler.date.today(), period_start, period_end))
+        return {"generated": len(projects), "skipped": 0, "errors": []}
+
+    invoice_generator._generate_for_projects = record
+    invoice_scheduler.date = project_service.date = _SimulatedDate
+
+    for offset in range(days):
+        _SimulatedDate.current = START + timedelta(days=offset)
+        if offset in (DEACTIVATE_DAY, REACTIVATE_DAY):
+            with SessionLocal() as db:
+                project_service.update_project(db, "chk-reactivated", ProjectUpdate(is_active=offset == REACTIVATE_DAY))
+        if offset != MISSED_DAY:
+            invoice_scheduler.auto_generate_daily_invoices()
+    return billed
+
+
+def check(billed: dict) -> list:
+    failures = []
+    for project_id, (period, day, custom_days) in PROJECTS.items():
+        runs = billed[project_id]
+        if len(runs) < 2:
+            failures.append(f"{project_id}: only {len(runs)} invoice(s)")
+            continue
+        if period == "monthly":
+            failures += [
+                f"{project_id}: invoiced on {on}, billing day is {day}"
+                for on, _, _ in runs if on.day != day and on != START + timedelta(days=MISSED_DAY + 1)
+            ]
+            continue
+        cycle = CYCLE_DAYS.get(period, custom_days)
+        if project_id == "chk-reactivated":
+            reactivated_on = START + timedelta(days=REACTIVATE_DAY)
+            failures += [
+                f"{project_id}: invoiced on reactivation day {on} off its cycle"
+                for on, _, _ in runs if on == reactivated_on and (on - runs[0][0]).days % cycle
+            ]
+            runs = [r for r in runs if r[0] >= reactivated_on]
+        for (prev_on, _, prev_end), (on, start, end) in zip(runs, runs[1:]):
+            if start != prev_end + timedelta(days=1):
+                failures.append(f"{project_id}: period {start}..{end} does not follow {prev_end}")
+            if (end - start).days + 1 != cycle:
+                failures.append(f"{project_id}: period {start}..{end} is not {cycle} days")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=120)
+    args = parser.parse_args()
+
+    seed()
+    billed = run(args.days)
+    for project_id, runs in billed.items():
+        print(f"{project_id:<18} {len(runs):>3} invoices: " + ", ".join(str(on) for on, _, _ in runs[:6]) + " ...")
+    failures = check(billed)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("OK" if not failures else f"{len(failures)} failure(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
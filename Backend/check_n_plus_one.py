@@ -0,0 +1,194 @@
+"""
+N+1 sweep over every GET route.
+
+Seeds one client with a few projects, more employees than the threshold
+(assigned, with roles and skills), time entries, an invoice with lines,
+expenses and fees, and notifications; then calls every GET route whose path
+and required query parameters it can fill, with N+1 detection in raise mode.
+Prints the statement count per route and the repeated shapes of every
+offender. Exits 1 if any route repeats a statement shape more than
+--threshold times.
+
+The database in DATABASE_URL is used as is (use a scratch database); by
+default a throwaway SQLite file.
+
+Usage:  python check_n_plus_one.py [--threshold 5] [--route /projects]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import uuid
+from datetime import date, timedelta
+
+_default_db = os.path.join(tempfile.mkdtemp(prefix="nplusone-"), "check.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_default_db}")
+os.environ.setdefault("AUTH_MODE", "mock")
+os.environ["N_PLUS_ONE_DETECTION"] = "raise"
+os.environ.setdefault("REQUEST_METRICS_ENABLED", "false")
+
+from fastapi.routing import APIRoute  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from config.database import Base, SessionLocal, engine  # noqa: E402
+import models  # noqa: E402,F401 - registers all models
+from models.clients import Client  # noqa: E402
+from models.employee_projects import EmployeeProject  # noqa: E402
+from models.employee_skills import EmployeeSkill  # noqa: E402
+from models.employees import Employee  # noqa: E402
+from models.invoice import Invoice  # noqa: E402
+from models.invoice_expenses import InvoiceExpense  # noqa: E402
+from models.invoice_fees import InvoiceFee  # noqa: E402
+from models.invoice_lines import InvoiceLine  # noqa: E402
+from models.invoice_time_entries import InvoiceTimeEntry  # noqa: E402
+from models.notifications import Notification  # noqa: E402
+from models.project_required_skill import ProjectRequiredSkill  # noqa: E402
+from models.project_roles import ProjectRole  # noqa: E402
+from models.projects import Project  # noqa: E402
+from models.skill_catalog import SkillCatalog  # noqa: E402
+from models.time_entries import TimeEntry  # noqa: E402
+from models.user_roles import UserRole  # noqa: E402
+from utils import nplusone  # noqa: E402
+
+EMPLOYEES = 12
+
+# Integrations, file renders and the metrics endpoints have nothing to find
+SKIP_PREFIXES = ("/auth", "/expensify", "/integrations", "/exports", "/metrics", "/health")
+SKIP_SUFFIXES = ("/export/pdf", "/export/pdf-zip")
+
+
+def uid() -> str:
+    return str(uuid.uuid4())
+
+
+def seed() -> dict:
+    db = SessionLocal()
+    today = date.today()
+    client = Client(id=uid(), name="N+1 Client")
+    employees = [
+        Employee(id=uid(), user_id=uid(), name=f"Employee {i}", email=f"{uid()}@nplusone.local")
+        for i in range(EMPLOYEES)
+    ]
+    projects = [
+        Project(id=uid(), client_id=client.id, name=f"Project {i}", manager_id=employees[i].id)
+        for i in range(3)
+    ]
+    project = projects[0]
+    roles = [ProjectRole(id=uid(), project_id=project.id, name=f"Role {i}", hourly_rate_usd=100 + i) for i in range(3)]
+    skills = [SkillCatalog(id=uid(), name=f"Skill {i}", category="tech") for i in range(6)]
+    db.add_all([client, *employees, *projects, *roles, *skills])
+    db.flush()
+
+    invoice = Invoice(id=uid(), project_id=project.id, invoice_number="NPLUS1", issue_date=today,
+                      period_start=today.replace(day=1), period_end=today)
+    db.add(invoice)
+    entries = []
+    for i, emp in enumerate(employees):
+        role = roles[i % len(roles)]
+        db.add_all([
+            UserRole(id=uid(), user_id=emp.id, role="admin" if i == 0 else "employee"),
+            EmployeeProject(id=uid(), user_id=emp.id, project_id=project.id, role_id=role.id),
+            InvoiceLine(id=uid(), invoice_id=invoice.id, user_id=emp.id, employee_name=emp.name,
+                        role_name=role.name, hours=8, rate_snapshot=role.hourly_rate_usd,
+                        amount=8 * role.hourly_rate_usd),
+            InvoiceExpense(id=uid(), invoice_id=invoice.id, date=today, category="travel", amount_usd=10),
+            Notification(id=uid(), user_id=employees[0].id, type="check", title=f"Notification {i}"),
+        ])
+        for skill in skills[i % 3:i % 3 + 3]:
+            db.add(EmployeeSkill(id=uid(), employee_id=emp.id, skill_catalog_id=skill.id,
+                                 skill_name=skill.name, category=skill.category, proficiency_level=3))
+        for d in range(3):
+            entries.append(TimeEntry(id=uid(), user_id=emp.id, project_id=project.id, role_id=role.id,
+                                     date=today - timedelta(days=d), hours=4))
+    db.add_all(entries)
+    db.add_all([
+        ProjectRequiredSkill(id=uid(), project_id=project.id, skill_id=skill.id, min_level=2)
+        for skill in skills[:4]
+    ])
+    db.add(InvoiceFee(id=uid(), invoice_id=invoice.id, label="Setup", quantity=1, unit_price_usd=500, fee_total=500))
+    db.flush()
+    db.add_all([InvoiceTimeEntry(id=uid(), invoice_id=invoice.id, time_entry_id=e.id) for e in entries[::2]])
+    db.commit()
+
+    params = {
+        "client_id": client.id, "employee_id": employees[0].id, "user_id": employees[0].id,
+        "project_id": project.id, "role_id": roles[0].id, "entry_id": entries[0].id,
+        "invoice_id": invoice.id, "admin_email": employees[0].email,
+        "line_id": db.query(InvoiceLine.id).filter(InvoiceLine.invoice_id == invoice.id).limit(1).scalar(),
+        "fee_id": db.query(InvoiceFee.id).filter(InvoiceFee.invoice_id == invoice.id).limit(1).scalar(),
+        "expense_id": db.query(InvoiceExpense.id).filter(InvoiceExpense.invoice_id == invoice.id).limit(1).scalar(),
+    }
+    db.close()
+    return params
+
+
+def routes_to_check(app, only: str):
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods:
+            continue
+        if route.path.startswith(SKIP_PREFIXES) or route.path.endswith(SKIP_SUFFIXES):
+            continue
+        if only and not route.path.startswith(only):
+            continue
+        yield route
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=int, default=int(os.getenv("N_PLUS_ONE_THRESHOLD", "5")),
+                        help="flag a statement shape run more than this many times in one request")
+    parser.add_argument("--route", default="", help="only check routes starting with this path")
+    args = parser.parse_args()
+
+    os.environ["N_PLUS_ONE_THRESHOLD"] = str(args.threshold)
+    from main import app
+
+    Base.metadata.create_all(bind=engine)
+    params = seed()
+
+    # Requests run one at a time, so a global counter gives per-route totals
+    executed = [0]
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _count(*_):
+        executed[0] += 1
+
+    offenders, skipped, errors = [], [], []
+    # Mock auth: act as the seeded admin so admin-only routes are exercised too
+    with TestClient(app, headers={"X-Dev-User-Email": params["admin_email"]}) as client:
+        for route in routes_to_check(app, args.route):
+            needed = [p.name for p in route.dependant.path_params]
+            needed += [p.name for p in route.dependant.query_params if p.required]
+            if any(name not in params for name in needed):
+                skipped.append(route.path)
+                continue
+            path = route.path.format(**{n: params[n] for n in needed})
+            query = {p.name: params[p.name] for p in route.dependant.query_params if p.required}
+
+            executed[0] = 0
+            try:
+                resp = client.get(path, params=query)
+            except nplusone.NPlusOneError as e:
+                offenders.append(route.path)
+                print(f"[N+1 ] GET {route.path}\n{e}\n")
+                continue
+            if resp.status_code >= 500:
+                errors.append(route.path)
+                print(f"[ERR ] GET {route.path}: {resp.status_code}")
+            else:
+                print(f"[  ok] GET {route.path}: {resp.status_code}, {executed[0]} statements")
+
+    if skipped:
+        print(f"\nSkipped (no value for a required parameter): {', '.join(skipped)}")
+    if errors:
+        print(f"Server errors: {', '.join(errors)}")
+    if offenders:
+        print(f"\n{len(offenders)} route(s) repeat a statement shape more than {args.threshold}x")
+        sys.exit(1)
+    print("\nNo N+1 patterns found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Connection pool configuration and metrics.
+
+Each workload (api, scheduler, export, replica reads) gets its own engine so a month-end
+export or a scheduler run cannot drain the pool the API serves requests from.
+Sizes and the Postgres statement_timeout are read per workload:
+
+    DB_<WORKLOAD>_POOL_SIZE, DB_<WORKLOAD>_MAX_OVERFLOW, DB_<WORKLOAD>_STATEMENT_TIMEOUT_MS
+
+and DB_POOL_TIMEOUT / DB_POOL_RECYCLE / DB_POOL_PRE_PING apply to all of them.
+The pools record checkouts, time spent waiting for a connection and checkout
+timeouts; see pool_stats().
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+WORKLOAD_DEFAULTS = {
+    # workload: (pool_size, max_overflow, statement_timeout_ms — 0 disables it)
+    "api": (5, 10, 60_000),
+    "scheduler": (5, 2, 0),  # per-project timeouts are set by the scheduler itself
+    "export": (2, 2, 600_000),
+    "replica": (5, 5, 600_000),  # report exports read from it too
+}
+
+
+class PoolMetrics:
+    """Counters shared by a pool and the pools it is recreated into."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class _MeteredPool:
+    """Times every checkout from the underlying queue pool."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start, timed_out=False)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredQueuePool(_MeteredPool, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def engine_options(url: str, workload: str, asyncio: bool = False) -> dict:
+    """
+    create_engine / create_async_engine keyword arguments for a workload.
+    Reads the environment on every call: config.database runs load_dotenv
+    after importing this module.
+    """
+    size, overflow, timeout_ms = WORKLOAD_DEFAULTS[workload]
+    prefix = f"DB_{workload.upper()}_"
+    options = {
+        "poolclass": MeteredAsyncQueuePool if asyncio else MeteredQueuePool,
+        "pool_size": _env_int(prefix + "POOL_SIZE", size),
+        "max_overflow": _env_int(prefix + "MAX_OVERFLOW", overflow),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+    timeout_ms = _env_int(prefix + "STATEMENT_TIMEOUT_MS", timeout_ms)
+    if timeout_ms > 0 and make_url(url).get_backend_name() == "postgresql":
+        if asyncio:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+
+
+def attach_metrics(engine):
+    """Give the engine's pool a PoolMetrics; returns the engine for chaining."""
+    engine.pool.metrics = PoolMetrics()
+    return engine
+
+
+def pool_stats(name: str, engine) -> dict:
+    pool = engine.pool
+    metrics: PoolMetrics = pool.metrics
+    waits = metrics.checkouts + metrics.timeouts
+    return {
+        "name": name,
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "checkouts": metrics.checkouts,
+        "timeouts": metrics.timeouts,
+        "wait_ms_avg": round(metrics.wait_seconds_total / waits * 1000, 3) if waits else 0.0,
+        "wait_ms_max": round(metrics.wait_seconds_max * 1000, 3),
+    }
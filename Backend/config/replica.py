@@ -0,0 +1,72 @@
+"""
+Replication-lag check for the optional read replica.
+
+Read-only paths ask ReplicaMonitor.usable() before opening a replica session.
+The answer is cached for `interval` seconds; a replica that is further behind
+than `max_lag` seconds, or that cannot be reached, sends reads to the primary
+until a later check finds it healthy again.
+"""
+import logging
+import math
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# 0 when the server is not a standby or has replayed everything it received
+# (an idle primary would otherwise look like growing lag); NULL replay
+# timestamp means nothing was replayed yet and counts as lagging.
+_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 'Infinity')
+    END::float8
+""")
+
+
+class ReplicaMonitor:
+    def __init__(self, engine, max_lag: float, interval: float):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self._usable: Optional[bool] = None  # unknown until the first check
+        self.lag_seconds: Optional[float] = None
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.interval
+
+    def usable(self) -> bool:
+        """True if reads may go to the replica; re-checks at most every `interval` seconds."""
+        if self.stale():
+            with self._lock:
+                if self.stale():
+                    self._check()
+        return bool(self._usable)
+
+    def _check(self):
+        try:
+            with self.engine.connect() as conn:
+                lag = float(conn.execute(_LAG_SQL).scalar())
+        except Exception as e:
+            lag = None
+            logger.warning(f"[Replica] Lag check failed, reading from primary: {e}")
+        usable = lag is not None and lag <= self.max_lag
+        if usable != self._usable and lag is not None:
+            log = logger.info if usable else logger.warning
+            log(f"[Replica] Lag {lag:.1f}s — reads go to the {'replica' if usable else 'primary'}")
+        self.lag_seconds = lag
+        self._usable = usable
+        self._checked_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "usable": bool(self._usable),
+            "lag_seconds": self.lag_seconds if self.lag_seconds is not None and math.isfinite(self.lag_seconds) else None,
+            "max_lag_seconds": self.max_lag,
+        }
@@ -0,0 +1,184 @@
+"""
+Query-plan regression check for the hot tables.
+
+Seeds the Postgres database in DATABASE_URL (use a scratch database) with a
+realistic volume of rows, ANALYZEs it, runs the hot service functions while
+capturing the SQL they emit, and EXPLAINs every captured statement. Exits 1 if
+any plan reads a hot table with a Seq Scan — i.e. an index from migration 026
+was dropped or a query stopped matching it. Everything runs in one transaction
+that is rolled back at the end.
+
+Usage:  DATABASE_URL=postgresql://.../scratch python explain_hot_queries.py [--scale 1]
+"""
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from config.database import engine
+import models  # noqa - registers all models
+
+from services.invoice_edit_data import build_edit_data
+from services.invoice_generator import _projects_with_invoice_in_period, _unbilled_by_project_user
+from services.notifications import get_notifications
+from services.time_entries import get_time_entries, get_time_entries_page
+
+HOT_TABLES = {"time_entries", "invoice_time_entries", "invoices", "notifications"}
+
+TODAY = date(2026, 6, 30)
+
+
+def seed(conn, scale: int):
+    employees, projects = 200 * scale, 400 * scale
+    entries, invoices, notifications = 200_000 * scale, 8_000 * scale, 100_000 * scale
+    p = {"emp": employees, "prj": projects, "te": entries, "inv": invoices, "ntf": notifications,
+         "today": TODAY}
+    conn.execute(text("""
+        INSERT INTO clients (id, name, is_active, created_at)
+        VALUES ('bench-client', 'Bench Client', true, now())
+    """))
+    conn.execute(text("""
+        INSERT INTO employees (id, user_id, name, email, is_active, created_at, updated_at)
+        SELECT 'bench-emp-' || n, 'bench-user-' || n, 'Employee ' || n,
+               'bench' || n || '@example.com', true, now(), now()
+        FROM generate_series(0, :emp - 1) n
+    """), p)
+    conn.execute(text("""
+        INSERT INTO projects (id, client_id, name, is_active, is_internal, status,
+                              created_at, owner_company, billing_period)
+        SELECT 'bench-prj-' || n, 'bench-client', 'Project ' || n, true, false, 'active',
+               now(), 'IPC', 'monthly'
+        FROM generate_series(0, :prj - 1) n
+    """), p)
+    # Two years of history, spread over every (project, employee)
+    conn.execute(text("""
+        INSERT INTO time_entries (id, user_id, project_id, date, hours, billable, status, created_at)
+        SELECT 'bench-te-' || n, 'bench-emp-' || (n % :emp), 'bench-prj-' || (n % :prj),
+               CAST(:today AS date) - (n % 730), 1 + (n % 8), (n % 10) <> 0,
+               CASE WHEN n % 50 = 0 THEN 'on_hold' ELSE 'normal' END, now()
+        FROM generate_series(0, :te - 1) n
+    """), p)
+    conn.execute(text("""
+        INSERT INTO invoices (id, project_id, status, subtotal, discount, total,
+                              issue_date, owner_company, created_at, updated_at)
+        SELECT 'bench-inv-' || n, 'bench-prj-' || (n % :prj), 'paid', 0, 0, 0,
+               CAST(:today AS date) - 30 - (n % 700), 'IPC', now(), now()
+        FROM generate_series(0, :inv - 1) n
+    """), p)
+    # Fresh stats first, or the FK checks below get planned as seq scans
+    for table in ("employees", "projects", "time_entries", "invoices"):
+        conn.execute(text(f"ANALYZE {table}"))
+    # Everything older than a month is billed
+    conn.execute(text("""
+        INSERT INTO invoice_time_entries (id, invoice_id, time_entry_id, created_at)
+        SELECT 'bench-ite-' || n, 'bench-inv-' || (n % :inv), 'bench-te-' || n, now()
+        FROM generate_series(0, :te - 1) n
+        WHERE n % 730 >= 30
+    """), p)
+    conn.execute(text("""
+        INSERT INTO notifications (id, user_id, type, title, is_read, created_at)
+        SELECT 'bench-ntf-' || n, 'bench-emp-' || (n % :emp), 'bench', 'Notification ' || n,
+               n % 10 <> 0, now() - make_interval(mins => n)
+        FROM generate_series(0, :ntf - 1) n
+    """), p)
+    for table in ("invoice_time_entries", "notifications"):
+        conn.execute(text(f"ANALYZE {table}"))
+
+
+def hot_queries(db: Session) -> list:
+    month_start = TODAY.replace(day=1)
+    project_ids = [f"bench-prj-{n}" for n in range(20)]
+    return [
+        ("time entries by project + date range",
+         lambda: get_time_entries(db, project_id="bench-prj-7", date_gte=month_start, date_lte=TODAY)),
+        ("time entries by user + date range",
+         lambda: get_time_entries(db, user_id="bench-emp-3", date_gte=month_start, date_lte=TODAY)),
+        ("time entries keyset page",
+         lambda: get_time_entries_page(db, limit=100, after=(TODAY - timedelta(days=200), "bench-te-5"))),
+        ("generator: unbilled anti-join",
+         lambda: _unbilled_by_project_user(db, project_ids, month_start, TODAY)),
+        ("generator: invoices in period",
+         lambda: _projects_with_invoice_in_period(db, project_ids, month_start, TODAY)),
+        ("invoice edit data", lambda: build_edit_data(db, "bench-inv-42")),
+        ("unread notifications", lambda: get_notifications(db, "bench-emp-5", unread_only=True)),
+        ("all notifications", lambda: get_notifications(db, "bench-emp-5")),
+    ]
+
+
+def _seq_scans(plan: dict) -> list:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in HOT_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def _scan_nodes(plan: dict) -> list:
+    nodes = []
+    if "Relation Name" in plan:
+        nodes.append(f"{plan['Node Type']} {plan.get('Index Name') or plan['Relation Name']}")
+    for child in plan.get("Plans", []):
+        nodes.extend(_scan_nodes(child))
+    return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1, help="multiplier for seeded row counts")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("explain_hot_queries.py needs a Postgres DATABASE_URL")
+
+    failures = 0
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            print(f"Seeding (scale {args.scale})...")
+            seed(conn, args.scale)
+
+            captured = []
+            capturing = [False]
+
+            @event.listens_for(conn, "before_cursor_execute")
+            def _capture(_conn, _cursor, statement, parameters, _context, _executemany):
+                if capturing[0]:
+                    captured.append((statement, parameters))
+
+            db = Session(bind=conn)
+            for name, run in hot_queries(db):
+                captured.clear()
+                capturing[0] = True
+                try:
+                    run()
+                finally:
+                    capturing[0] = False
+                db.expunge_all()
+
+                for statement, parameters in captured:
+                    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    root = plan[0]["Plan"]
+                    seq = _seq_scans(root)
+                    status = "FAIL" if seq else "ok"
+                    failures += bool(seq)
+                    print(f"[{status:>4}] {name}: {', '.join(_scan_nodes(root)) or root['Node Type']}")
+                    if seq:
+                        print(f"       sequential scan on {', '.join(sorted(set(seq)))}")
+                        print("       " + " ".join(statement.split())[:400])
+        finally:
+            trans.rollback()
+
+    if failures:
+        print(f"\n{failures} statement(s) fell back to a sequential scan on a hot table")
+        sys.exit(1)
+    print("\nAll hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,11 @@ from routers.skill_catalog import skill_catalog_router
 from routers.notifications import notifications_router
 from routers.invoice_hours_on_hold import on_hold_router
 from routers.profile import profile_router
+from routers.export_jobs import export_jobs_router
+from routers.search import search_router
+from routers.metrics import METRICS_TOKEN, metrics_router, prometheus_router
+from utils.request_metrics import RequestMetricsMiddleware, install_query_hooks
+from utils.nplusone import NPlusOneMiddleware
 
 # Import all models so Base.metadata sees them
 import models  # noqa - imports all models via __init__.py
@@ -66,8 +71,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Request / SQL metrics, served at /metrics
+if os.getenv("REQUEST_METRICS_ENABLED", "true").lower() == "true":
+    install_query_hooks()
+    app.add_middleware(RequestMetricsMiddleware)
+
+# N+1 query detection for development and tests — off in production
+N_PLUS_ONE_DETECTION = os.getenv("N_PLUS_ONE_DETECTION", "off").lower()
+if N_PLUS_ONE_DETECTION in ("log", "raise"):
+    app.add_middleware(
+        NPlusOneMiddleware,
+        mode=N_PLUS_ONE_DETECTION,
+        threshold=int(os.getenv("N_PLUS_ONE_THRESHOLD", "5")),
+    )
+
 # Static files for uploads
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(os.path.dirname(__file__), "uploads"))
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -109,6 +129,11 @@ app.include_router(skill_catalog_router, dependencies=auth_deps)
 app.include_router(notifications_router, dependencies=auth_deps)
 app.include_router(on_hold_router, dependencies=auth_deps)
 app.include_router(profile_router, dependencies=auth_deps)
+app.include_router(export_jobs_router, dependencies=auth_deps)
+app.include_router(search_router, dependencies=auth_deps)
+app.include_router(metrics_router, dependencies=auth_deps)
+# Scrapers authenticate with METRICS_TOKEN; without one /metrics needs Entra ID like the rest
+app.include_router(prometheus_router, dependencies=[] if METRICS_TOKEN else auth_deps)
 
 
 # ---------- Health check ----------
@@ -123,11 +148,27 @@ Base.metadata.create_all(bind=engine)
 
 # ---------- Scheduler ----------
 from services.invoice_scheduler import start_scheduler, stop_scheduler
+from services.export_jobs import shutdown_export_workers
 
 @app.on_event("startup")
 async def startup_event():
+    from services.asset_registry import assets
+    assets.preload()
+    from utils.http_clients import http_clients
+    await http_clients.start()
     start_scheduler()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     stop_scheduler()
+    shutdown_export_workers()
+    from services.export_pdf_zip import shutdown_bulk_pdf_workers
+    shutdown_bulk_pdf_workers()
+    from services.import_jobs import shutdown_import_jobs
+    await shutdown_import_jobs()
+    from utils.http_clients import http_clients
+    await http_clients.aclose()
+    from config.database import async_engine, export_engine, scheduler_engine
+    await async_engine.dispose()
+    scheduler_engine.dispose()
+    export_engine.dispose()
@@ -22,3 +22,6 @@ from models.invoice_hours_on_hold import InvoiceHoursOnHold
 from models.employee_internal_cost import EmployeeInternalCost
 from models.project_required_skill import ProjectRequiredSkill
 from models.invoice_number_sequence import InvoiceNumberSequence
+from models.export_jobs import ExportJob
+from models.import_jobs import ImportJob
+from models.unbilled_hours import UnbilledHours
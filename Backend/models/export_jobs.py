@@ -0,0 +1,21 @@
+from config.database import Base
+from sqlalchemy import Column, String, DateTime, Integer, Text
+from datetime import datetime, timezone
+import uuid
+
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String, nullable=False)  # "invoice_pdf" | "invoice_xlsx" | "invoices_report"
+    params = Column(Text, nullable=True)  # JSON
+    status = Column(String, nullable=False, default="queued")  # "queued" | "running" | "done" | "error"
+    file_name = Column(String, nullable=True)
+    file_path = Column(String, nullable=True)
+    media_type = Column(String, nullable=True)
+    file_size = Column(Integer, nullable=True)
+    error_message = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
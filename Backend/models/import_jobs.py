@@ -0,0 +1,23 @@
+from config.database import Base
+from sqlalchemy import Column, String, DateTime, Integer, Text
+from datetime import datetime, timezone
+import uuid
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    source = Column(String, nullable=False)  # "freshsales"
+    params = Column(Text, nullable=True)  # JSON
+    status = Column(String, nullable=False, default="queued")  # "queued" | "running" | "done" | "error"
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    imported = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    errors = Column(Text, nullable=True)  # JSON list of {"id", "error"}
+    error_message = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,5 +1,5 @@
 from config.database import Base
-from sqlalchemy import Column, String, Date, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, String, Date, DateTime, Numeric, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import uuid
@@ -36,3 +36,7 @@ class Invoice(Base):
     time_entry_links = relationship("InvoiceTimeEntry", back_populates="invoice", cascade="all, delete-orphan")
     expenses = relationship("InvoiceExpense", back_populates="invoice", cascade="all, delete-orphan")
     hours_on_hold = relationship("InvoiceHoursOnHold", back_populates="invoice", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_invoices_project_issue_date", "project_id", "issue_date"),
+    )
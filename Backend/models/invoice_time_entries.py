@@ -1,5 +1,5 @@
 from config.database import Base
-from sqlalchemy import Column, String, ForeignKey, DateTime
+from sqlalchemy import Column, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import uuid
@@ -16,3 +16,9 @@ class InvoiceTimeEntry(Base):
 
     invoice = relationship("Invoice", back_populates="time_entry_links")
     time_entry = relationship("TimeEntry")
+
+    __table_args__ = (
+        # A time entry can be billed on exactly one invoice
+        Index("ux_invoice_time_entries_time_entry_id", "time_entry_id", unique=True),
+        Index("ix_invoice_time_entries_invoice_id", "invoice_id"),
+    )
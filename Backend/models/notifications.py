@@ -1,5 +1,5 @@
 from config.database import Base
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Index, text
 from datetime import datetime, timezone
 import uuid
 
@@ -15,3 +15,11 @@ class Notification(Base):
     link = Column(String, nullable=True)
     is_read = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", "created_at"),
+        Index(
+            "ix_notifications_user_unread", "user_id", "created_at",
+            postgresql_where=text("NOT is_read"),
+        ),
+    )
@@ -1,5 +1,5 @@
 from config.database import Base
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Numeric, Date, Integer
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Numeric, Date, Integer, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import uuid
@@ -32,6 +32,8 @@ class Project(Base):
     billing_day_of_period = Column(Integer, nullable=True, default=3)
     custom_period_days = Column(Integer, nullable=True)
     billing_anchor_date = Column(Date, nullable=True)
+    # Precomputed from the billing fields above — see invoice_scheduler.refresh_next_invoice_on
+    next_invoice_on = Column(Date, nullable=True)
 
     client = relationship("Client", back_populates="projects")
     roles = relationship("ProjectRole", back_populates="project", cascade="all, delete-orphan")
@@ -39,3 +41,10 @@ class Project(Base):
     time_entries = relationship("TimeEntry", back_populates="project")
     invoices = relationship("Invoice", back_populates="project")
     required_skills = relationship("ProjectRequiredSkill", back_populates="project", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index(
+            "ix_projects_next_invoice_on", "next_invoice_on",
+            postgresql_where=text("is_active AND NOT is_internal"),
+        ),
+    )
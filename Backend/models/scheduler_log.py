@@ -1,5 +1,5 @@
 from config.database import Base
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, String, DateTime, Integer, Text
 from datetime import datetime, timezone
 import uuid
 
@@ -11,7 +11,10 @@ class SchedulerLog(Base):
     run_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     period_start = Column(String, nullable=False)
     period_end = Column(String, nullable=False)
+    kind = Column(String, nullable=False, default="manual")  # "daily" (scheduler) | "manual" (generate-monthly)
     invoices_generated = Column(Integer, nullable=False, default=0)
     invoices_skipped = Column(Integer, nullable=False, default=0)
     status = Column(String, nullable=False, default="success")  # "success" | "error"
     error_message = Column(String, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    shard_stats = Column(Text, nullable=True)  # JSON list: [{shard, projects, generated, skipped, errors, duration_ms}]
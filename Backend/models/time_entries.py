@@ -1,5 +1,5 @@
 from config.database import Base
-from sqlalchemy import Column, String, Boolean, Date, Numeric, ForeignKey, DateTime
+from sqlalchemy import Column, String, Boolean, Date, Numeric, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import uuid
@@ -23,3 +23,15 @@ class TimeEntry(Base):
     employee = relationship("Employee", back_populates="time_entries")
     project = relationship("Project", back_populates="time_entries")
     role = relationship("ProjectRole")
+
+    __table_args__ = (
+        Index("ix_time_entries_project_date", "project_id", "date"),
+        Index("ix_time_entries_user_date", "user_id", "date"),
+        # Keyset pagination order of GET /time-entries/page
+        Index("ix_time_entries_date_id", "date", "id"),
+        # Unbilled-entry scan of the invoice generator
+        Index(
+            "ix_time_entries_billable_project_date", "project_id", "date",
+            postgresql_where=text("billable AND status = 'normal'"),
+        ),
+    )
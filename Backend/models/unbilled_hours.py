@@ -0,0 +1,143 @@
+from config.database import Base
+from sqlalchemy import Column, String, Date, Numeric, Integer, DDL, event
+
+from models.invoice_time_entries import InvoiceTimeEntry
+from models.time_entries import TimeEntry
+
+
+class UnbilledHours(Base):
+    """
+    Ledger of unbilled hours per (project, user, day): billable, status 'normal'
+    time entries that are not linked to any invoice.
+
+    Maintained by Postgres statement-level triggers on time_entries and
+    invoice_time_entries (UNBILLED_LEDGER_DDL below), so it is updated in the
+    same transaction as the write, whichever code path made it.
+    """
+    __tablename__ = "unbilled_hours"
+
+    project_id = Column(String, primary_key=True)
+    user_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    hours = Column(Numeric(12, 2), nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
+
+
+_UNBILLED = """
+    {r}.billable AND {r}.status = 'normal'
+    AND NOT EXISTS (SELECT 1 FROM invoice_time_entries l WHERE l.time_entry_id = {r}.id)
+"""
+
+# Every trigger aggregates its transition table into one delta per key and
+# hands it to unbilled_ledger_apply, so bulk writes cost one upsert per key.
+# Keys are passed (and upserted) in key order: concurrent writes touching the
+# same keys then lock their ledger rows in the same order and cannot deadlock.
+_APPLY = """
+    PERFORM unbilled_ledger_apply(
+        array_agg(d.project_id ORDER BY d.project_id, d.user_id, d.day),
+        array_agg(d.user_id ORDER BY d.project_id, d.user_id, d.day),
+        array_agg(d.day ORDER BY d.project_id, d.user_id, d.day),
+        array_agg(d.hours ORDER BY d.project_id, d.user_id, d.day),
+        array_agg(d.entry_count ORDER BY d.project_id, d.user_id, d.day)
+    )
+    FROM (
+        SELECT project_id, user_id, day, SUM(hours) AS hours, SUM(entry_count)::int AS entry_count
+        FROM ({deltas}) x
+        GROUP BY project_id, user_id, day
+    ) d;
+"""
+
+
+def _trigger_function(name: str, deltas: str) -> str:
+    return f"""
+CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    {_APPLY.format(deltas=deltas)}
+    RETURN NULL;
+END $$;
+"""
+
+
+def _entry_deltas(rows: str, sign: str) -> str:
+    return (
+        f"SELECT t.project_id, t.user_id, t.date AS day, {sign}t.hours AS hours, {sign}1 AS entry_count "
+        f"FROM {rows} t WHERE {_UNBILLED.format(r='t')}"
+    )
+
+
+UNBILLED_LEDGER_DDL = [
+    """
+CREATE OR REPLACE FUNCTION unbilled_ledger_apply(
+    p_project VARCHAR[], p_user VARCHAR[], p_day DATE[], p_hours NUMERIC[], p_count INTEGER[]
+) RETURNS void LANGUAGE sql AS $$
+    INSERT INTO unbilled_hours AS u (project_id, user_id, day, hours, entry_count)
+    SELECT * FROM unnest(p_project, p_user, p_day, p_hours, p_count) ORDER BY 1, 2, 3
+    ON CONFLICT (project_id, user_id, day) DO UPDATE
+    SET hours = u.hours + EXCLUDED.hours, entry_count = u.entry_count + EXCLUDED.entry_count;
+
+    DELETE FROM unbilled_hours u
+    USING unnest(p_project, p_user, p_day) AS k(project_id, user_id, day)
+    WHERE u.project_id = k.project_id AND u.user_id = k.user_id AND u.day = k.day
+      AND u.entry_count <= 0;
+$$;
+""",
+    _trigger_function("unbilled_ledger_te_insert", _entry_deltas("new_rows", "")),
+    _trigger_function(
+        "unbilled_ledger_te_update",
+        _entry_deltas("new_rows", "") + " UNION ALL " + _entry_deltas("old_rows", "-"),
+    ),
+    _trigger_function("unbilled_ledger_te_delete", _entry_deltas("old_rows", "-")),
+    # A new link bills an entry that was unbilled (time_entry_id is unique)
+    _trigger_function(
+        "unbilled_ledger_link_insert",
+        "SELECT t.project_id, t.user_id, t.date AS day, -t.hours AS hours, -1 AS entry_count "
+        "FROM time_entries t JOIN (SELECT DISTINCT time_entry_id FROM new_rows) n ON n.time_entry_id = t.id "
+        "WHERE t.billable AND t.status = 'normal'",
+    ),
+    # A removed link returns the entry to the ledger if nothing else bills it
+    _trigger_function(
+        "unbilled_ledger_link_delete",
+        "SELECT t.project_id, t.user_id, t.date AS day, t.hours AS hours, 1 AS entry_count "
+        "FROM time_entries t JOIN (SELECT DISTINCT time_entry_id FROM old_rows) o ON o.time_entry_id = t.id "
+        f"WHERE {_UNBILLED.format(r='t')}",
+    ),
+]
+
+_TRIGGERS = [
+    ("trg_unbilled_te_insert", "time_entries", "INSERT", "NEW TABLE AS new_rows", "unbilled_ledger_te_insert"),
+    ("trg_unbilled_te_update", "time_entries", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+     "unbilled_ledger_te_update"),
+    ("trg_unbilled_te_delete", "time_entries", "DELETE", "OLD TABLE AS old_rows", "unbilled_ledger_te_delete"),
+    ("trg_unbilled_link_insert", "invoice_time_entries", "INSERT", "NEW TABLE AS new_rows",
+     "unbilled_ledger_link_insert"),
+    ("trg_unbilled_link_delete", "invoice_time_entries", "DELETE", "OLD TABLE AS old_rows",
+     "unbilled_ledger_link_delete"),
+]
+
+for _name, _table, _event, _refs, _func in _TRIGGERS:
+    UNBILLED_LEDGER_DDL += [
+        f"DROP TRIGGER IF EXISTS {_name} ON {_table}",
+        f"CREATE TRIGGER {_name} AFTER {_event} ON {_table} REFERENCING {_refs} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION {_func}()",
+    ]
+
+UNBILLED_LEDGER_DROP_DDL = [f"DROP TRIGGER IF EXISTS {name} ON {table}" for name, table, *_ in _TRIGGERS] + [
+    f"DROP FUNCTION IF EXISTS {func}()" for *_, func in _TRIGGERS
+] + ["DROP FUNCTION IF EXISTS unbilled_ledger_apply(VARCHAR[], VARCHAR[], DATE[], NUMERIC[], INTEGER[])"]
+
+# Full recompute — used by the migration backfill and services.unbilled_ledger.rebuild
+UNBILLED_LEDGER_REBUILD_SQL = f"""
+    INSERT INTO unbilled_hours (project_id, user_id, day, hours, entry_count)
+    SELECT t.project_id, t.user_id, t.date, SUM(t.hours), COUNT(*)
+    FROM time_entries t
+    WHERE {_UNBILLED.format(r='t')}
+    GROUP BY t.project_id, t.user_id, t.date
+"""
+
+
+# Databases built by Base.metadata.create_all get the triggers too: create the
+# ledger after the tables its triggers attach to, then install them
+UnbilledHours.__table__.add_is_dependent_on(TimeEntry.__table__)
+UnbilledHours.__table__.add_is_dependent_on(InvoiceTimeEntry.__table__)
+for _ddl in UNBILLED_LEDGER_DDL:
+    event.listen(UnbilledHours.__table__, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
@@ -0,0 +1,42 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from config.database import get_db
+from services.export_jobs import create_export_job, get_export_job
+from schemas.export_jobs import ExportJobCreate, ExportJobOut
+
+export_jobs_router = APIRouter(prefix="/exports", tags=["exports"])
+
+
+@export_jobs_router.post("/", response_model=ExportJobOut, status_code=status.HTTP_202_ACCEPTED)
+def create_new_export_job(job_in: ExportJobCreate, db: Session = Depends(get_db)):
+    """Queue a PDF/XLSX export. Poll GET /exports/{id} and download when status is 'done'."""
+    if job_in.kind in ("invoice_pdf", "invoice_xlsx"):
+        if not job_in.invoice_id:
+            raise HTTPException(status_code=400, detail="invoice_id is required for single-invoice exports")
+        params = {"invoice_id": job_in.invoice_id}
+    else:
+        params = {"status": job_in.status, "company": job_in.company}
+    return create_export_job(db, job_in.kind, params)
+
+
+@export_jobs_router.get("/{job_id}", response_model=ExportJobOut)
+def get_export_job_status(job_id: str, db: Session = Depends(get_db)):
+    job = get_export_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    return job
+
+
+@export_jobs_router.get("/{job_id}/download")
+def download_export_job(job_id: str, db: Session = Depends(get_db)):
+    job = get_export_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Export job is {job.status}")
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export artifact has been evicted")
+    return FileResponse(job.file_path, media_type=job.media_type, filename=job.file_name)
@@ -1,14 +1,17 @@
+import json
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from config.database import get_db
 from services import freshsales_service
+from services.import_jobs import create_freshsales_import_job, get_import_job
 from schemas.clients import (
     FreshSalesTestResponse,
     FreshSalesAccountsResponse,
     FreshSalesImportRequest,
     FreshSalesImportResponse,
+    FreshSalesImportJobOut,
     FreshSalesSyncResponse,
 )
 
@@ -36,6 +39,37 @@ async def import_accounts(body: FreshSalesImportRequest, db: Session = Depends(g
     return await freshsales_service.import_accounts(db, body.account_ids)
 
 
+def _import_job_out(job) -> FreshSalesImportJobOut:
+    return FreshSalesImportJobOut(
+        id=job.id,
+        status=job.status,
+        total=job.total,
+        processed=job.processed,
+        imported=job.imported,
+        updated=job.updated,
+        failed=job.failed,
+        errors=json.loads(job.errors or "[]"),
+        error_message=job.error_message,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+@freshsales_router.post("/import-jobs", response_model=FreshSalesImportJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def create_import_job(body: FreshSalesImportRequest, db: Session = Depends(get_db)):
+    """Start importing FreshSales accounts in the background. Poll GET /import-jobs/{id} for progress."""
+    return _import_job_out(create_freshsales_import_job(db, body.account_ids))
+
+
+@freshsales_router.get("/import-jobs/{job_id}", response_model=FreshSalesImportJobOut)
+def get_import_job_status(job_id: str, db: Session = Depends(get_db)):
+    job = get_import_job(db, job_id)
+    if not job or job.source != "freshsales":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+    return _import_job_out(job)
+
+
 @freshsales_router.post("/sync/{freshsales_id}", response_model=FreshSalesSyncResponse)
 async def sync_account(freshsales_id: int, db: Session = Depends(get_db)):
     """Re-sync a single client from FreshSales."""
@@ -1,16 +1,19 @@
 from typing import List, Optional, Dict, Any
 from datetime import date as date_type, datetime
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import text as sql_text
 
-from config.database import get_db
-from services.invoice import create_invoice, get_invoices, get_invoice, update_invoice, delete_invoice
-from services.invoice_expenses import create_expense, get_expenses, get_expense, update_expense, delete_expense
-from services.export_pdf import generate_invoice_pdf
-from services.export_excel import generate_invoice_xlsx, generate_invoices_report_xlsx
+from config.database import get_async_read_db, get_db, get_read_db
+from services.invoice import create_invoice, get_invoices_async, get_invoice_ids, get_invoice, update_invoice, delete_invoice
+from services.invoice_expenses import create_expense, get_expense, update_expense, delete_expense
+from services.pdf_cache import get_invoice_pdf, invalidate_invoice_pdf
+from services.export_excel import generate_invoice_xlsx, write_invoices_report_xlsx
+from services.export_pdf_zip import BulkExportBusy, stream_invoices_pdf_zip
 from services.invoice_generator import generate_invoices_for_period
+from services.invoice_edit_data import build_edit_data, iter_edit_data
+from services.unbilled_ledger import unbilled_by_project
 from schemas.invoice import (
     InvoiceCreate, InvoiceUpdate, InvoiceOut,
     InvoiceEditDataOut, InvoiceEditClient, InvoiceEditProject, InvoiceEditLine, InvoiceEditExpense,
@@ -20,21 +23,24 @@ from schemas.invoice_expenses import InvoiceExpenseCreate
 from schemas.invoice_lines import InvoiceLineUpdate
 from models.invoice_lines import InvoiceLine
 from models.invoice_expenses import InvoiceExpense
-from models.time_entries import TimeEntry
 from models.scheduler_log import SchedulerLog
 from models.projects import Project
-from models.clients import Client
 from models.employees import Employee
-from models.user_roles import UserRole
-from models.invoice_time_entries import InvoiceTimeEntry
 from services.invoice_hours_on_hold import upsert_on_hold_entry, delete_on_hold_entry
-from sqlalchemy import func
 from dateutil.relativedelta import relativedelta
+import tempfile
 import uuid
 
 invoice_router = APIRouter(prefix="/invoices", tags=["invoices"])
 
 
+@invoice_router.get("/pdf-assets/stats")
+def pdf_asset_stats():
+    """Memory use and hit/miss counters of the logo/signature registry."""
+    from services.asset_registry import assets
+    return assets.stats()
+
+
 @invoice_router.get("/signatories")
 def list_signatories(company: Optional[str] = None):
     """Return signatories for a given company (IPC or PI). Defaults to IPC."""
@@ -71,12 +77,12 @@ def create_new_invoice(invoice_in: InvoiceCreate, db: Session = Depends(get_db))
 
 
 @invoice_router.get("/", response_model=List[InvoiceOut])
-def list_invoices(
+async def list_invoices(
     project_id: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    return get_invoices(db, project_id=project_id, status=status)
+    return await get_invoices_async(db, project_id=project_id, status=status)
 
 
 @invoice_router.get("/check-hours")
@@ -87,32 +93,33 @@ def check_hours(
     db: Session = Depends(get_db),
 ):
     """Check if a project has unlinked billable time entries for the period."""
-    linked_ids_result = db.execute(
-        sql_text("SELECT time_entry_id FROM invoice_time_entries")
-    ).fetchall()
-    linked_ids = {row[0] for row in linked_ids_result}
-
-    q = db.query(TimeEntry).filter(
-        TimeEntry.project_id == project_id,
-        TimeEntry.billable == True,
-        TimeEntry.status == 'normal',
-    )
+    start = end = None
     if period_start and period_end:
         start = datetime.strptime(period_start, "%Y-%m-%d").date()
         end = datetime.strptime(period_end, "%Y-%m-%d").date()
-        q = q.filter(TimeEntry.date >= start, TimeEntry.date <= end)
-    entries = q.all()
-    available = [e for e in entries if e.id not in linked_ids]
-
-    total_hours = sum(float(e.hours) for e in available)
+    total_hours, entry_count = unbilled_by_project(db, [project_id], start, end).get(project_id, (0.0, 0))
     return {
-        "has_entries": len(available) > 0,
+        "has_entries": entry_count > 0,
         "total_hours": total_hours,
         "total_amount": 0.0,
-        "entry_count": len(available),
+        "entry_count": entry_count,
     }
 
 
+@invoice_router.get("/unbilled-hours")
+def list_unbilled_hours(
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    db: Session = Depends(get_db),
+):
+    """Unbilled billable hours per project (dashboard), from the unbilled_hours ledger."""
+    totals = unbilled_by_project(db, None, date_from, date_to)
+    return [
+        {"project_id": project_id, "hours": hours, "entry_count": count}
+        for project_id, (hours, count) in sorted(totals.items(), key=lambda kv: -kv[1][0])
+    ]
+
+
 @invoice_router.post("/generate-monthly")
 def generate_monthly_invoices(body: Dict[str, Any], db: Session = Depends(get_db)):
     """Manually trigger invoice generation for a given period."""
@@ -171,115 +178,81 @@ def get_scheduler_status(db: Session = Depends(get_db)):
 
 def _build_edit_data(invoice_id: str, db: Session) -> dict:
     """Shared helper — returns a plain dict suitable for PDF/Excel generators and the API response."""
-    invoice = get_invoice(db, invoice_id)
-    project = db.query(Project).filter(Project.id == invoice.project_id).first()
-    client = db.query(Client).filter(Client.id == project.client_id).first() if project else None
-
-    lines_out = []
-    for line in invoice.lines:
-        user_role = db.query(UserRole).filter(UserRole.user_id == line.user_id).first()
-        # Compute original hours from linked time entries for this employee
-        if line.user_id:
-            original_hours = db.query(func.coalesce(func.sum(TimeEntry.hours), 0)).join(
-                InvoiceTimeEntry, InvoiceTimeEntry.time_entry_id == TimeEntry.id
-            ).filter(
-                InvoiceTimeEntry.invoice_id == invoice.id,
-                TimeEntry.user_id == line.user_id,
-            ).scalar()
-            original_hours = float(original_hours or line.hours)
-        else:
-            original_hours = float(line.hours)
-        lines_out.append({
-            "id": line.id,
-            "user_id": line.user_id,
-            "employee_name": line.employee_name,
-            "title": line.role_name,
-            "role": user_role.role if user_role else None,
-            "hours": float(line.hours),
-            "hourly_rate": float(line.rate_snapshot),
-            "discount_type": line.discount_type,
-            "discount_value": float(line.discount_value) if line.discount_value is not None else 0.0,
-            "amount": float(line.amount),
-            "original_hours": original_hours,
-        })
-
-    expenses_out = [
-        {
-            "id": exp.id,
-            "date": exp.date,
-            "professional": exp.professional,
-            "vendor": exp.vendor,
-            "description": exp.description,
-            "category": exp.category,
-            "amount_usd": float(exp.amount_usd),
-            "payment_source": exp.payment_source,
-            "receipt_attached": exp.receipt_attached,
-            "notes": exp.notes,
-        }
-        for exp in get_expenses(db, invoice_id)
-    ]
+    return build_edit_data(db, invoice_id)
 
-    return {
-        "invoice": {
-            "id": invoice.id,
-            "project_id": invoice.project_id,
-            "status": invoice.status,
-            "subtotal": float(invoice.subtotal),
-            "discount": float(invoice.discount),
-            "total": float(invoice.total),
-            "cap_amount": float(invoice.cap_amount) if invoice.cap_amount is not None else None,
-            "notes": invoice.notes,
-            "invoice_number": invoice.invoice_number,
-            "issue_date": invoice.issue_date,
-            "due_date": invoice.due_date,
-            "period_start": invoice.period_start,
-            "period_end": invoice.period_end,
-            "signatory_name": invoice.signatory_name,
-            "signatory_title": invoice.signatory_title,
-            "owner_company": invoice.owner_company or "IPC",
-            "created_at": invoice.created_at,
-            "updated_at": invoice.updated_at,
-        },
-        "client": {
-            "id": client.id,
-            "name": client.name,
-            "email": client.email,
-            "phone": client.phone,
-            "manager_name": client.manager_name,
-            "job_title": client.job_title,
-            "street_address_1": client.street_address_1,
-            "street_address_2": client.street_address_2,
-            "city": client.city,
-            "state": client.state,
-            "zip": client.zip,
-        } if client else None,
-        "project": {"id": project.id, "name": project.name, "client_id": project.client_id, "owner_company": project.owner_company or "IPC"} if project else None,
-        "lines": lines_out,
-        "expenses": expenses_out,
-    }
+
+REPORT_SPOOL_MAX_BYTES = 8 * 1024 * 1024  # spill to disk beyond 8 MB
+REPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _stream_file(fileobj):
+    try:
+        while chunk := fileobj.read(REPORT_CHUNK_BYTES):
+            yield chunk
+    finally:
+        fileobj.close()
 
 
 @invoice_router.get("/export/report")
 def export_invoices_report(
     status: Optional[str] = None,
     company: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Export all invoices (optionally filtered) as a multi-sheet XLSX report."""
-    invoices = get_invoices(db, project_id=None, status=status)
-    if company:
-        invoices = [inv for inv in invoices if (inv.owner_company or "IPC") == company]
-    invoices_data = [_build_edit_data(inv.id, db) for inv in invoices]
-    xlsx_bytes = generate_invoices_report_xlsx(invoices_data)
+    """
+    Export all invoices (optionally filtered) as a multi-sheet XLSX report.
+    Invoices are loaded in batches and written with write-only worksheets into
+    a spooled temp file, which is then streamed back.
+    """
+    invoice_ids = get_invoice_ids(db, status=status, company=company)
+    spool = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_BYTES)
+    try:
+        write_invoices_report_xlsx(iter_edit_data(db, invoice_ids), spool)
+        spool.seek(0)
+    except Exception:
+        spool.close()
+        raise
     import datetime as dt
     filename = f"Invoices_Report_{dt.date.today()}.xlsx"
-    return Response(
-        content=xlsx_bytes,
+    return StreamingResponse(
+        _stream_file(spool),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
+@invoice_router.get("/export/pdf-zip")
+def export_invoices_pdf_zip(
+    status: Optional[str] = None,
+    company: Optional[str] = None,
+    project_id: Optional[str] = None,
+    period_start: Optional[date_type] = None,
+    period_end: Optional[date_type] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Export the PDFs of every matching invoice as one ZIP archive. The period
+    filters match on issue_date. Rendering runs in the shared process pool and
+    the archive is streamed as PDFs finish; manifest.json lists per-invoice
+    results. 429 while BULK_PDF_MAX_CONCURRENT_EXPORTS exports are running.
+    """
+    invoice_ids = get_invoice_ids(
+        db, project_id=project_id, status=status, company=company,
+        issued_from=period_start, issued_to=period_end,
+    )
+    try:
+        stream = stream_invoices_pdf_zip(invoice_ids)
+    except BulkExportBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    import datetime as dt
+    filename = f"Invoices_PDF_{dt.date.today()}.zip"
+    return StreamingResponse(
+        stream,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @invoice_router.get("/{invoice_id}/edit-data", response_model=InvoiceEditDataOut)
 def get_invoice_edit_data(invoice_id: str, db: Session = Depends(get_db)):
     invoice = get_invoice(db, invoice_id)
@@ -413,6 +386,7 @@ def patch_invoice(invoice_id: str, patch_in: InvoicePatch, db: Session = Depends
                 delete_on_hold_entry(db, invoice_id=invoice_id, line_id=entry.line_id)
 
     db.commit()
+    invalidate_invoice_pdf(invoice_id)
     db.refresh(invoice)
     return invoice
 
@@ -423,7 +397,7 @@ def export_invoice_pdf(invoice_id: str, db: Session = Depends(get_db)):
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
     edit_data = _build_edit_data(invoice_id, db)
-    pdf_bytes = generate_invoice_pdf(edit_data)
+    pdf_bytes = get_invoice_pdf(edit_data)
     inv_label = invoice.invoice_number or invoice_id[:8]
     return Response(
         content=pdf_bytes,
@@ -460,6 +434,7 @@ def update_invoice_detail(invoice_id: str, invoice_in: InvoiceUpdate, db: Sessio
     invoice = update_invoice(db, invoice_id, invoice_in)
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
+    invalidate_invoice_pdf(invoice_id)
     return invoice
 
 
@@ -467,3 +442,4 @@ def update_invoice_detail(invoice_id: str, invoice_in: InvoiceUpdate, db: Sessio
 def delete_invoice_detail(invoice_id: str, db: Session = Depends(get_db)):
     if not delete_invoice(db, invoice_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
+    invalidate_invoice_pdf(invoice_id)
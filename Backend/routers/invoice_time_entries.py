@@ -30,7 +30,13 @@ def list_invoice_time_entries(invoice_id: str, db: Session = Depends(get_db)):
 
 @invoice_time_entries_router.post("/bulk", response_model=List[InvoiceTimeEntryOut], status_code=status.HTTP_201_CREATED)
 def bulk_link(body: BulkLinkBody, db: Session = Depends(get_db)):
-    return bulk_link_time_entries(db, body.invoice_id, body.time_entry_ids)
+    created, conflicts = bulk_link_time_entries(db, body.invoice_id, body.time_entry_ids)
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Time entries already linked to an invoice", "time_entry_ids": conflicts},
+        )
+    return created
 
 
 @invoice_time_entries_router.delete("/{link_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,44 @@
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from config.database import db_pool_stats
+from utils.http_clients import http_clients
+from utils.request_metrics import registry
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+metrics_router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+# Mounted without the Entra ID dependency when METRICS_TOKEN is set, so
+# Prometheus can scrape it with that bearer token; otherwise behind Entra ID.
+prometheus_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get("/db-pool")
+def db_pool_metrics():
+    """
+    Per-workload connection pool state: checked-out connections, overflow in
+    use, and checkout wait time / timeouts since the process started.
+    """
+    return {"pools": db_pool_stats()}
+
+
+@metrics_router.get("/http-clients")
+def http_client_metrics():
+    """
+    Shared integration HTTP clients: requests sent, connections opened (the
+    rest reused a pooled connection) and HTTP/2 responses since startup.
+    """
+    return {"clients": http_clients.stats()}
+
+
+@prometheus_router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics(authorization: Optional[str] = Header(None)):
+    """Request latency, status counts, in-flight requests and SQL per route (Prometheus text format)."""
+    if METRICS_TOKEN and not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
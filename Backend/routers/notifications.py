@@ -1,21 +1,22 @@
 from typing import List
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from config.database import get_db
-from services.notifications import get_notifications, mark_read, mark_all_read
+from config.database import get_async_db, get_db
+from services.notifications import get_notifications_async, mark_read, mark_all_read
 from schemas.notifications import NotificationOut
 
 notifications_router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
 @notifications_router.get("/", response_model=List[NotificationOut])
-def list_notifications(
+async def list_notifications(
     user_id: str,
     unread_only: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return get_notifications(db, user_id=user_id, unread_only=unread_only)
+    return await get_notifications_async(db, user_id=user_id, unread_only=unread_only)
 
 
 @notifications_router.patch("/{notification_id}/read", response_model=NotificationOut)
@@ -1,13 +1,22 @@
+import os
 from typing import List, Optional
+from datetime import date, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from config.database import get_db
-from services.projects import create_project, get_projects, get_project, update_project, delete_project
-from schemas.projects import ProjectCreate, ProjectUpdate, ProjectOut, ProjectCategoryOut, ProjectAssignmentOut
+from config.database import get_async_db, get_db, get_read_db
+from services.projects import (
+    create_project, get_project_rows_async, PROJECT_LIST_FIELDS, get_project, get_skill_coverage as load_skill_coverage, update_project, delete_project, get_upcoming_invoice_projects,
+)
+from services.skill_matrix import skill_matrix
+from schemas.projects import (
+    ProjectCreate, ProjectUpdate, ProjectOut, ProjectCategoryOut, ProjectAssignmentOut, UpcomingInvoiceOut,
+    ProjectPage,
+)
 from schemas.project_required_skill import (
     ProjectRequiredSkillCreate, ProjectRequiredSkillOut,
-    AssignableEmployeeOut, SkillBrief, SkillCoverageOut,
+    AssignableEmployeeOut, SkillBrief, SkillCoverageOut, ProjectSkillCoverageOut,
     LEVEL_LABELS,
 )
 from models.employees import Employee
@@ -16,9 +25,10 @@ from models.project_roles import ProjectRole
 from models.project_categories import ProjectCategory
 from models.project_required_skill import ProjectRequiredSkill
 from models.skill_catalog import SkillCatalog
-from models.employee_skills import EmployeeSkill
 import uuid
 
+from utils.pagination import decode_cursor, encode_cursor
+
 
 def _auto_assign_all_employees(db: Session, project_id: str) -> None:
     """Assign all active employees to an internal project, skipping those already assigned."""
@@ -35,6 +45,9 @@ def _auto_assign_all_employees(db: Session, project_id: str) -> None:
 
 projects_router = APIRouter(prefix="/projects", tags=["projects"])
 
+PROJECTS_PAGE_SIZE = int(os.getenv("PROJECTS_PAGE_SIZE", "100"))
+PROJECTS_MAX_PAGE_SIZE = int(os.getenv("PROJECTS_MAX_PAGE_SIZE", "500"))
+
 # ── Role suggestion map ───────────────────────────────────────────────────────
 _SKILL_TO_ROLE: List[tuple] = [
     ({"react", "vue", "angular", "css", "html", "javascript", "typescript", "svelte", "next.js"}, "Frontend Developer"),
@@ -62,14 +75,25 @@ def _suggest_role(skill_names: List[str]) -> Optional[str]:
     return best_role if best_count > 0 else None
 
 
-def _with_manager_name(project, db: Session) -> ProjectOut:
+def _project_out(project, manager_name: Optional[str]) -> ProjectOut:
     data = {c.name: getattr(project, c.name) for c in project.__table__.columns}
+    data["manager_name"] = manager_name
+    return ProjectOut.model_validate(data)
+
+
+def _coverage_out(row: dict) -> SkillCoverageOut:
+    return SkillCoverageOut(
+        skill_id=row["skill_id"], skill_name=row["skill_name"], skill_category=row["skill_category"],
+        min_level=row["min_level"], min_level_label=LEVEL_LABELS.get(row["min_level"], "Intermediate"),
+        coverage_status=row["coverage_status"], covered_by_names=row["covered_by_names"],
+    )
+
+
+def _with_manager_name(project, db: Session) -> ProjectOut:
+    manager = None
     if project.manager_id:
         manager = db.query(Employee).filter(Employee.id == project.manager_id).first()
-        data["manager_name"] = manager.name if manager else None
-    else:
-        data["manager_name"] = None
-    return ProjectOut.model_validate(data)
+    return _project_out(project, manager.name if manager else None)
 
 
 # ── Categories (must come before /{project_id}) ───────────────────────────────
@@ -85,6 +109,54 @@ def list_project_categories(
     return q.order_by(ProjectCategory.value).all()
 
 
+# ── Portfolio skill coverage (before /{project_id}) ──────────────────────────
+
+@projects_router.get("/skill-coverage", response_model=List[ProjectSkillCoverageOut])
+def get_portfolio_skill_coverage(
+    active: Optional[bool] = True,
+    db: Session = Depends(get_read_db),
+):
+    """Skill coverage of every project (active ones by default) that has required skills."""
+    by_project: dict = {}
+    for row in load_skill_coverage(db, active=active):
+        name_and_skills = by_project.setdefault(row["project_id"], (row["project_name"], []))
+        name_and_skills[1].append(_coverage_out(row))
+    return [
+        ProjectSkillCoverageOut(
+            project_id=project_id,
+            project_name=project_name,
+            covered=sum(s.coverage_status == "covered" for s in skills),
+            partial=sum(s.coverage_status == "partial" for s in skills),
+            missing=sum(s.coverage_status == "missing" for s in skills),
+            skills=skills,
+        )
+        for project_id, (project_name, skills) in by_project.items()
+    ]
+
+
+# ── Upcoming auto-generated invoices (before /{project_id}) ──────────────────
+
+@projects_router.get("/upcoming-invoices", response_model=List[UpcomingInvoiceOut])
+def list_upcoming_invoices(
+    days: int = Query(30, ge=0, le=366),
+    db: Session = Depends(get_db),
+):
+    """Projects whose next auto-generated invoice is due within `days` days."""
+    today = date.today()
+    projects = get_upcoming_invoice_projects(db, today, today + timedelta(days=days))
+    return [
+        UpcomingInvoiceOut(
+            project_id=p.id,
+            project_name=p.name,
+            client_id=p.client_id,
+            owner_company=p.owner_company or "IPC",
+            billing_period=p.billing_period or "monthly",
+            next_invoice_on=p.next_invoice_on,
+        )
+        for p in projects
+    ]
+
+
 # ── CRUD ──────────────────────────────────────────────────────────────────────
 
 @projects_router.post("/", response_model=ProjectOut, status_code=status.HTTP_201_CREATED)
@@ -96,14 +168,55 @@ def create_new_project(project_in: ProjectCreate, db: Session = Depends(get_db))
 
 
 @projects_router.get("/", response_model=List[ProjectOut])
-def list_projects(
+async def list_projects(
     active: Optional[bool] = None,
     client_id: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    projects = get_projects(db, active=active, client_id=client_id, status=status)
-    return [_with_manager_name(p, db) for p in projects]
+    rows, _ = await get_project_rows_async(db, active=active, client_id=client_id, status=status)
+    return [ProjectOut(**row) for row in rows]
+
+
+@projects_router.get("/page", response_model=ProjectPage, response_model_exclude_unset=True)
+async def list_projects_page(
+    fields: Optional[str] = None,
+    active: Optional[bool] = None,
+    client_id: Optional[str] = None,
+    status_: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Keyset-paginated listing ordered by (name, id), for grids. `fields` is a
+    comma-separated subset of the ProjectOut fields (manager_name and
+    client_name included); only those columns are selected and returned, id
+    always is. Pass the returned next_cursor to get the following page; it is
+    null on the last page. limit defaults to PROJECTS_PAGE_SIZE and is capped
+    at PROJECTS_MAX_PAGE_SIZE.
+    """
+    selected = PROJECT_LIST_FIELDS
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in PROJECT_LIST_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field(s): {', '.join(unknown)}",
+            )
+    after = decode_cursor(cursor, 2)
+
+    rows, next_after = await get_project_rows_async(
+        db,
+        fields=selected,
+        limit=min(limit or PROJECTS_PAGE_SIZE, PROJECTS_MAX_PAGE_SIZE),
+        after=tuple(map(str, after)) if after else None,
+        active=active,
+        client_id=client_id,
+        status=status_,
+    )
+    return ProjectPage(items=rows, next_cursor=encode_cursor(*next_after) if next_after else None)
 
 
 # ── Project sub-resources (before /{project_id} catch-all) ───────────────────
@@ -111,10 +224,14 @@ def list_projects(
 @projects_router.get("/{project_id}/assignments", response_model=List[ProjectAssignmentOut])
 def get_project_assignments(project_id: str, db: Session = Depends(get_db)):
     assignments = db.query(EmployeeProject).filter(EmployeeProject.project_id == project_id).all()
+    user_ids = {a.user_id for a in assignments}
+    role_ids = {a.role_id for a in assignments if a.role_id}
+    employees = {e.id: e for e in db.query(Employee).filter(Employee.id.in_(user_ids))} if user_ids else {}
+    roles = {r.id: r for r in db.query(ProjectRole).filter(ProjectRole.id.in_(role_ids))} if role_ids else {}
     result = []
     for a in assignments:
-        employee = db.query(Employee).filter(Employee.id == a.user_id).first()
-        role = db.query(ProjectRole).filter(ProjectRole.id == a.role_id).first() if a.role_id else None
+        employee = employees.get(a.user_id)
+        role = roles.get(a.role_id) if a.role_id else None
         result.append(ProjectAssignmentOut(
             id=a.id,
             user_id=a.user_id,
@@ -135,76 +252,44 @@ def get_assignable_employees(
     skill_match: str = "all",
     min_level: Optional[str] = None,
     category: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     assigned_ids: set = {
-        a.user_id
-        for a in db.query(EmployeeProject).filter(EmployeeProject.project_id == project_id).all()
+        user_id
+        for (user_id,) in db.query(EmployeeProject.user_id).filter(EmployeeProject.project_id == project_id)
     }
-
-    q = db.query(Employee)
-    if name:
-        q = q.filter(Employee.name.ilike(f"%{name}%"))
-    employees = q.order_by(Employee.name).all()
-
-    min_level_int = _LEVEL_MAP.get(min_level or "", 1)
-    requested_skill_ids = set(skills) if skills else set()
-
-    result: List[AssignableEmployeeOut] = []
-    for emp in employees:
-        emp_skills_q = db.query(EmployeeSkill).filter(EmployeeSkill.employee_id == emp.id)
-        if category:
-            emp_skills_q = emp_skills_q.filter(EmployeeSkill.category == category)
-        emp_skills = emp_skills_q.all()
-
-        skill_briefs = [
-            SkillBrief(
-                name=s.skill_name,
-                category=s.category,
-                level=s.proficiency_level,
-                level_label=LEVEL_LABELS.get(s.proficiency_level, str(s.proficiency_level)),
-                years=float(s.years_experience) if s.years_experience else None,
-            )
-            for s in emp_skills
-        ]
-
-        matched_names: List[str] = []
-        missing_names: List[str] = []
-        match_score = 100
-
-        if requested_skill_ids:
-            skill_by_catalog: dict = {s.skill_catalog_id: s for s in emp_skills if s.skill_catalog_id}
-            catalog_cache: dict = {}
-            for sid in requested_skill_ids:
-                if sid not in catalog_cache:
-                    entry = db.query(SkillCatalog).filter(SkillCatalog.id == sid).first()
-                    catalog_cache[sid] = entry.name if entry else sid
-                display = catalog_cache[sid]
-                skill_rec = skill_by_catalog.get(sid)
-                if skill_rec and skill_rec.proficiency_level >= min_level_int:
-                    matched_names.append(display)
-                else:
-                    missing_names.append(display)
-
-            total = len(requested_skill_ids)
-            match_score = round((len(matched_names) / total) * 100) if total > 0 else 0
-
-            if skill_match == "all" and missing_names:
-                continue
-            elif skill_match == "any" and not matched_names:
-                continue
-
-        result.append(AssignableEmployeeOut(
-            id=emp.id,
-            name=emp.name,
-            title=emp.title,
-            skills=skill_briefs,
-            match_score=match_score,
-            matched_skills=matched_names,
-            missing_skills=missing_names,
-            already_assigned=emp.id in assigned_ids,
-            suggested_role=_suggest_role([s.skill_name for s in emp_skills]),
-        ))
+    requested_skill_ids = list(dict.fromkeys(skills)) if skills else []
+
+    candidates = skill_matrix.search(
+        requested_skill_ids,
+        skill_match=skill_match,
+        min_level=_LEVEL_MAP.get(min_level or "", 1),
+        category=category,
+        name=name,
+    )
+    result = [
+        AssignableEmployeeOut(
+            id=c.id,
+            name=c.name,
+            title=c.title,
+            skills=[
+                SkillBrief(
+                    name=s.skill_name,
+                    category=s.category,
+                    level=s.proficiency_level,
+                    level_label=LEVEL_LABELS.get(s.proficiency_level, str(s.proficiency_level)),
+                    years=float(s.years_experience) if s.years_experience else None,
+                )
+                for s in c.skills
+            ],
+            match_score=c.match_score,
+            matched_skills=c.matched_skills,
+            missing_skills=c.missing_skills,
+            already_assigned=c.id in assigned_ids,
+            suggested_role=_suggest_role([s.skill_name for s in c.skills]),
+        )
+        for c in candidates
+    ]
 
     if requested_skill_ids:
         result.sort(key=lambda e: (-e.match_score, e.already_assigned, e.name))
@@ -276,39 +361,8 @@ def remove_required_skill(project_id: str, skill_id: str, db: Session = Depends(
 
 
 @projects_router.get("/{project_id}/skill-coverage", response_model=List[SkillCoverageOut])
-def get_skill_coverage(project_id: str, db: Session = Depends(get_db)):
-    required = db.query(ProjectRequiredSkill).filter(ProjectRequiredSkill.project_id == project_id).all()
-    if not required:
-        return []
-
-    assigned_ids = [
-        a.user_id
-        for a in db.query(EmployeeProject).filter(EmployeeProject.project_id == project_id).all()
-    ]
-
-    result = []
-    for req in required:
-        catalog = db.query(SkillCatalog).filter(SkillCatalog.id == req.skill_id).first()
-        if not catalog:
-            continue
-        matching = (
-            db.query(EmployeeSkill, Employee)
-            .join(Employee, EmployeeSkill.employee_id == Employee.id)
-            .filter(EmployeeSkill.employee_id.in_(assigned_ids), EmployeeSkill.skill_catalog_id == req.skill_id)
-            .all()
-        )
-        min_lv = req.min_level or 2
-        qualifying = [emp.name for skill, emp in matching if skill.proficiency_level >= min_lv]
-        partial = [emp.name for skill, emp in matching if skill.proficiency_level < min_lv]
-        status_val = "covered" if qualifying else ("partial" if partial else "missing")
-        lv = req.min_level or 2
-        result.append(SkillCoverageOut(
-            skill_id=req.skill_id, skill_name=catalog.name, skill_category=catalog.category,
-            min_level=lv, min_level_label=LEVEL_LABELS.get(lv, "Intermediate"),
-            coverage_status=status_val,
-            covered_by_names=qualifying if qualifying else partial,
-        ))
-    return result
+def get_skill_coverage(project_id: str, db: Session = Depends(get_read_db)):
+    return [_coverage_out(row) for row in load_skill_coverage(db, project_id=project_id)]
 
 
 # ── Project CRUD (catch-all /{project_id}) ────────────────────────────────────
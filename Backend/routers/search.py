@@ -0,0 +1,38 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from config.database import get_read_db
+from routers.employees import require_admin
+from services.search import SEARCH_KINDS, search
+from schemas.search import SearchResults
+
+search_router = APIRouter(prefix="/search", tags=["search"])
+
+
+# Admin only: employee results come from the admin-only employee directory
+@search_router.get("/", response_model=SearchResults, dependencies=[Depends(require_admin)])
+def search_all(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = None,
+    mode: Literal["name", "text"] = "name",
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Employees, clients, projects and skills matching `q`, best first, in one
+    query. `types` is a comma-separated subset of employees, clients,
+    projects, skills (default all). mode=name matches names (typo-tolerant on
+    Postgres); mode=text runs a full-text search over employee and client
+    notes and project descriptions. `limit` applies per type.
+    """
+    kinds = SEARCH_KINDS
+    if types:
+        kinds = [t.strip() for t in types.split(",") if t.strip()]
+        unknown = [t for t in kinds if t not in SEARCH_KINDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown type(s): {', '.join(unknown)}",
+            )
+    return SearchResults(**search(db, q, kinds=kinds, mode=mode, limit=limit))
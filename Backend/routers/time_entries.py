@@ -1,34 +1,104 @@
-from typing import List, Optional
+import json
+import os
+from typing import List, Literal, Optional
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from config.database import get_db
+from config.database import get_async_read_db, get_db, get_read_db
 from services.time_entries import (
-    create_time_entry, get_time_entries, get_time_entry, update_time_entry, delete_time_entry,
+    create_time_entry, get_time_entries_async, get_time_entries_page, get_time_entry,
+    update_time_entry, delete_time_entry, bulk_create_time_entries,
 )
-from schemas.time_entries import TimeEntryCreate, TimeEntryUpdate, TimeEntryOut
+from schemas.time_entries import (
+    TimeEntryCreate, TimeEntryUpdate, TimeEntryOut, TimeEntryPage, TimeEntryBulkResult,
+)
+from utils.pagination import decode_cursor, encode_cursor
 
 time_entries_router = APIRouter(prefix="/time-entries", tags=["time-entries"])
 
+TIME_ENTRIES_PAGE_SIZE = int(os.getenv("TIME_ENTRIES_PAGE_SIZE", "100"))
+TIME_ENTRIES_MAX_PAGE_SIZE = int(os.getenv("TIME_ENTRIES_MAX_PAGE_SIZE", "1000"))
+TIME_ENTRIES_BULK_MAX_ROWS = int(os.getenv("TIME_ENTRIES_BULK_MAX_ROWS", "20000"))
+
 
 @time_entries_router.post("/", response_model=TimeEntryOut, status_code=status.HTTP_201_CREATED)
 def create_new_time_entry(entry_in: TimeEntryCreate, db: Session = Depends(get_db)):
     return create_time_entry(db, entry_in)
 
 
+@time_entries_router.post("/bulk", response_model=TimeEntryBulkResult)
+async def bulk_create_time_entries_endpoint(
+    request: Request,
+    on_existing: Literal["skip", "update"] = "skip",
+    all_or_nothing: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Create many time entries in one transaction. The body is a JSON array of
+    TimeEntryCreate objects with 0 < hours <= 24, or NDJSON (one object per
+    line) when sent as application/x-ndjson. Rows sharing (user_id, project_id, date, role_id) are
+    deduped (last wins); rows matching an existing entry are skipped or, with
+    on_existing=update, update it. The response reports every row that was not
+    written, by its index in the payload.
+    """
+    rows = await _read_bulk_rows(request)
+    return await run_in_threadpool(
+        bulk_create_time_entries, db, rows, on_existing=on_existing, all_or_nothing=all_or_nothing,
+    )
+
+
+async def _read_bulk_rows(request: Request) -> list:
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    rows = []
+    try:
+        if ndjson:
+            buffer = b""
+            async for chunk in request.stream():
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                rows.extend(json.loads(line) for line in lines if line.strip())
+                if len(rows) > TIME_ENTRIES_BULK_MAX_ROWS:
+                    break
+            if buffer.strip():
+                rows.append(json.loads(buffer))
+        else:
+            rows = await request.json()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Malformed body: {e}")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or NDJSON")
+    if len(rows) > TIME_ENTRIES_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {TIME_ENTRIES_BULK_MAX_ROWS} rows per request",
+        )
+    return rows
+
+
 @time_entries_router.get("/", response_model=List[TimeEntryOut])
-def list_time_entries(
+async def list_time_entries(
+    response: Response,
     user_id: Optional[str] = None,
     project_id: Optional[str] = None,
     date_gte: Optional[date] = None,
     date_lte: Optional[date] = None,
     billable: Optional[bool] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    return get_time_entries(
+    """
+    The newest matching entries, at most `limit` (default and cap
+    TIME_ENTRIES_MAX_PAGE_SIZE). When more match, the X-Next-Cursor header
+    holds the cursor to continue from with GET /time-entries/page.
+    """
+    limit = min(limit or TIME_ENTRIES_MAX_PAGE_SIZE, TIME_ENTRIES_MAX_PAGE_SIZE)
+    items = await get_time_entries_async(
         db,
+        limit=limit + 1,
         user_id=user_id,
         project_id=project_id,
         date_gte=date_gte,
@@ -36,6 +106,52 @@ def list_time_entries(
         billable=billable,
         status=status,
     )
+    if len(items) > limit:
+        items = items[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(items[-1].date, items[-1].id)
+    return items
+
+
+@time_entries_router.get("/page", response_model=TimeEntryPage)
+def list_time_entries_page(
+    user_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    date_gte: Optional[date] = None,
+    date_lte: Optional[date] = None,
+    billable: Optional[bool] = None,
+    status_: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Keyset-paginated listing ordered by (date desc, id desc). Pass the returned
+    next_cursor to get the following page; it is null on the last page.
+    limit defaults to TIME_ENTRIES_PAGE_SIZE and is capped at
+    TIME_ENTRIES_MAX_PAGE_SIZE.
+    """
+    after = decode_cursor(cursor, 2)
+    if after:
+        try:
+            after = (date.fromisoformat(after[0]), str(after[1]))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    items, has_more, total = get_time_entries_page(
+        db,
+        limit=min(limit or TIME_ENTRIES_PAGE_SIZE, TIME_ENTRIES_MAX_PAGE_SIZE),
+        after=after,
+        include_total=include_total,
+        user_id=user_id,
+        project_id=project_id,
+        date_gte=date_gte,
+        date_lte=date_lte,
+        billable=billable,
+        status=status_,
+    )
+    next_cursor = encode_cursor(items[-1].date, items[-1].id) if has_more else None
+    return TimeEntryPage(items=items, next_cursor=next_cursor, total=total)
 
 
 @time_entries_router.get("/{entry_id}", response_model=TimeEntryOut)
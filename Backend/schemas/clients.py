@@ -146,6 +146,21 @@ class FreshSalesImportResponse(BaseModel):
     errors: List[dict]
 
 
+class FreshSalesImportJobOut(BaseModel):
+    id: str
+    status: str  # "queued" | "running" | "done" | "error"
+    total: int
+    processed: int
+    imported: int
+    updated: int
+    failed: int
+    errors: List[dict] = []
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 class FreshSalesSyncResponse(BaseModel):
     success: bool
     updated: Optional[bool] = None
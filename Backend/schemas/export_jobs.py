@@ -0,0 +1,25 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Literal, Optional
+from datetime import datetime
+
+
+class ExportJobCreate(BaseModel):
+    kind: Literal["invoice_pdf", "invoice_xlsx", "invoices_report"]
+    invoice_id: Optional[str] = None   # required for invoice_pdf / invoice_xlsx
+    status: Optional[str] = None       # invoices_report filter
+    company: Optional[str] = None      # invoices_report filter
+
+
+class ExportJobOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    kind: str
+    status: str
+    file_name: Optional[str] = None
+    media_type: Optional[str] = None
+    file_size: Optional[int] = None
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
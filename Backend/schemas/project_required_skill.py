@@ -55,3 +55,12 @@ class SkillCoverageOut(BaseModel):
     min_level_label: str
     coverage_status: str   # "covered" | "partial" | "missing"
     covered_by_names: List[str]
+
+
+class ProjectSkillCoverageOut(BaseModel):
+    project_id: str
+    project_name: str
+    covered: int
+    partial: int
+    missing: int
+    skills: List[SkillCoverageOut]
@@ -1,5 +1,5 @@
 # schemas/projects.py
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, create_model
 from typing import Optional, List
 from datetime import date, datetime
 
@@ -68,6 +68,7 @@ class ProjectOut(BaseModel):
     business_unit: Optional[str] = None
     manager_id: Optional[str] = None
     manager_name: Optional[str] = None   # computed in router, not a DB column
+    client_name: Optional[str] = None    # joined in the list query
     referral_id: Optional[str] = None
     referral_type: Optional[str] = None
     referral_value: Optional[float] = None
@@ -80,6 +81,32 @@ class ProjectOut(BaseModel):
     billing_day_of_period: Optional[int] = 3
     custom_period_days: Optional[int] = None
     billing_anchor_date: Optional[date] = None
+    next_invoice_on: Optional[date] = None
+
+
+# Every ProjectOut field, all optional but id: /projects/page returns only the
+# fields the caller asked for
+ProjectListItem = create_model(
+    "ProjectListItem",
+    id=(str, ...),
+    **{name: (Optional[f.annotation], None) for name, f in ProjectOut.model_fields.items() if name != "id"},
+)
+
+
+class ProjectPage(BaseModel):
+    items: List[ProjectListItem]
+    next_cursor: Optional[str] = None
+
+
+class UpcomingInvoiceOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    project_id: str
+    project_name: str
+    client_id: str
+    owner_company: str = "IPC"
+    billing_period: str = "monthly"
+    next_invoice_on: date
 
 
 class ProjectCategoryOut(BaseModel):
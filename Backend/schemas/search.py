@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class SearchHit(BaseModel):
+    id: str
+    name: str
+    detail: Optional[str] = None   # employee title, client / project code, skill category
+    score: float
+
+
+class SearchResults(BaseModel):
+    employees: List[SearchHit] = []
+    clients: List[SearchHit] = []
+    projects: List[SearchHit] = []
+    skills: List[SearchHit] = []
@@ -1,6 +1,6 @@
 # schemas/time_entries.py
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from datetime import date, datetime
 
 
@@ -35,3 +35,28 @@ class TimeEntryOut(TimeEntryBase):
 
     id: str
     created_at: datetime
+
+
+class TimeEntryPage(BaseModel):
+    items: List[TimeEntryOut]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class BulkTimeEntryRow(TimeEntryCreate):
+    """One row of POST /time-entries/bulk; bulk ingestion also bounds hours."""
+    hours: float = Field(gt=0, le=24)
+
+
+class TimeEntryBulkError(BaseModel):
+    index: int
+    status: str  # "invalid" | "duplicate" | "exists"
+    detail: str
+
+
+class TimeEntryBulkResult(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    skipped: int
+    errors: List[TimeEntryBulkError]
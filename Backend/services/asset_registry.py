@@ -0,0 +1,114 @@
+"""
+Process-wide registry of the images embedded in invoice PDFs.
+
+Every logo in COMPANY_PROFILES and every file in SIGNATURE_FILES is read and
+base64-encoded once, then served from memory. Files are re-stat'ed at most every
+ASSET_RELOAD_CHECK_SECONDS; a changed mtime/size reloads the entry, so
+replacing a PNG on the assets volume takes effect without a restart.
+"""
+import base64
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from services.invoice_config import COMPANY_PROFILES, LOGO_FILE, SIGNATURE_FILES, SIGNATURES_DIR
+
+logger = logging.getLogger(__name__)
+
+ASSET_RELOAD_CHECK_SECONDS = max(0.0, float(os.getenv("ASSET_RELOAD_CHECK_SECONDS", "5")))
+
+_MIME = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png"}
+
+
+@dataclass
+class _Entry:
+    mtime_ns: int
+    size: int
+    data_uri: Optional[str]  # None when the file is missing or unreadable
+    checked_at: float
+
+
+class AssetRegistry:
+    def __init__(self):
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def preload(self):
+        """Load every known logo and signature up front."""
+        paths = {LOGO_FILE, os.path.join(SIGNATURES_DIR, "signature_default.png")}
+        paths.update(p["logo_file"] for p in COMPANY_PROFILES.values() if p.get("logo_file"))
+        paths.update(os.path.join(SIGNATURES_DIR, f) for f in SIGNATURE_FILES.values())
+        for path in paths:
+            self._get(path)
+        logger.info(f"[Assets] Preloaded {len(paths)} PDF asset(s)")
+
+    def data_uri(self, path: str) -> Optional[str]:
+        """base64 data-URI for `path`, or None if the file is missing."""
+        return self._get(path).data_uri
+
+    def fingerprint(self, path: str) -> str:
+        """Cheap identity of the current file contents (used in PDF cache keys)."""
+        entry = self._get(path)
+        if entry.data_uri is None:
+            return f"{path}:missing"
+        return f"{path}:{entry.mtime_ns}:{entry.size}"
+
+    def _get(self, path: str) -> _Entry:
+        now = time.monotonic()
+        entry = self._entries.get(path)
+        if entry is not None and now - entry.checked_at < ASSET_RELOAD_CHECK_SECONDS:
+            self.hits += 1
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(path)
+            try:
+                st = os.stat(path)
+                stat_key = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stat_key = (0, 0)
+
+            if entry is not None and (entry.mtime_ns, entry.size) == stat_key:
+                entry.checked_at = now
+                self.hits += 1
+                return entry
+
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+                logger.info(f"[Assets] Reloading changed asset {path}")
+            entry = _Entry(stat_key[0], stat_key[1], _encode(path) if stat_key != (0, 0) else None, now)
+            self._entries[path] = entry
+            return entry
+
+    def stats(self) -> dict:
+        entries = list(self._entries.items())
+        return {
+            "entries": len(entries),
+            "missing": sum(1 for _, e in entries if e.data_uri is None),
+            "memory_bytes": sum(len(e.data_uri) for _, e in entries if e.data_uri),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+        }
+
+
+def _encode(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            data = base64.b64encode(f.read()).decode("ascii")
+    except OSError as exc:
+        logger.warning("Could not read image %s: %s", path, exc)
+        return None
+    ext = os.path.splitext(path)[1].lstrip(".").lower()
+    return f"data:{_MIME.get(ext, 'image/png')};base64,{data}"
+
+
+assets = AssetRegistry()
@@ -11,7 +11,7 @@ import logging
 from datetime import date
 from typing import Optional
 
-import httpx
+from utils.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -101,12 +101,11 @@ async def fetch_expense_reports(
 
     job_desc = _build_report_request(project_code, employee_email, date_from, date_to)
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            EXPENSIFY_BASE,
-            data={"requestJobDescription": json.dumps(job_desc)},
-        )
-        resp.raise_for_status()
+    resp = await http_clients.get("expensify").post(
+        EXPENSIFY_BASE,
+        data={"requestJobDescription": json.dumps(job_desc)},
+    )
+    resp.raise_for_status()
 
     raw = resp.text.strip()
 
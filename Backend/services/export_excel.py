@@ -1,8 +1,9 @@
 """Excel invoice export using openpyxl — IPC_Invoice_System_v4 structure."""
 from io import BytesIO
-from typing import Any
+from typing import Any, Iterable
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import (
     Font, PatternFill, Alignment, Border, Side, numbers
 )
@@ -368,10 +369,50 @@ def generate_invoice_xlsx(edit_data: dict) -> bytes:
     return buf.getvalue()
 
 
-def generate_invoices_report_xlsx(invoices_data: list) -> bytes:
+def generate_invoices_report_xlsx(invoices_data: Iterable[dict]) -> bytes:
+    """Generate a multi-invoice report .xlsx in memory. Returns raw bytes."""
+    buf = BytesIO()
+    write_invoices_report_xlsx(invoices_data, buf)
+    return buf.getvalue()
+
+
+def _wo_cell(ws, value=None, font=None, fill=None, alignment=None, border=None, number_format=None) -> WriteOnlyCell:
+    """Styled cell for write-only worksheets."""
+    c = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        c.font = font
+    if fill is not None:
+        c.fill = fill
+    if alignment is not None:
+        c.alignment = alignment
+    if border is not None:
+        c.border = border
+    if number_format is not None:
+        c.number_format = number_format
+    return c
+
+
+def _wo_data_row(ws, values: list[Any], stripe: bool = False) -> list:
+    """Write-only counterpart of _data_row."""
+    fill = STRIPE_FILL if stripe else PatternFill("solid", fgColor=WHITE)
+    border = _thin_border()
+    row = []
+    for col_idx, val in enumerate(values, 1):
+        money = isinstance(val, float) and col_idx > 1
+        row.append(_wo_cell(
+            ws, val, font=BODY_FONT, fill=fill, border=border,
+            alignment=RIGHT if money else LEFT,
+            number_format=MONEY_FMT if money else None,
+        ))
+    return row
+
+
+def write_invoices_report_xlsx(invoices_data: Iterable[dict], fileobj) -> None:
     """
-    Generate a multi-invoice report .xlsx. Returns raw bytes.
-    invoices_data: list of dicts with keys invoice, client, project, lines, expenses.
+    Stream a multi-invoice report .xlsx into `fileobj`.
+    invoices_data: iterable of dicts with keys invoice, client, project, lines, expenses.
+    It is consumed once; all three sheets are written in the same pass using
+    openpyxl write-only worksheets, so memory stays flat with invoice count.
 
     Sheet layout:
       1. Invoice_Detail  — full block per invoice (header + lines + expenses + totals)
@@ -391,92 +432,120 @@ def generate_invoices_report_xlsx(invoices_data: list) -> bytes:
     TOTAL_FILL     = PatternFill("solid", fgColor="FFdbeafe")    # pale blue for invoice total
     GRAND_FILL     = PatternFill("solid", fgColor="FF1e3a5f")
     GRAND_FONT     = Font(name="Calibri", bold=True, size=11, color="FFFFFFFF")
+    WHITE_FILL     = PatternFill("solid", fgColor=WHITE)
 
     NCOLS = 10  # A–J
 
-    def _merge_title(ws, row, value, fill, font, height=18):
-        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=NCOLS)
-        c = ws.cell(row=row, column=1, value=value)
-        c.font = font
-        c.fill = fill
-        c.alignment = LEFT
-        c.border = _thin_border()
-        ws.row_dimensions[row].height = height
-        # apply fill+border to merged tail cells too
-        for col in range(2, NCOLS + 1):
-            tc = ws.cell(row=row, column=col)
-            tc.fill = fill
-            tc.border = _thin_border()
-
-    def _meta_pair(ws, row, pairs: list):
-        """Write alternating label/value pairs across the row (up to 5 pairs = 10 cols)."""
-        for idx, (label, val) in enumerate(pairs):
-            col = idx * 2 + 1
-            lc = ws.cell(row=row, column=col, value=label)
-            lc.font = META_FONT
-            lc.fill = META_FILL
-            lc.alignment = LEFT
-            lc.border = _thin_border()
-            vc = ws.cell(row=row, column=col + 1, value=val)
-            vc.font = META_VAL_FONT
-            vc.fill = META_FILL
-            vc.alignment = LEFT
-            vc.border = _thin_border()
-        # fill remaining columns
-        filled = len(pairs) * 2
-        for col in range(filled + 1, NCOLS + 1):
-            tc = ws.cell(row=row, column=col)
-            tc.fill = META_FILL
-            tc.border = _thin_border()
-
-    def _section_header(ws, row, headers: list, ncols_override=None):
-        n = ncols_override or NCOLS
-        for col, h in enumerate(headers, 1):
-            c = ws.cell(row=row, column=col, value=h)
-            c.font = SEC_FONT
-            c.fill = SEC_FILL
-            c.alignment = CENTER
-            c.border = _thin_border()
-        for col in range(len(headers) + 1, n + 1):
-            ws.cell(row=row, column=col).fill = SEC_FILL
-
-    def _blank_row(ws, row):
-        for col in range(1, NCOLS + 1):
-            ws.cell(row=row, column=col).value = None
-
-    def _subtotal_row(ws, row, label, value, label_col=1, value_col=10):
-        for col in range(1, NCOLS + 1):
-            c = ws.cell(row=row, column=col)
-            c.fill = TOTAL_FILL
-            c.border = _thin_border()
-        lc = ws.cell(row=row, column=label_col, value=label)
-        lc.font = LABEL_FONT
-        lc.fill = TOTAL_FILL
-        vc = ws.cell(row=row, column=value_col, value=_money(value))
-        vc.font = TOTAL_FONT
-        vc.number_format = MONEY_FMT
-        vc.alignment = RIGHT
-        vc.fill = TOTAL_FILL
-
-    wb = Workbook()
-    wb.remove(wb.active)
+    wb = Workbook(write_only=True)
 
-    # ═══════════════════════ Sheet 1: Invoice_Detail ══════════════════════════
+    # Column widths, panes and grid lines must be set before the first append
     ws = wb.create_sheet("Invoice_Detail")
     ws.sheet_view.showGridLines = False
+    _set_col_widths(ws, {
+        "A": 22, "B": 22, "C": 9, "D": 11,
+        "E": 11, "F": 11, "G": 11, "H": 11,
+        "I": 11, "J": 11,
+    })
+    ws.freeze_panes = "A2"
+
+    ws_time = wb.create_sheet("Time_Detail")
+    ws_time.sheet_view.showGridLines = False
+    _set_col_widths(ws_time, {
+        "A": 14, "B": 8, "C": 24, "D": 22, "E": 20,
+        "F": 8,  "G": 11, "H": 11, "I": 10, "J": 10,
+        "K": 11, "L": 11,
+    })
+
+    ws_exp = wb.create_sheet("Expenses")
+    ws_exp.sheet_view.showGridLines = False
+    _set_col_widths(ws_exp, {
+        "A": 14, "B": 8, "C": 22, "D": 12, "E": 18,
+        "F": 18, "G": 26, "H": 18, "I": 13,
+        "J": 16, "K": 10, "L": 22,
+    })
+
+    # Sheet 1 rows are appended through this helper to keep the row counter
+    # (stripes, merges and heights are all addressed by row number)
+    cur = {"row": 0}
+
+    def _append(cells, height=None):
+        cur["row"] += 1
+        if height:
+            ws.row_dimensions[cur["row"]].height = height
+        ws.append(cells)
+
+    def _merge_title(value, fill, font, height=18):
+        row = cur["row"] + 1
+        ws.merged_cells.add(f"A{row}:{get_column_letter(NCOLS)}{row}")
+        cells = [_wo_cell(ws, value, font=font, fill=fill, alignment=LEFT, border=_thin_border())]
+        cells += [_wo_cell(ws, fill=fill, border=_thin_border()) for _ in range(2, NCOLS + 1)]
+        _append(cells, height)
+
+    def _meta_pair(pairs: list):
+        """Write alternating label/value pairs across the row (up to 5 pairs = 10 cols)."""
+        cells = []
+        for label, val in pairs:
+            cells.append(_wo_cell(ws, label, font=META_FONT, fill=META_FILL, alignment=LEFT, border=_thin_border()))
+            cells.append(_wo_cell(ws, val, font=META_VAL_FONT, fill=META_FILL, alignment=LEFT, border=_thin_border()))
+        cells += [_wo_cell(ws, fill=META_FILL, border=_thin_border()) for _ in range(len(cells) + 1, NCOLS + 1)]
+        _append(cells)
+
+    def _section_header(headers: list):
+        cells = [_wo_cell(ws, h, font=SEC_FONT, fill=SEC_FILL, alignment=CENTER, border=_thin_border()) for h in headers]
+        cells += [_wo_cell(ws, fill=SEC_FILL) for _ in range(len(headers) + 1, NCOLS + 1)]
+        _append(cells)
+
+    def _blank_row():
+        _append([])
+
+    def _subtotal_row(label, value):
+        cells = [_wo_cell(ws, label, font=LABEL_FONT, fill=TOTAL_FILL, border=_thin_border())]
+        cells += [_wo_cell(ws, fill=TOTAL_FILL, border=_thin_border()) for _ in range(2, NCOLS)]
+        cells.append(_wo_cell(ws, _money(value), font=TOTAL_FONT, fill=TOTAL_FILL, alignment=RIGHT,
+                              border=_thin_border(), number_format=MONEY_FMT))
+        _append(cells)
+
+    def _detail_row(vals: list):
+        fill = STRIPE_FILL if (cur["row"] + 1) % 2 == 0 else WHITE_FILL
+        _append([
+            _wo_cell(ws, val, font=BODY_FONT, fill=fill, border=_thin_border(),
+                     alignment=RIGHT if isinstance(val, float) else LEFT,
+                     number_format=MONEY_FMT if isinstance(val, float) else None)
+            for val in vals
+        ])
 
-    # Report title
+    # ═══════════════════════ Headers ══════════════════════════════════════════
     today_str = dt.date.today().strftime("%B %d, %Y")
-    _merge_title(ws, 1, f"INVOICES REPORT  ·  Impact Point Co., LLC  ·  {today_str}",
+    _merge_title(f"INVOICES REPORT  ·  Impact Point Co., LLC  ·  {today_str}",
                  INV_TITLE_FILL, INV_TITLE_FONT, height=24)
+    _blank_row()
+
+    ws_time.append([
+        _wo_cell(ws_time, h, font=HEADER_FONT, fill=BLUE_FILL, alignment=CENTER, border=_thin_border())
+        for h in [
+            "Invoice #", "Company", "Project", "Employee", "Title",
+            "Hours", "Rate (USD)", "Subtotal", "Disc. Type", "Disc. Value",
+            "Disc. ($)", "Total",
+        ]
+    ])
+    ws_exp.append([
+        _wo_cell(ws_exp, h, font=HEADER_FONT, fill=BLUE_FILL, alignment=CENTER, border=_thin_border())
+        for h in [
+            "Invoice #", "Company", "Project", "Date", "Professional",
+            "Vendor", "Description", "Category", "Amount (USD)",
+            "Payment Source", "Receipt", "Notes",
+        ]
+    ])
+    time_row = 2
+    exp_row = 2
 
-    cur_row = 3  # start after title + blank
-
+    invoice_count = 0
     grand_fees = 0.0
     grand_exp  = 0.0
     grand_tot  = 0.0
 
     for data in invoices_data:
+        invoice_count += 1
         inv     = data.get("invoice", {})
         client  = data.get("client") or {}
         project = data.get("project") or {}
@@ -490,36 +559,30 @@ def generate_invoices_report_xlsx(invoices_data: list) -> bytes:
         cli_name  = client.get("name", "—")
 
         # ── Invoice title bar ─────────────────────────────────────────────
-        _merge_title(ws, cur_row,
-                     f"  #{inv_num}   {proj_name}   |   {cli_name}   [{company}]",
+        _merge_title(f"  #{inv_num}   {proj_name}   |   {cli_name}   [{company}]",
                      INV_TITLE_FILL, INV_TITLE_FONT, height=20)
-        cur_row += 1
 
         # ── Meta row 1: status, period, issue, due ────────────────────────
-        _meta_pair(ws, cur_row, [
+        _meta_pair([
             ("Status",       status),
             ("Period",       f"{inv.get('period_start') or '—'}  →  {inv.get('period_end') or '—'}"),
             ("Issue Date",   str(inv.get("issue_date") or "—")),
             ("Due Date",     str(inv.get("due_date") or "—")),
             ("Cap Amount",   f"${_money(inv.get('cap_amount', 0)):,.2f}" if inv.get("cap_amount") else "—"),
         ])
-        cur_row += 1
 
         # ── Meta row 2: client contact, notes ─────────────────────────────
         notes_val = (inv.get("notes") or "")[:60] or "—"
-        _meta_pair(ws, cur_row, [
+        _meta_pair([
             ("Client Email",   client.get("email") or "—"),
             ("Client Phone",   client.get("phone") or "—"),
             ("Signatory",      inv.get("signatory_name") or "—"),
             ("Notes",          notes_val),
         ])
-        cur_row += 1
 
         # ── Lines sub-table ───────────────────────────────────────────────
-        _section_header(ws, cur_row,
-                        ["Employee", "Title", "Hours", "Rate (USD)",
+        _section_header(["Employee", "Title", "Hours", "Rate (USD)",
                          "Subtotal", "Disc. Type", "Disc. Value", "Disc. ($)", "Net Total", ""])
-        cur_row += 1
 
         lines_net = 0.0
         for line in lines:
@@ -531,44 +594,35 @@ def generate_invoices_report_xlsx(invoices_data: list) -> bytes:
             disc_dol  = (subtotal * disc_val / 100) if disc_type == "percent" else disc_val
             net       = max(0.0, subtotal - disc_dol)
             lines_net += net
-            stripe = cur_row % 2 == 0
-            fill   = STRIPE_FILL if stripe else PatternFill("solid", fgColor=WHITE)
-            vals   = [
+            _detail_row([
                 line.get("employee_name", ""),
                 line.get("title", ""),
                 hours, rate, subtotal,
                 disc_type, disc_val, disc_dol, net, "",
-            ]
-            for col_idx, val in enumerate(vals, 1):
-                c = ws.cell(row=cur_row, column=col_idx, value=val)
-                c.font  = BODY_FONT
-                c.fill  = fill
-                c.border = _thin_border()
-                c.alignment = RIGHT if isinstance(val, float) else LEFT
-                if isinstance(val, float):
-                    c.number_format = MONEY_FMT
-            cur_row += 1
+            ])
+
+            # Sheet 2: flat time detail
+            ws_time.append(_wo_data_row(ws_time, [
+                f"#{inv_num}", company, project.get("name", ""),
+                line.get("employee_name", ""), line.get("title", ""),
+                hours, rate, subtotal, disc_type, disc_val, disc_dol, net,
+            ], stripe=time_row % 2 == 0))
+            time_row += 1
 
         # Lines subtotal
-        _subtotal_row(ws, cur_row, "Lines Net Total", lines_net)
-        cur_row += 1
+        _subtotal_row("Lines Net Total", lines_net)
         grand_fees += lines_net
 
         # ── Expenses sub-table (only if present) ──────────────────────────
         exp_total = 0.0
         if expenses:
-            _blank_row(ws, cur_row)
-            cur_row += 1
-            _section_header(ws, cur_row,
-                            ["Date", "Professional", "Vendor", "Description",
+            _blank_row()
+            _section_header(["Date", "Professional", "Vendor", "Description",
                              "Category", "Amount (USD)", "Payment Source", "Receipt", "Notes", ""])
-            cur_row += 1
             for exp in expenses:
                 amount = _money(exp.get("amount_usd", 0))
                 exp_total += amount
-                stripe = cur_row % 2 == 0
-                fill   = STRIPE_FILL if stripe else PatternFill("solid", fgColor=WHITE)
-                vals   = [
+                _detail_row([
                     str(exp.get("date") or ""),
                     exp.get("professional") or "",
                     exp.get("vendor") or "",
@@ -579,151 +633,52 @@ def generate_invoices_report_xlsx(invoices_data: list) -> bytes:
                     "Yes" if exp.get("receipt_attached") else "No",
                     exp.get("notes") or "",
                     "",
-                ]
-                for col_idx, val in enumerate(vals, 1):
-                    c = ws.cell(row=cur_row, column=col_idx, value=val)
-                    c.font   = BODY_FONT
-                    c.fill   = fill
-                    c.border = _thin_border()
-                    c.alignment = RIGHT if isinstance(val, float) else LEFT
-                    if isinstance(val, float):
-                        c.number_format = MONEY_FMT
-                cur_row += 1
-            _subtotal_row(ws, cur_row, "Expenses Total", exp_total)
-            cur_row += 1
+                ])
+
+                # Sheet 3: flat expenses
+                ws_exp.append(_wo_data_row(ws_exp, [
+                    f"#{inv_num}", company, project.get("name", ""),
+                    str(exp.get("date") or ""),
+                    exp.get("professional") or "",
+                    exp.get("vendor") or "",
+                    exp.get("description") or "",
+                    exp.get("category") or "",
+                    amount,
+                    exp.get("payment_source") or "",
+                    "Yes" if exp.get("receipt_attached") else "No",
+                    exp.get("notes") or "",
+                ], stripe=exp_row % 2 == 0))
+                exp_row += 1
+            _subtotal_row("Expenses Total", exp_total)
             grand_exp += exp_total
 
         # ── Invoice grand total ────────────────────────────────────────────
         inv_total = _money(inv.get("total", 0)) + exp_total
         grand_tot += inv_total
-        for col in range(1, NCOLS + 1):
-            c = ws.cell(row=cur_row, column=col)
-            c.fill   = INV_TITLE_FILL
-            c.border = _thin_border()
-        lc = ws.cell(row=cur_row, column=1, value=f"INVOICE TOTAL  #{inv_num}")
-        lc.font = INV_TITLE_FONT
-        lc.fill = INV_TITLE_FILL
-        vc = ws.cell(row=cur_row, column=NCOLS, value=_money(inv_total))
-        vc.font = INV_TITLE_FONT
-        vc.number_format = MONEY_FMT
-        vc.alignment = RIGHT
-        vc.fill = INV_TITLE_FILL
-        cur_row += 1
+        cells = [_wo_cell(ws, f"INVOICE TOTAL  #{inv_num}", font=INV_TITLE_FONT, fill=INV_TITLE_FILL,
+                          border=_thin_border())]
+        cells += [_wo_cell(ws, fill=INV_TITLE_FILL, border=_thin_border()) for _ in range(2, NCOLS)]
+        cells.append(_wo_cell(ws, _money(inv_total), font=INV_TITLE_FONT, fill=INV_TITLE_FILL,
+                              alignment=RIGHT, border=_thin_border(), number_format=MONEY_FMT))
+        _append(cells)
 
         # ── Spacer between invoices ────────────────────────────────────────
-        _blank_row(ws, cur_row)
-        cur_row += 1
-        _blank_row(ws, cur_row)
-        cur_row += 1
+        _blank_row()
+        _blank_row()
 
     # ── Grand total row ────────────────────────────────────────────────────
-    for col in range(1, NCOLS + 1):
-        c = ws.cell(row=cur_row, column=col)
-        c.fill   = GRAND_FILL
-        c.border = _thin_border()
-    ws.row_dimensions[cur_row].height = 20
-    lc = ws.cell(row=cur_row, column=1,
-                 value=f"GRAND TOTAL  ({len(invoices_data)} invoices)")
-    lc.font = GRAND_FONT
-    lc.fill = GRAND_FILL
+    cells = [_wo_cell(ws, f"GRAND TOTAL  ({invoice_count} invoices)", font=GRAND_FONT, fill=GRAND_FILL,
+                      border=_thin_border())]
+    cells += [_wo_cell(ws, fill=GRAND_FILL, border=_thin_border()) for _ in range(2, NCOLS + 1)]
     for col, label, val in [
         (6, "Fees",     grand_fees),
         (8, "Expenses", grand_exp),
         (10, "TOTAL",   grand_tot),
     ]:
-        hc = ws.cell(row=cur_row, column=col - 1, value=label)
-        hc.font = Font(name="Calibri", bold=True, size=9, color="FFbfdbfe")
-        hc.fill = GRAND_FILL
-        hc.alignment = RIGHT
-        vc = ws.cell(row=cur_row, column=col, value=_money(val))
-        vc.font = GRAND_FONT
-        vc.fill = GRAND_FILL
-        vc.number_format = MONEY_FMT
-        vc.alignment = RIGHT
-
-    _set_col_widths(ws, {
-        "A": 22, "B": 22, "C": 9, "D": 11,
-        "E": 11, "F": 11, "G": 11, "H": 11,
-        "I": 11, "J": 11,
-    })
-    ws.freeze_panes = "A2"
-
-    # ═══════════════════════ Sheet 2: Time_Detail ═════════════════════════════
-    ws_time = wb.create_sheet("Time_Detail")
-    ws_time.sheet_view.showGridLines = False
-
-    headers_time = [
-        "Invoice #", "Company", "Project", "Employee", "Title",
-        "Hours", "Rate (USD)", "Subtotal", "Disc. Type", "Disc. Value",
-        "Disc. ($)", "Total",
-    ]
-    _header_row(ws_time, 1, headers_time)
-
-    row = 2
-    for data in invoices_data:
-        inv     = data.get("invoice", {})
-        project = data.get("project") or {}
-        inv_num = inv.get("invoice_number") or inv.get("id", "")[:8]
-        company = inv.get("owner_company") or "IPC"
-        for line in data.get("lines", []):
-            hours     = _money(line.get("hours", 0))
-            rate      = _money(line.get("hourly_rate", 0))
-            subtotal  = hours * rate
-            disc_type = line.get("discount_type") or "amount"
-            disc_val  = _money(line.get("discount_value", 0))
-            disc_dol  = (subtotal * disc_val / 100) if disc_type == "percent" else disc_val
-            net       = max(0.0, subtotal - disc_dol)
-            _data_row(ws_time, row, [
-                f"#{inv_num}", company, project.get("name", ""),
-                line.get("employee_name", ""), line.get("title", ""),
-                hours, rate, subtotal, disc_type, disc_val, disc_dol, net,
-            ], stripe=row % 2 == 0)
-            row += 1
-
-    _set_col_widths(ws_time, {
-        "A": 14, "B": 8, "C": 24, "D": 22, "E": 20,
-        "F": 8,  "G": 11, "H": 11, "I": 10, "J": 10,
-        "K": 11, "L": 11,
-    })
-
-    # ═══════════════════════ Sheet 3: Expenses ════════════════════════════════
-    ws_exp = wb.create_sheet("Expenses")
-    ws_exp.sheet_view.showGridLines = False
-
-    headers_exp = [
-        "Invoice #", "Company", "Project", "Date", "Professional",
-        "Vendor", "Description", "Category", "Amount (USD)",
-        "Payment Source", "Receipt", "Notes",
-    ]
-    _header_row(ws_exp, 1, headers_exp)
-
-    row = 2
-    for data in invoices_data:
-        inv     = data.get("invoice", {})
-        project = data.get("project") or {}
-        inv_num = inv.get("invoice_number") or inv.get("id", "")[:8]
-        company = inv.get("owner_company") or "IPC"
-        for exp in data.get("expenses", []):
-            _data_row(ws_exp, row, [
-                f"#{inv_num}", company, project.get("name", ""),
-                str(exp.get("date") or ""),
-                exp.get("professional") or "",
-                exp.get("vendor") or "",
-                exp.get("description") or "",
-                exp.get("category") or "",
-                _money(exp.get("amount_usd", 0)),
-                exp.get("payment_source") or "",
-                "Yes" if exp.get("receipt_attached") else "No",
-                exp.get("notes") or "",
-            ], stripe=row % 2 == 0)
-            row += 1
+        cells[col - 2] = _wo_cell(ws, label, font=Font(name="Calibri", bold=True, size=9, color="FFbfdbfe"),
+                                  fill=GRAND_FILL, alignment=RIGHT, border=_thin_border())
+        cells[col - 1] = _wo_cell(ws, _money(val), font=GRAND_FONT, fill=GRAND_FILL, alignment=RIGHT,
+                                  border=_thin_border(), number_format=MONEY_FMT)
+    _append(cells, height=20)
 
-    _set_col_widths(ws_exp, {
-        "A": 14, "B": 8, "C": 22, "D": 12, "E": 18,
-        "F": 18, "G": 26, "H": 18, "I": 13,
-        "J": 16, "K": 10, "L": 22,
-    })
-
-    buf = BytesIO()
-    wb.save(buf)
-    return buf.getvalue()
+    wb.save(fileobj)
@@ -0,0 +1,238 @@
+"""
+Background export jobs.
+
+POST /exports creates an export_jobs row and hands its id to a worker pool;
+the worker renders the PDF/XLSX into EXPORT_DIR and records the result on
+the row. Clients poll the row and download the file through the authenticated
+route; EXPORT_DIR must stay outside UPLOAD_DIR, which is served as static
+files without auth.
+
+Backends (EXPORT_JOB_BACKEND):
+  process — ProcessPoolExecutor (spawned workers, own DB engine). Default.
+  thread  — ThreadPoolExecutor in the API process.
+  inline  — render synchronously inside create_export_job (tests).
+
+EXPORT_MAX_CONCURRENCY bounds the pool size; finished artifacts older than
+EXPORT_RETENTION_HOURS are evicted hourly together with their rows. A job
+still running EXPORT_JOB_TIMEOUT_MINUTES after it started (or queued that long
+after it was created), with no worker future pending for it in this process,
+is marked failed.
+"""
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.export_jobs import ExportJob
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(os.path.dirname(__file__), "..", "artifacts", "exports"))
+EXPORT_JOB_BACKEND = os.getenv("EXPORT_JOB_BACKEND", "process")  # process | thread | inline
+EXPORT_MAX_CONCURRENCY = max(1, int(os.getenv("EXPORT_MAX_CONCURRENCY", "2")))
+EXPORT_RETENTION_HOURS = max(1, int(os.getenv("EXPORT_RETENTION_HOURS", "24")))
+EXPORT_JOB_TIMEOUT_MINUTES = max(1, int(os.getenv("EXPORT_JOB_TIMEOUT_MINUTES", "30")))
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+_executor: Optional[Executor] = None
+_futures: dict = {}  # job id -> Future, while submitted from this process
+
+
+def _get_executor() -> Optional[Executor]:
+    global _executor
+    if _executor is None and EXPORT_JOB_BACKEND != "inline":
+        if EXPORT_JOB_BACKEND == "thread":
+            _executor = ThreadPoolExecutor(max_workers=EXPORT_MAX_CONCURRENCY, thread_name_prefix="export")
+        else:
+            # spawn: children build their own engine instead of inheriting pooled sockets
+            _executor = ProcessPoolExecutor(
+                max_workers=EXPORT_MAX_CONCURRENCY,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _executor
+
+
+def shutdown_export_workers():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# ── Job lifecycle ─────────────────────────────────────────────────────────────
+
+def create_export_job(db: Session, kind: str, params: dict) -> ExportJob:
+    job = ExportJob(kind=kind, params=json.dumps(params), status="queued")
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    executor = _get_executor()
+    if executor is None:
+        run_export_job(job.id)
+        db.refresh(job)
+    else:
+        job_id = job.id
+        future = executor.submit(run_export_job, job_id)
+        _futures[job_id] = future
+        future.add_done_callback(lambda _: _futures.pop(job_id, None))
+    return job
+
+
+def get_export_job(db: Session, job_id: str) -> Optional[ExportJob]:
+    return db.query(ExportJob).filter(ExportJob.id == job_id).first()
+
+
+def run_export_job(job_id: str) -> None:
+    """Worker entry point — must stay a module-level function (pickled by id)."""
+    from config.database import ExportSessionLocal, ReadSessionLocal
+    import models  # noqa - register all mappers in spawned workers
+
+    db = ExportSessionLocal()
+    try:
+        job = get_export_job(db, job_id)
+        if not job or job.status != "queued":
+            return
+        kind, params = job.kind, json.loads(job.params or "{}")
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        db.commit()
+
+        # Rendering gets its own session: the report loader clears its session between batches.
+        # It only reads, so it goes to the replica when one is healthy
+        render_db = ReadSessionLocal(fallback=ExportSessionLocal)
+        file_path = None
+        try:
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            file_name, media_type, ext = _render(render_db, kind, params, job_id)
+            file_path = os.path.join(EXPORT_DIR, f"{job_id}{ext}")
+            result = {
+                "status": "done",
+                "file_name": file_name,
+                "media_type": media_type,
+                "file_path": file_path,
+                "file_size": os.path.getsize(file_path),
+            }
+        except Exception as e:
+            db.rollback()
+            # _render may have opened its output before failing; nothing would evict it
+            for ext in (".pdf", ".xlsx"):
+                _remove_file(os.path.join(EXPORT_DIR, f"{job_id}{ext}"))
+            result = {"status": "error", "error_message": str(e)}
+            logger.error(f"[Exports] Job {job_id} ({kind}) failed: {e}")
+        finally:
+            render_db.close()
+
+        # Only a job still marked running is finished here; one the eviction
+        # sweep already failed as timed out stays failed
+        result["finished_at"] = datetime.now(timezone.utc)
+        finished = db.query(ExportJob).filter(
+            ExportJob.id == job_id, ExportJob.status == "running",
+        ).update(result, synchronize_session=False)
+        db.commit()
+        if not finished:
+            logger.warning(f"[Exports] Job {job_id} was failed while rendering; discarding its result")
+            if file_path:
+                _remove_file(file_path)
+    finally:
+        db.close()
+
+
+def _render(db: Session, kind: str, params: dict, job_id: str) -> tuple[str, str, str]:
+    """Render the artifact to EXPORT_DIR/<job_id><ext>. Returns (file_name, media_type, ext)."""
+    from services.invoice_edit_data import build_edit_data, iter_edit_data
+
+    if kind == "invoices_report":
+        from services.invoice import get_invoice_ids
+        from services.export_excel import write_invoices_report_xlsx
+
+        invoice_ids = get_invoice_ids(db, status=params.get("status"), company=params.get("company"))
+        with open(os.path.join(EXPORT_DIR, f"{job_id}.xlsx"), "wb") as f:
+            write_invoices_report_xlsx(iter_edit_data(db, invoice_ids), f)
+        return f"Invoices_Report_{datetime.now().date()}.xlsx", XLSX_MEDIA_TYPE, ".xlsx"
+
+    edit_data = build_edit_data(db, params.get("invoice_id") or "")
+    if not edit_data:
+        raise ValueError("Invoice not found")
+    inv = edit_data["invoice"]
+    inv_label = inv["invoice_number"] or inv["id"][:8]
+
+    if kind == "invoice_pdf":
+        from services.pdf_cache import get_invoice_pdf
+        content, media_type, ext = get_invoice_pdf(edit_data), "application/pdf", ".pdf"
+    elif kind == "invoice_xlsx":
+        from services.export_excel import generate_invoice_xlsx
+        content, media_type, ext = generate_invoice_xlsx(edit_data), XLSX_MEDIA_TYPE, ".xlsx"
+    else:
+        raise ValueError(f"Unknown export kind: {kind}")
+
+    with open(os.path.join(EXPORT_DIR, f"{job_id}{ext}"), "wb") as f:
+        f.write(content)
+    return f"INV-{inv_label}{ext}", media_type, ext
+
+
+# ── Retention ─────────────────────────────────────────────────────────────────
+
+def evict_expired_exports(db: Session) -> int:
+    """
+    Delete artifacts + rows older than EXPORT_RETENTION_HOURS and fail jobs
+    stuck in queued/running past EXPORT_JOB_TIMEOUT_MINUTES (e.g. a worker died).
+    Returns the number of evicted jobs.
+    """
+    now = datetime.now(timezone.utc)
+
+    stuck = db.query(ExportJob).filter(
+        ExportJob.status.in_(["queued", "running"]),
+        func.coalesce(ExportJob.started_at, ExportJob.created_at) < now - timedelta(minutes=EXPORT_JOB_TIMEOUT_MINUTES),
+    ).all()
+    for job in stuck:
+        future = _futures.get(job.id)
+        if future is not None and not future.done():
+            continue
+        job.status = "error"
+        job.error_message = "Timed out"
+        job.finished_at = now
+
+    expired = db.query(ExportJob).filter(
+        ExportJob.created_at < now - timedelta(hours=EXPORT_RETENTION_HOURS),
+        ExportJob.status.in_(["done", "error"]),
+    ).all()
+    for job in expired:
+        if job.file_path and not _remove_file(job.file_path):
+            continue
+        db.delete(job)
+    db.commit()
+    if expired:
+        logger.info(f"[Exports] Evicted {len(expired)} expired export(s)")
+    return len(expired)
+
+
+def _remove_file(path: str) -> bool:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"[Exports] Could not remove {path}: {e}")
+        return False
+    return True
+
+
+def evict_expired_exports_job():
+    """APScheduler entry point."""
+    from config.database import SchedulerSessionLocal
+
+    db = SchedulerSessionLocal()
+    try:
+        evict_expired_exports(db)
+    except Exception as e:
+        logger.error(f"[Exports] Eviction failed: {e}")
+    finally:
+        db.close()
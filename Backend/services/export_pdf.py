@@ -6,7 +6,7 @@ Produces a 2-page PDF:
   Page 2 — Invoice detail: period, fees table, total-due box, ACH instructions.
 """
 
-import base64
+import hashlib
 import logging
 import os
 import re
@@ -16,6 +16,7 @@ from typing import Optional
 
 from xhtml2pdf import pisa
 
+from services.asset_registry import assets
 from services.invoice_config import (
     ASSETS_DIR, SIGNATURES_DIR, LOGOS_DIR, LOGO_FILE,
     SIGNATURE_FILES, COMPANY_INFO, BANK_INFO, COMPANY_PROFILES,
@@ -54,31 +55,47 @@ def _sanitize_filename(name: str) -> str:
 
 
 def _get_image_base64(filepath: str) -> Optional[str]:
-    """Read an image file and return a base64 data-URI string, or None if missing."""
-    try:
-        if not os.path.isfile(filepath):
-            return None
-        with open(filepath, "rb") as f:
-            data = base64.b64encode(f.read()).decode("ascii")
-        ext = os.path.splitext(filepath)[1].lstrip(".").lower()
-        mime = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png"}.get(ext, "image/png")
-        return f"data:{mime};base64,{data}"
-    except Exception as exc:
-        logger.warning("Could not read image %s: %s", filepath, exc)
-        return None
+    """Base64 data-URI for an image file (served from the asset registry), or None if missing."""
+    return assets.data_uri(filepath)
 
 
-def _get_signature_base64(signatory_name: str) -> Optional[str]:
-    """Look up the signature file for a signatory and return base64 data-URI."""
+def _signature_path(signatory_name: str) -> str:
+    """Signature file for a signatory, falling back to signature_default.png."""
     filename = SIGNATURE_FILES.get(signatory_name)
     if filename:
         path = os.path.join(SIGNATURES_DIR, filename)
-        result = _get_image_base64(path)
-        if result:
-            return result
-    # Fallback
-    fallback = os.path.join(SIGNATURES_DIR, "signature_default.png")
-    return _get_image_base64(fallback)
+        if assets.data_uri(path):
+            return path
+    return os.path.join(SIGNATURES_DIR, "signature_default.png")
+
+
+def _get_signature_base64(signatory_name: str) -> Optional[str]:
+    """Look up the signature file for a signatory and return base64 data-URI."""
+    return _get_image_base64(_signature_path(signatory_name))
+
+
+def _logo_path(owner_company: str) -> str:
+    profile = COMPANY_PROFILES.get(owner_company, COMPANY_PROFILES["IPC"])
+    return profile.get("logo_file") or LOGO_FILE
+
+
+def invoice_asset_paths(edit_data: dict) -> list[str]:
+    """Image files embedded in the PDF for this invoice (logo, signature)."""
+    invoice = edit_data.get("invoice", {})
+    paths = [_logo_path(invoice.get("owner_company") or "IPC")]
+    if invoice.get("signatory_name"):
+        paths.append(_signature_path(invoice["signatory_name"]))
+    return paths
+
+
+def invoice_render_config(edit_data: dict) -> dict:
+    """Configuration the PDF is rendered from besides edit_data: company profile (with bank) and signatory."""
+    invoice = edit_data.get("invoice", {})
+    owner_company = invoice.get("owner_company") or "IPC"
+    return {
+        "profile": COMPANY_PROFILES.get(owner_company, COMPANY_PROFILES["IPC"]),
+        "signature_file": SIGNATURE_FILES.get(invoice.get("signatory_name") or ""),
+    }
 
 
 # ── HTML Template ─────────────────────────────────────────────────────────────
@@ -395,6 +412,15 @@ _INVOICE_HTML_TEMPLATE = """<!DOCTYPE html>
 
 # ── Template data builder ─────────────────────────────────────────────────────
 
+# Part of the PDF cache key. Template edits change it automatically, and so
+# do invoice_config changes (see invoice_render_config); bump _RENDER_REVISION
+# when generate_invoice_html() changes what it emits.
+_RENDER_REVISION = "1"
+TEMPLATE_VERSION = hashlib.sha256(
+    (_RENDER_REVISION + _INVOICE_HTML_TEMPLATE).encode("utf-8")
+).hexdigest()[:16]
+
+
 def _build_professional_rows(lines: list) -> tuple[str, float, float, float]:
     """
     Build HTML <tr> rows for the fees table.
@@ -476,7 +502,7 @@ def generate_invoice_html(edit_data: dict) -> str:
     bank = profile["bank"]
 
     # ── Logo ──────────────────────────────────────────────────────────────────
-    logo_file = profile.get("logo_file") or LOGO_FILE
+    logo_file = _logo_path(owner_company)
     logo_uri = _get_image_base64(logo_file)
     if logo_uri is None and owner_company != "IPC":
         logger.warning("⚠️ %s not found in assets/logos/ — using text fallback", logo_file)
@@ -0,0 +1,207 @@
+"""
+Bulk invoice PDF export as a streamed ZIP archive.
+
+Invoices are loaded in batches (iter_edit_data), rendered across a pool of
+worker processes, and each PDF is written into the archive as soon as it
+finishes, so the response starts before the last invoice is rendered.
+manifest.json at the end of the archive lists every requested invoice with
+its file name or the error that prevented rendering it.
+
+All exports share one process pool of BULK_PDF_WORKERS workers, created on
+first use and shut down with the app (1 renders in the calling thread). At
+most BULK_PDF_MAX_CONCURRENT_EXPORTS archives are built at once; further
+requests get BulkExportBusy.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import weakref
+import zipfile
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+BULK_PDF_WORKERS = max(1, int(os.getenv("BULK_PDF_WORKERS", "4")))
+BULK_PDF_MAX_CONCURRENT_EXPORTS = max(1, int(os.getenv("BULK_PDF_MAX_CONCURRENT_EXPORTS", "2")))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_export_slots = threading.BoundedSemaphore(BULK_PDF_MAX_CONCURRENT_EXPORTS)
+
+
+class BulkExportBusy(Exception):
+    pass
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        # A worker that died (e.g. OOM) breaks the whole pool; start a fresh one
+        if _pool is not None and getattr(_pool, "_broken", False):
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            # spawn: children build their own engine instead of inheriting pooled sockets
+            _pool = ProcessPoolExecutor(
+                max_workers=BULK_PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_bulk_pdf_workers():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+class _ExportSlot:
+    """One of the BULK_PDF_MAX_CONCURRENT_EXPORTS permits; released once."""
+
+    def __init__(self):
+        if not _export_slots.acquire(blocking=False):
+            raise BulkExportBusy(f"{BULK_PDF_MAX_CONCURRENT_EXPORTS} bulk PDF exports are already running")
+        self._held = True
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            if self._held:
+                self._held = False
+                _export_slots.release()
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object; zipfile falls back to data descriptors."""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def write(self, data) -> int:
+        self._buf += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buf)
+        self._buf.clear()
+        return data
+
+
+def _render_pdf(edit_data: dict) -> bytes:
+    """Worker entry point — module-level so it can be pickled."""
+    from services.pdf_cache import get_invoice_pdf
+    return get_invoice_pdf(edit_data)
+
+
+def _file_name(edit_data: dict, used: Counter) -> str:
+    inv = edit_data["invoice"]
+    base = f"INV-{inv['invoice_number'] or inv['id'][:8]}"
+    used[base] += 1
+    return f"{base}.pdf" if used[base] == 1 else f"{base}-{used[base]}.pdf"
+
+
+def stream_invoices_pdf_zip(invoice_ids: list[str]) -> Iterator[bytes]:
+    """
+    Yield the bytes of a ZIP archive with one PDF per invoice plus manifest.json.
+    Raises BulkExportBusy right away when no export slot is free. Opens its
+    own DB session so it can run after the request's session closed.
+    """
+    slot = _ExportSlot()
+    stream = _stream_pdf_zip(invoice_ids, slot)
+    # A response that is never iterated never runs the generator's finally
+    weakref.finalize(stream, slot.release)
+    return stream
+
+
+def _stream_pdf_zip(invoice_ids: list[str], slot: _ExportSlot) -> Iterator[bytes]:
+    from config.database import ExportSessionLocal, ReadSessionLocal
+    from services.invoice_edit_data import iter_edit_data
+
+    sink = _ChunkSink()
+    manifest = []
+    used_names: Counter = Counter()
+    found = set()
+
+    db = ReadSessionLocal(fallback=ExportSessionLocal)
+    try:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+            def add(edit_data: dict, render):
+                inv = edit_data["invoice"]
+                entry = {"invoice_id": inv["id"], "invoice_number": inv["invoice_number"]}
+                try:
+                    pdf = render()
+                    entry["file"] = _file_name(edit_data, used_names)
+                    zf.writestr(entry["file"], pdf)
+                    entry["status"] = "ok"
+                except Exception as e:
+                    logger.error(f"[BulkPdf] Invoice {inv['id']} failed: {e}")
+                    entry["status"] = "error"
+                    entry["error"] = str(e)
+                manifest.append(entry)
+
+            edit_data_iter = iter_edit_data(db, invoice_ids)
+            if BULK_PDF_WORKERS == 1:
+                for edit_data in edit_data_iter:
+                    found.add(edit_data["invoice"]["id"])
+                    add(edit_data, lambda d=edit_data: _render_pdf(d))
+                    yield sink.drain()
+            else:
+                for edit_data, future in _bounded_map(_get_pool(), edit_data_iter, BULK_PDF_WORKERS * 2):
+                    found.add(edit_data["invoice"]["id"])
+                    add(edit_data, future.result)
+                    yield sink.drain()
+
+            for invoice_id in invoice_ids:
+                if invoice_id not in found:
+                    manifest.append({"invoice_id": invoice_id, "status": "error", "error": "Invoice not found"})
+
+            statuses = Counter(e["status"] for e in manifest)
+            zf.writestr("manifest.json", json.dumps({
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "requested": len(invoice_ids),
+                "exported": statuses["ok"],
+                "failed": statuses["error"],
+                "invoices": manifest,
+            }, indent=2, default=str))
+        yield sink.drain()
+    finally:
+        db.close()
+        slot.release()
+
+
+def _bounded_map(executor, items: Iterable[dict], window: int):
+    """
+    Submit at most `window` renders at a time; yield (item, future) in
+    completion order. Renders still queued when the consumer stops (client
+    disconnected) are cancelled so they don't hold the shared pool.
+    """
+    pending = {}
+    items = iter(items)
+    exhausted = False
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < window:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(_render_pdf, item)] = item
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+    finally:
+        for future in pending:
+            future.cancel()
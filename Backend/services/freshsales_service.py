@@ -3,29 +3,56 @@ FreshSales CRM API integration service.
 
 Docs: https://developers.freshworks.com/crm/api/
 Authentication: Token token={API_KEY} header.
+
+Every request goes through one process-wide token bucket. A 429 pauses it
+for the server's Retry-After, and an exhausted X-RateLimit-Remaining pauses it
+until X-RateLimit-Reset, so concurrent callers back off together instead of
+each retrying into the limit. FreshSales quotas are per plan and per hour, so
+by default the bucket only applies those pauses; set
+FRESHSALES_RATE_PER_SECOND (bursts of FRESHSALES_RATE_BURST) to also pace
+requests up front.
 """
+import asyncio
 import os
 import logging
+import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
 
 import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models.clients import Client
+from utils.http_clients import http_clients
+from utils.rate_limit import TokenBucket
 
 logger = logging.getLogger(__name__)
 
 FRESHSALES_DOMAIN = os.getenv("FRESHSALES_DOMAIN", "")
 FRESHSALES_API_KEY = os.getenv("FRESHSALES_API_KEY", "")
+FRESHSALES_API_URL = os.getenv("FRESHSALES_API_URL", "")  # overrides the domain URL (stub servers)
+FRESHSALES_RATE_PER_SECOND = float(os.getenv("FRESHSALES_RATE_PER_SECOND", "0"))  # 0 = unpaced
+FRESHSALES_RATE_BURST = max(1, int(os.getenv("FRESHSALES_RATE_BURST", "10")))
+FRESHSALES_IMPORT_CONCURRENCY = max(1, int(os.getenv("FRESHSALES_IMPORT_CONCURRENCY", "8")))
 
-# Retry config for rate-limited requests
-MAX_RETRIES = 3
+# Retry config for rate-limited requests; RETRY_DELAY doubles per attempt when there is no Retry-After
+MAX_RETRIES = 4
 RETRY_DELAY = 2.0
+MAX_RETRY_AFTER = 300.0
+
+rate_limiter = TokenBucket(FRESHSALES_RATE_PER_SECOND, FRESHSALES_RATE_BURST)
 
 
 def _is_configured() -> bool:
-    return bool(FRESHSALES_DOMAIN and FRESHSALES_API_KEY)
+    return bool((FRESHSALES_DOMAIN or FRESHSALES_API_URL) and FRESHSALES_API_KEY)
 
 
 def _base_url() -> str:
+    if FRESHSALES_API_URL:
+        return FRESHSALES_API_URL.rstrip("/")
     return f"https://{FRESHSALES_DOMAIN}.myfreshworks.com/crm/sales/api"
 
 
@@ -102,15 +129,46 @@ def _map_account_to_client(account: dict, contact: dict | None = None) -> dict:
     return mapped
 
 
+def _header_seconds(value: str | None) -> float | None:
+    """Seconds from now for a Retry-After / X-RateLimit-Reset value: delta seconds, epoch seconds or HTTP date."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+        if seconds > 1e9:  # epoch timestamp
+            seconds -= datetime.now(timezone.utc).timestamp()
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, seconds), MAX_RETRY_AFTER)
+
+
+def _observe_rate_limit(r: httpx.Response, attempt: int):
+    """Pause the shared bucket when FreshSales says the quota is spent."""
+    if r.status_code == 429:
+        delay = _header_seconds(r.headers.get("retry-after"))
+        if delay is None:
+            delay = RETRY_DELAY * 2 ** attempt
+    elif r.headers.get("x-ratelimit-remaining", "").strip() == "0":
+        delay = _header_seconds(r.headers.get("x-ratelimit-reset"))
+        if delay is None:
+            return
+    else:
+        return
+    if rate_limiter.pause(delay):
+        logger.warning(f"[FreshSales] Rate limited (HTTP {r.status_code}), pausing requests for {delay:.1f}s")
+
+
 async def _get_with_retry(client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
-    """GET with up to MAX_RETRIES retries on 429."""
-    import asyncio
+    """Rate-limited GET with up to MAX_RETRIES retries on 429."""
     for attempt in range(MAX_RETRIES):
+        await rate_limiter.acquire()
         r = await client.get(url, **kwargs)
+        _observe_rate_limit(r, attempt)
         if r.status_code != 429:
             return r
-        if attempt < MAX_RETRIES - 1:
-            await asyncio.sleep(RETRY_DELAY)
     return r
 
 
@@ -120,8 +178,9 @@ async def test_connection() -> dict:
         return {"success": False, "error": "FRESHSALES_DOMAIN or FRESHSALES_API_KEY not set"}
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await _get_with_retry(client, f"{_base_url()}/settings/profiles", headers=_headers())
+        r = await _get_with_retry(
+            http_clients.get("freshsales"), f"{_base_url()}/settings/profiles", headers=_headers(), timeout=10,
+        )
 
         if r.status_code == 200:
             data = r.json()
@@ -149,15 +208,14 @@ async def fetch_accounts(page: int = 1, search: str | None = None) -> dict:
         return {"accounts": [], "total": 0, "error": "Not configured"}
 
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            if search:
-                url = f"{_base_url()}/accounts/search"
-                params = {"q": search, "per_page": 25}
-            else:
-                url = f"{_base_url()}/accounts"
-                params = {"page": page, "per_page": 25}
+        if search:
+            url = f"{_base_url()}/accounts/search"
+            params = {"q": search, "per_page": 25}
+        else:
+            url = f"{_base_url()}/accounts"
+            params = {"page": page, "per_page": 25}
 
-            r = await _get_with_retry(client, url, headers=_headers(), params=params)
+        r = await _get_with_retry(http_clients.get("freshsales"), url, headers=_headers(), params=params)
 
         if r.status_code == 401:
             return {"accounts": [], "total": 0, "error": "Invalid FreshSales API key"}
@@ -186,8 +244,9 @@ async def fetch_account_detail(freshsales_id: int) -> dict | None:
     if not _is_configured():
         return None
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            r = await _get_with_retry(client, f"{_base_url()}/accounts/{freshsales_id}", headers=_headers())
+        r = await _get_with_retry(
+            http_clients.get("freshsales"), f"{_base_url()}/accounts/{freshsales_id}", headers=_headers(),
+        )
         if r.status_code != 200:
             return None
         data = r.json()
@@ -202,13 +261,12 @@ async def fetch_primary_contact(account_id: int) -> dict | None:
     if not _is_configured():
         return None
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            r = await _get_with_retry(
-                client,
-                f"{_base_url()}/contacts",
-                headers=_headers(),
-                params={"filter": f"account_id:{account_id}", "per_page": 1},
-            )
+        r = await _get_with_retry(
+            http_clients.get("freshsales"),
+            f"{_base_url()}/contacts",
+            headers=_headers(),
+            params={"filter": f"account_id:{account_id}", "per_page": 1},
+        )
         if r.status_code != 200:
             return None
         data = r.json()
@@ -219,54 +277,102 @@ async def fetch_primary_contact(account_id: int) -> dict | None:
         return None
 
 
-async def import_accounts(db, account_ids: list[int]) -> dict:
-    """Import / upsert FreshSales accounts into the clients table."""
-    from models.clients import Client
+async def fetch_for_import(
+    account_ids: list[int],
+    on_fetched: Optional[Callable[[], None]] = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Fetch accounts and their primary contacts, FRESHSALES_IMPORT_CONCURRENCY
+    accounts at a time, each account and its contact in parallel.
+    Returns (mapped client rows, errors) in account_ids order.
+    """
+    semaphore = asyncio.Semaphore(FRESHSALES_IMPORT_CONCURRENCY)
 
-    imported = 0
-    updated = 0
-    errors = []
-
-    for fid in account_ids:
+    async def fetch(fid: int):
         try:
-            account = await fetch_account_detail(fid)
-            if not account:
-                errors.append({"id": fid, "error": "Account not found in FreshSales"})
-                continue
-
-            contact = await fetch_primary_contact(fid)
-            mapped = _map_account_to_client(account, contact)
-
-            existing = db.query(Client).filter(Client.freshsales_id == fid).first()
-            if existing:
-                for k, v in mapped.items():
-                    setattr(existing, k, v)
-                db.commit()
-                db.refresh(existing)
-                updated += 1
+            async with semaphore:
+                account, contact = await asyncio.gather(fetch_account_detail(fid), fetch_primary_contact(fid))
+            if account:
+                result = _map_account_to_client(account, contact), None
             else:
-                new_client = Client(**mapped)
-                db.add(new_client)
-                db.commit()
-                db.refresh(new_client)
-                imported += 1
+                result = None, {"id": fid, "error": "Account not found in FreshSales"}
         except Exception as e:
-            logger.error(f"Error importing FreshSales account {fid}: {e}")
-            db.rollback()
-            errors.append({"id": fid, "error": str(e)})
+            logger.error(f"Error fetching FreshSales account {fid}: {e}")
+            result = None, {"id": fid, "error": str(e)}
+        if on_fetched:
+            on_fetched()
+        return result
+
+    results = await asyncio.gather(*(fetch(fid) for fid in account_ids))
+    rows = [row for row, _ in results if row]
+    errors = [error for _, error in results if error]
+    return rows, errors
+
+
+def _upsert_clients(db, rows: list[dict]):
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    # Accounts without an owner or contact leave those columns alone, so rows
+    # are upserted per set of mapped columns
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    for columns, group in groups.items():
+        stmt = insert(Client)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Client.freshsales_id],
+            set_={c: stmt.excluded[c] for c in columns if c != "freshsales_id"},
+        )
+        db.execute(stmt, [{"id": str(uuid.uuid4()), **row} for row in group])
+
+
+def upsert_clients(db, rows: list[dict]) -> tuple[int, int, list[dict]]:
+    """
+    Insert or update mapped client rows on freshsales_id in one statement and
+    commit. If the batch fails, rows are retried one by one so only the
+    offending accounts are reported. Returns (imported, updated, errors).
+    """
+    if not rows:
+        return 0, 0, []
+    existing = set(db.scalars(
+        select(Client.freshsales_id).where(Client.freshsales_id.in_([r["freshsales_id"] for r in rows]))
+    ))
+    saved, errors = rows, []
+    try:
+        _upsert_clients(db, rows)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"[FreshSales] Batch upsert of {len(rows)} clients failed, retrying one by one: {e}")
+        saved = []
+        for row in rows:
+            try:
+                _upsert_clients(db, [row])
+                db.commit()
+                saved.append(row)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error importing FreshSales account {row['freshsales_id']}: {e}")
+                errors.append({"id": row["freshsales_id"], "error": str(e)})
+    updated = sum(1 for row in saved if row["freshsales_id"] in existing)
+    return len(saved) - updated, updated, errors
+
 
-    return {"imported": imported, "updated": updated, "skipped": 0, "errors": errors}
+async def import_accounts(db, account_ids: list[int]) -> dict:
+    """Import / upsert FreshSales accounts into the clients table."""
+    account_ids = list(dict.fromkeys(account_ids))
+    rows, errors = await fetch_for_import(account_ids)
+    imported, updated, upsert_errors = upsert_clients(db, rows)
+    return {"imported": imported, "updated": updated, "skipped": 0, "errors": errors + upsert_errors}
 
 
 async def sync_account(db, freshsales_id: int) -> dict:
     """Re-sync a single client from FreshSales."""
-    from models.clients import Client
-
-    account = await fetch_account_detail(freshsales_id)
+    account, contact = await asyncio.gather(
+        fetch_account_detail(freshsales_id), fetch_primary_contact(freshsales_id),
+    )
     if not account:
         return {"success": False, "error": "Account not found in FreshSales"}
 
-    contact = await fetch_primary_contact(freshsales_id)
     mapped = _map_account_to_client(account, contact)
 
     try:
@@ -0,0 +1,142 @@
+"""
+Background FreshSales imports.
+
+POST /integrations/freshsales/import-jobs creates an import_jobs row and runs
+the import as an asyncio task in the API process — the work is waiting on
+FreshSales, so it needs no worker pool. The task fetches the accounts
+concurrently under the FreshSales rate limiter, then upserts every client in
+one batch. Progress counters are written to the row every
+IMPORT_PROGRESS_INTERVAL_SECONDS; clients poll GET .../import-jobs/{id}.
+
+Database work runs in a thread with its own session, off the event loop.
+A job still queued/running IMPORT_JOB_TIMEOUT_MINUTES after it started, with
+no task for it in this process (the process was restarted mid-import), is
+reported as failed.
+"""
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from models.import_jobs import ImportJob
+from services import freshsales_service
+
+logger = logging.getLogger(__name__)
+
+IMPORT_PROGRESS_INTERVAL_SECONDS = max(0.1, float(os.getenv("IMPORT_PROGRESS_INTERVAL_SECONDS", "1")))
+IMPORT_JOB_TIMEOUT_MINUTES = max(1, int(os.getenv("IMPORT_JOB_TIMEOUT_MINUTES", "60")))
+
+_tasks: dict = {}  # job id -> asyncio task
+
+
+# ── Job lifecycle ─────────────────────────────────────────────────────────────
+
+def create_freshsales_import_job(db: Session, account_ids: list[int]) -> ImportJob:
+    """Record the job and start it on the running event loop."""
+    account_ids = list(dict.fromkeys(account_ids))
+    job = ImportJob(
+        source="freshsales",
+        params=json.dumps({"account_ids": account_ids}),
+        status="queued",
+        total=len(account_ids),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    job_id = job.id
+    task = asyncio.get_running_loop().create_task(run_freshsales_import_job(job_id, account_ids))
+    _tasks[job_id] = task
+    task.add_done_callback(lambda _: _tasks.pop(job_id, None))
+    return job
+
+
+def get_import_job(db: Session, job_id: str) -> Optional[ImportJob]:
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if job and job.status in ("queued", "running") and job.id not in _tasks:
+        started_at = job.started_at or job.created_at
+        started_at = started_at.replace(tzinfo=started_at.tzinfo or timezone.utc)
+        if started_at < datetime.now(timezone.utc) - timedelta(minutes=IMPORT_JOB_TIMEOUT_MINUTES):
+            job.status = "error"
+            job.error_message = "Timed out"
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+    return job
+
+
+async def run_freshsales_import_job(job_id: str, account_ids: list[int]) -> None:
+    progress = {"processed": 0}
+    fetched = asyncio.Event()
+
+    def on_fetched():
+        progress["processed"] += 1
+
+    async def report():
+        # Stopped through the event rather than cancelled, so a write in flight
+        # lands before the final one
+        while not fetched.is_set():
+            try:
+                await asyncio.wait_for(fetched.wait(), IMPORT_PROGRESS_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(_update_job, job_id, processed=progress["processed"])
+
+    await asyncio.to_thread(_update_job, job_id, status="running", started_at=datetime.now(timezone.utc))
+    reporter = asyncio.create_task(report())
+    try:
+        rows, errors = await freshsales_service.fetch_for_import(account_ids, on_fetched)
+        fetched.set()
+        await reporter
+        imported, updated, upsert_errors = await asyncio.to_thread(_upsert, rows)
+        errors += upsert_errors
+        await asyncio.to_thread(
+            _update_job, job_id,
+            status="done",
+            processed=progress["processed"],
+            imported=imported,
+            updated=updated,
+            failed=len(errors),
+            errors=json.dumps(errors),
+            finished_at=datetime.now(timezone.utc),
+        )
+        logger.info(
+            f"[Imports] FreshSales job {job_id}: {imported} imported, {updated} updated, {len(errors)} failed"
+        )
+    except BaseException as e:
+        fetched.set()
+        await asyncio.gather(reporter, return_exceptions=True)
+        message = "Interrupted by shutdown" if isinstance(e, asyncio.CancelledError) else str(e)
+        logger.error(f"[Imports] FreshSales job {job_id} failed: {message}")
+        await asyncio.shield(asyncio.to_thread(
+            _update_job, job_id,
+            status="error",
+            processed=progress["processed"],
+            error_message=message,
+            finished_at=datetime.now(timezone.utc),
+        ))
+        if not isinstance(e, Exception):
+            raise
+
+
+async def shutdown_import_jobs():
+    """Cancel running imports so their rows are marked failed instead of left running."""
+    tasks = list(_tasks.values())
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _update_job(job_id: str, **fields):
+    with SessionLocal() as db:
+        db.query(ImportJob).filter(ImportJob.id == job_id).update(fields)
+        db.commit()
+
+
+def _upsert(rows: list[dict]) -> tuple[int, int, list[dict]]:
+    with SessionLocal() as db:
+        return freshsales_service.upsert_clients(db, rows)
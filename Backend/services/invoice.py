@@ -1,5 +1,7 @@
 from typing import List, Optional
 from datetime import date
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from models.invoice import Invoice
@@ -19,17 +21,52 @@ def create_invoice(db: Session, invoice_in: InvoiceCreate) -> Invoice:
     return invoice
 
 
+def _invoices_stmt(project_id: Optional[str] = None, status: Optional[str] = None):
+    stmt = select(Invoice)
+    if project_id is not None:
+        stmt = stmt.where(Invoice.project_id == project_id)
+    if status is not None:
+        stmt = stmt.where(Invoice.status == status)
+    return stmt.order_by(Invoice.created_at.desc())
+
+
 def get_invoices(
     db: Session,
     project_id: Optional[str] = None,
     status: Optional[str] = None,
 ) -> List[Invoice]:
-    query = db.query(Invoice)
+    return list(db.scalars(_invoices_stmt(project_id, status)))
+
+
+async def get_invoices_async(
+    db: AsyncSession,
+    project_id: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[Invoice]:
+    return list(await db.scalars(_invoices_stmt(project_id, status)))
+
+
+def get_invoice_ids(
+    db: Session,
+    project_id: Optional[str] = None,
+    status: Optional[str] = None,
+    company: Optional[str] = None,
+    issued_from: Optional[date] = None,
+    issued_to: Optional[date] = None,
+) -> List[str]:
+    """Same filters and order as get_invoices, without loading the rows."""
+    query = db.query(Invoice.id)
     if project_id is not None:
         query = query.filter(Invoice.project_id == project_id)
     if status is not None:
         query = query.filter(Invoice.status == status)
-    return query.order_by(Invoice.created_at.desc()).all()
+    if company is not None:
+        query = query.filter(func.coalesce(Invoice.owner_company, "IPC") == company)
+    if issued_from is not None:
+        query = query.filter(Invoice.issue_date >= issued_from)
+    if issued_to is not None:
+        query = query.filter(Invoice.issue_date <= issued_to)
+    return [row.id for row in query.order_by(Invoice.created_at.desc()).all()]
 
 
 def get_invoice(db: Session, invoice_id: str) -> Optional[Invoice]:
@@ -0,0 +1,167 @@
+"""
+Invoice edit-data assembler.
+
+Builds the plain dict consumed by the edit page, the PDF/Excel exporters and
+the multi-invoice report. The number of queries is fixed per call, no matter
+how many invoices or lines are involved:
+
+  1. invoices + project + client (joined)
+  2. invoice lines          (selectinload)
+  3. invoice expenses       (selectinload)
+  4. user roles for every line's user_id
+  5. original hours per (invoice, user) — one grouped aggregate over linked entries
+"""
+from typing import Iterable, Iterator, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from models.invoice import Invoice
+from models.invoice_time_entries import InvoiceTimeEntry
+from models.projects import Project
+from models.time_entries import TimeEntry
+from models.user_roles import UserRole
+
+
+def build_edit_data(db: Session, invoice_id: str) -> Optional[dict]:
+    """Edit data for a single invoice, or None if it does not exist."""
+    return build_edit_data_batch(db, [invoice_id]).get(invoice_id)
+
+
+def build_edit_data_batch(db: Session, invoice_ids: Iterable[str]) -> dict[str, dict]:
+    """Edit data for many invoices at once. Returns {invoice_id: edit_data}."""
+    invoice_ids = list(dict.fromkeys(invoice_ids))
+    if not invoice_ids:
+        return {}
+
+    invoices = (
+        db.query(Invoice)
+        .options(
+            joinedload(Invoice.project).joinedload(Project.client),
+            selectinload(Invoice.lines),
+            selectinload(Invoice.expenses),
+        )
+        .filter(Invoice.id.in_(invoice_ids))
+        .all()
+    )
+
+    user_ids = {line.user_id for inv in invoices for line in inv.lines if line.user_id}
+    roles = _roles_by_user(db, user_ids)
+    original_hours = _original_hours(db, [inv.id for inv in invoices])
+
+    return {inv.id: _serialize(inv, roles, original_hours) for inv in invoices}
+
+
+def iter_edit_data(db: Session, invoice_ids: list[str], batch_size: int = 200) -> Iterator[dict]:
+    """
+    Yield edit data for `invoice_ids` in order, loading `batch_size` invoices
+    at a time and clearing the session between batches so memory stays flat.
+    """
+    for i in range(0, len(invoice_ids), batch_size):
+        chunk = invoice_ids[i:i + batch_size]
+        batch = build_edit_data_batch(db, chunk)
+        db.expunge_all()
+        for invoice_id in chunk:
+            if invoice_id in batch:
+                yield batch[invoice_id]
+
+
+def _roles_by_user(db: Session, user_ids: set) -> dict:
+    if not user_ids:
+        return {}
+    roles: dict = {}
+    for user_id, role in db.query(UserRole.user_id, UserRole.role).filter(UserRole.user_id.in_(user_ids)):
+        roles.setdefault(user_id, role)
+    return roles
+
+
+def _original_hours(db: Session, invoice_ids: list) -> dict:
+    """Returns: {(invoice_id, user_id): hours} from the time entries linked to each invoice."""
+    rows = (
+        db.query(InvoiceTimeEntry.invoice_id, TimeEntry.user_id, func.sum(TimeEntry.hours))
+        .join(TimeEntry, InvoiceTimeEntry.time_entry_id == TimeEntry.id)
+        .filter(InvoiceTimeEntry.invoice_id.in_(invoice_ids))
+        .group_by(InvoiceTimeEntry.invoice_id, TimeEntry.user_id)
+        .all()
+    )
+    return {(invoice_id, user_id): hours for invoice_id, user_id, hours in rows}
+
+
+def _serialize(invoice: Invoice, roles: dict, original_hours: dict) -> dict:
+    project = invoice.project
+    client = project.client if project else None
+
+    lines_out = []
+    for line in invoice.lines:
+        if line.user_id:
+            hours = original_hours.get((invoice.id, line.user_id))
+            original = float(hours or line.hours)
+        else:
+            original = float(line.hours)
+        lines_out.append({
+            "id": line.id,
+            "user_id": line.user_id,
+            "employee_name": line.employee_name,
+            "title": line.role_name,
+            "role": roles.get(line.user_id),
+            "hours": float(line.hours),
+            "hourly_rate": float(line.rate_snapshot),
+            "discount_type": line.discount_type,
+            "discount_value": float(line.discount_value) if line.discount_value is not None else 0.0,
+            "amount": float(line.amount),
+            "original_hours": original,
+        })
+
+    expenses_out = [
+        {
+            "id": exp.id,
+            "date": exp.date,
+            "professional": exp.professional,
+            "vendor": exp.vendor,
+            "description": exp.description,
+            "category": exp.category,
+            "amount_usd": float(exp.amount_usd),
+            "payment_source": exp.payment_source,
+            "receipt_attached": exp.receipt_attached,
+            "notes": exp.notes,
+        }
+        for exp in sorted(invoice.expenses, key=lambda e: e.date)
+    ]
+
+    return {
+        "invoice": {
+            "id": invoice.id,
+            "project_id": invoice.project_id,
+            "status": invoice.status,
+            "subtotal": float(invoice.subtotal),
+            "discount": float(invoice.discount),
+            "total": float(invoice.total),
+            "cap_amount": float(invoice.cap_amount) if invoice.cap_amount is not None else None,
+            "notes": invoice.notes,
+            "invoice_number": invoice.invoice_number,
+            "issue_date": invoice.issue_date,
+            "due_date": invoice.due_date,
+            "period_start": invoice.period_start,
+            "period_end": invoice.period_end,
+            "signatory_name": invoice.signatory_name,
+            "signatory_title": invoice.signatory_title,
+            "owner_company": invoice.owner_company or "IPC",
+            "created_at": invoice.created_at,
+            "updated_at": invoice.updated_at,
+        },
+        "client": {
+            "id": client.id,
+            "name": client.name,
+            "email": client.email,
+            "phone": client.phone,
+            "manager_name": client.manager_name,
+            "job_title": client.job_title,
+            "street_address_1": client.street_address_1,
+            "street_address_2": client.street_address_2,
+            "city": client.city,
+            "state": client.state,
+            "zip": client.zip,
+        } if client else None,
+        "project": {"id": project.id, "name": project.name, "client_id": project.client_id, "owner_company": project.owner_company or "IPC"} if project else None,
+        "lines": lines_out,
+        "expenses": expenses_out,
+    }
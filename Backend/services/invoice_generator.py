@@ -1,8 +1,9 @@
 import logging
 import uuid
-from datetime import date
+from datetime import date, datetime, timezone
+from typing import Callable, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import func, insert
 
 from models.invoice import Invoice
 from models.invoice_lines import InvoiceLine
@@ -13,6 +14,7 @@ from models.employee_projects import EmployeeProject
 from models.project_roles import ProjectRole
 from models.employees import Employee
 from services.invoice_number_service import atomic_generate_number
+from services.unbilled_ledger import unbilled_by_project
 
 logger = logging.getLogger(__name__)
 
@@ -24,152 +26,240 @@ def generate_invoices_for_period(db: Session, period_start: date, period_end: da
     Skip projects that already have an invoice for this period.
     Returns: {"generated": int, "skipped": int, "errors": list}
     """
+    projects = db.query(
+        Project.id, Project.name, Project.manager_id, Project.owner_company,
+    ).filter(
+        Project.is_active == True,
+        Project.is_internal == False,
+    ).all()
+    return _generate_for_projects(db, projects, period_start, period_end)
+
+
+def generate_invoice_for_project_period(db: Session, project: Project, period_start: date, period_end: date) -> dict:
+    """
+    Single-project variant used by the daily scheduler.
+    Returns: {"generated": bool, "skipped": bool, "errors": list}
+    """
+    result = _generate_for_projects(db, [project], period_start, period_end)
+    return {
+        "generated": result["generated"] > 0,
+        "skipped": result["skipped"] > 0,
+        "errors": result["errors"],
+    }
+
+
+# ── Set-based engine ──────────────────────────────────────────────────────────
+
+def _generate_for_projects(
+    db: Session,
+    projects: list,
+    period_start: date,
+    period_end: date,
+    before_project: Optional[Callable[[str], bool]] = None,
+) -> dict:
+    """
+    Generate draft invoices for `projects` with a fixed number of queries for
+    the whole batch (existing invoices, unbilled ledger, unbilled entries,
+    names, rates) and two executemany inserts per generated invoice (lines +
+    time entry links).
+
+    Each project still commits (or rolls back) on its own, so one failure does
+    not affect the rest of the run. before_project(project_id) is called as
+    each project starts (the scheduler resets its per-project deadline there);
+    returning False stops the batch, leaving the remaining projects uncounted.
+    """
     generated = 0
     skipped = 0
     errors = []
 
-    active_projects = db.query(Project).filter(
-        Project.is_active == True,
-        Project.is_internal == False,
-    ).all()
+    if not projects:
+        return {"generated": generated, "skipped": skipped, "errors": errors}
+
+    project_ids = [p.id for p in projects]
+    already_invoiced = _projects_with_invoice_in_period(db, project_ids, period_start, period_end)
+    # The ledger narrows the entry-level scan to projects that actually have unbilled work
+    with_hours = unbilled_by_project(
+        db, [pid for pid in project_ids if pid not in already_invoiced], period_start, period_end,
+    )
+    unbilled = _unbilled_by_project_user(db, list(with_hours), period_start, period_end)
+
+    user_ids = {uid for rows in unbilled.values() for uid in rows}
+    names = _employee_names(db, user_ids)
+    rates = _assignment_rates(db, list(unbilled.keys()))
+
+    # Snapshot plain values up front — a rollback expires ORM instances
+    project_rows = [
+        (p.id, p.name, p.manager_id, getattr(p, 'owner_company', None) or 'IPC')
+        for p in projects
+    ]
+
+    for project_id, project_name, manager_id, company in project_rows:
+        if before_project is not None and not before_project(project_id):
+            break
+
+        if project_id in already_invoiced:
+            skipped += 1
+            logger.info(f"Skipping project {project_id}: invoice already exists for period")
+            continue
+
+        per_user = unbilled.get(project_id)
+        if not per_user:
+            skipped += 1
+            logger.info(f"Skipping project {project_id}: no unlinked billable entries")
+            continue
 
-    for project in active_projects:
         try:
-            # Skip if invoice already exists for this period
-            existing = db.query(Invoice).filter(
-                Invoice.project_id == project.id,
-                Invoice.issue_date >= period_start,
-                Invoice.issue_date <= period_end,
-            ).first()
-            if existing:
-                skipped += 1
-                logger.info(f"Skipping project {project.id}: invoice already exists for period")
-                continue
-
-            # Get linked time entry IDs
-            linked_ids_result = db.execute(
-                text("SELECT time_entry_id FROM invoice_time_entries")
-            ).fetchall()
-            linked_ids = {row[0] for row in linked_ids_result}
-
-            # Get unlinked billable time entries for this period
-            entries = db.query(TimeEntry).filter(
-                TimeEntry.project_id == project.id,
-                TimeEntry.billable == True,
-                TimeEntry.status == 'normal',
-                TimeEntry.date >= period_start,
-                TimeEntry.date <= period_end,
-            ).all()
-            entries = [e for e in entries if e.id not in linked_ids]
-
-            if not entries:
-                skipped += 1
-                logger.info(f"Skipping project {project.id}: no unlinked billable entries")
-                continue
-
-            # Derive company and create invoice (number assigned atomically below)
-            company = getattr(project, 'owner_company', None) or 'IPC'
-            issue_year = period_end.year
-
-            invoice = Invoice(
-                id=str(uuid.uuid4()),
-                project_id=project.id,
-                status="draft",
-                subtotal=0,
-                discount=0,
-                total=0,
-                owner_company=company,
-                issue_date=date.today(),
-                notes=f"[Auto-generated] Period: {period_start} to {period_end}",
+            invoice_id, invoice_number, subtotal = _create_invoice(
+                db, project_id, company, per_user, names, rates, period_start, period_end,
             )
-            db.add(invoice)
-            invoice_number = atomic_generate_number(db, company, issue_year)
-            invoice.invoice_number = invoice_number
-            db.flush()
-
-            # Get project roles and employee assignments
-            assignments = db.query(EmployeeProject).filter(
-                EmployeeProject.project_id == project.id
-            ).all()
-            assign_map = {a.user_id: a.role_id for a in assignments}
-
-            roles = db.query(ProjectRole).filter(
-                ProjectRole.project_id == project.id
-            ).all()
-            role_map = {r.id: r for r in roles}
-
-            # Group entries by user_id
-            employee_hours: dict = {}
-            for entry in entries:
-                uid = entry.user_id
-                if uid not in employee_hours:
-                    employee = db.query(Employee).filter(Employee.id == uid).first()
-                    employee_hours[uid] = {
-                        "user_id": uid,
-                        "name": employee.name if employee else "Unknown",
-                        "hours": 0,
-                        "entry_ids": [],
-                    }
-                employee_hours[uid]["hours"] += float(entry.hours)
-                employee_hours[uid]["entry_ids"].append(entry.id)
-
-            # Create invoice lines
-            subtotal = 0.0
-            for uid, data in employee_hours.items():
-                role_id = assign_map.get(uid)
-                role = role_map.get(role_id) if role_id else None
-                rate = float(role.hourly_rate_usd) if role else 0.0
-                role_name = role.name if role else None
-                amount = data["hours"] * rate
-
-                line = InvoiceLine(
-                    id=str(uuid.uuid4()),
-                    invoice_id=invoice.id,
-                    user_id=uid,
-                    employee_name=data["name"],
-                    role_name=role_name,
-                    hours=data["hours"],
-                    rate_snapshot=rate,
-                    amount=amount,
-                    discount_type="amount",
-                    discount_value=0,
-                )
-                db.add(line)
-                subtotal += amount
-
-            # Link time entries
-            for uid, data in employee_hours.items():
-                for entry_id in data["entry_ids"]:
-                    link = InvoiceTimeEntry(
-                        id=str(uuid.uuid4()),
-                        invoice_id=invoice.id,
-                        time_entry_id=entry_id,
-                    )
-                    db.add(link)
-
-            # Update invoice totals
-            invoice.subtotal = subtotal
-            invoice.total = subtotal
 
             # Notify project manager
-            if project.manager_id:
+            if manager_id:
                 from services.notifications import notify_invoice_generated
                 notify_invoice_generated(
                     db,
-                    invoice_id=invoice.id,
+                    invoice_id=invoice_id,
                     invoice_number=invoice_number,
-                    project_name=project.name,
-                    manager_id=project.manager_id,
+                    project_name=project_name,
+                    manager_id=manager_id,
                     total=subtotal,
                 )
 
             db.commit()
             generated += 1
-            logger.info(f"Auto-generated invoice {invoice_number} for project {project.id} ({period_start} -> {period_end})")
+            logger.info(f"Auto-generated invoice {invoice_number} for project {project_id} ({period_start} -> {period_end})")
 
         except Exception as e:
             db.rollback()
-            errors.append(str(e))
-            logger.error(f"Error generating invoice for project {project.id}: {e}")
+            errors.append(f"{project_id}: {e}")
+            logger.error(f"Error generating invoice for project {project_id}: {e}")
 
     return {"generated": generated, "skipped": skipped, "errors": errors}
+
+
+def _create_invoice(
+    db: Session,
+    project_id: str,
+    company: str,
+    per_user: dict,
+    names: dict,
+    rates: dict,
+    period_start: date,
+    period_end: date,
+) -> tuple[str, str, float]:
+    """Insert one draft invoice with its lines and links. Does NOT commit."""
+    invoice = Invoice(
+        id=str(uuid.uuid4()),
+        project_id=project_id,
+        status="draft",
+        subtotal=0,
+        discount=0,
+        total=0,
+        owner_company=company,
+        issue_date=date.today(),
+        notes=f"[Auto-generated] Period: {period_start} to {period_end}",
+    )
+    db.add(invoice)
+    invoice.invoice_number = atomic_generate_number(db, company, period_end.year)
+    db.flush()
+
+    now = datetime.now(timezone.utc)
+    line_rows = []
+    link_rows = []
+    subtotal = 0.0
+    for uid, (hours, entry_ids) in per_user.items():
+        role_name, rate = rates.get((project_id, uid), (None, 0.0))
+        amount = hours * rate
+        subtotal += amount
+        line_rows.append({
+            "id": str(uuid.uuid4()),
+            "invoice_id": invoice.id,
+            "user_id": uid,
+            "employee_name": names.get(uid, "Unknown"),
+            "role_name": role_name,
+            "hours": hours,
+            "rate_snapshot": rate,
+            "amount": amount,
+            "discount_type": "amount",
+            "discount_value": 0,
+            "created_at": now,
+        })
+        link_rows.extend(
+            {"id": str(uuid.uuid4()), "invoice_id": invoice.id, "time_entry_id": entry_id, "created_at": now}
+            for entry_id in entry_ids
+        )
+
+    db.execute(insert(InvoiceLine), line_rows)
+    db.execute(insert(InvoiceTimeEntry), link_rows)
+
+    invoice.subtotal = subtotal
+    invoice.total = subtotal
+    return invoice.id, invoice.invoice_number, subtotal
+
+
+# ── Batch loaders (one round trip each) ───────────────────────────────────────
+
+def _projects_with_invoice_in_period(db: Session, project_ids: list, period_start: date, period_end: date) -> set:
+    rows = db.query(Invoice.project_id).filter(
+        Invoice.project_id.in_(project_ids),
+        Invoice.issue_date >= period_start,
+        Invoice.issue_date <= period_end,
+    ).distinct().all()
+    return {r[0] for r in rows}
+
+
+def _unbilled_by_project_user(db: Session, project_ids: list, period_start: date, period_end: date) -> dict:
+    """
+    Anti-join of billable entries against invoice_time_entries, aggregated per
+    (project, user) in SQL. Hours and entry ids come from the same statement so
+    lines and links always agree.
+    Returns: {project_id: {user_id: (hours, [time_entry_id, ...])}}
+    """
+    if not project_ids:
+        return {}
+    linked = db.query(InvoiceTimeEntry.id).filter(
+        InvoiceTimeEntry.time_entry_id == TimeEntry.id
+    ).exists()
+    rows = db.query(
+        TimeEntry.project_id,
+        TimeEntry.user_id,
+        func.sum(TimeEntry.hours),
+        func.array_agg(TimeEntry.id),
+    ).filter(
+        TimeEntry.project_id.in_(project_ids),
+        TimeEntry.billable == True,
+        TimeEntry.status == 'normal',
+        TimeEntry.date >= period_start,
+        TimeEntry.date <= period_end,
+        ~linked,
+    ).group_by(TimeEntry.project_id, TimeEntry.user_id).all()
+
+    result: dict = {}
+    for project_id, user_id, hours, entry_ids in rows:
+        result.setdefault(project_id, {})[user_id] = (float(hours or 0), list(entry_ids))
+    return result
+
+
+def _employee_names(db: Session, user_ids: set) -> dict:
+    if not user_ids:
+        return {}
+    rows = db.query(Employee.id, Employee.name).filter(Employee.id.in_(user_ids)).all()
+    return {r.id: r.name for r in rows}
+
+
+def _assignment_rates(db: Session, project_ids: list) -> dict:
+    """Returns: {(project_id, user_id): (role_name, hourly_rate)} for assigned employees."""
+    if not project_ids:
+        return {}
+    rows = db.query(
+        EmployeeProject.project_id,
+        EmployeeProject.user_id,
+        ProjectRole.name,
+        ProjectRole.hourly_rate_usd,
+    ).join(
+        ProjectRole,
+        (ProjectRole.id == EmployeeProject.role_id) & (ProjectRole.project_id == EmployeeProject.project_id),
+    ).filter(
+        EmployeeProject.project_id.in_(project_ids),
+    ).all()
+    return {(r.project_id, r.user_id): (r.name, float(r.hourly_rate_usd)) for r in rows}
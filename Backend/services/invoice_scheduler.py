@@ -3,25 +3,39 @@ Invoice auto-generation scheduler.
 
 Runs daily at 08:00 and checks each active project to see if today is
 its invoice generation day based on its billing_period configuration.
+Due projects are generated in parallel shards (see SCHEDULER_* settings).
 """
+import json
 import logging
+import os
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timezone, timedelta
 from dateutil.relativedelta import relativedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import event, func, text
 
 logger = logging.getLogger(__name__)
 
+SCHEDULER_MAX_WORKERS = max(1, int(os.getenv("SCHEDULER_MAX_WORKERS", "4")))
+SCHEDULER_SHARD_SIZE = max(1, int(os.getenv("SCHEDULER_SHARD_SIZE", "20")))
+SCHEDULER_BATCH_SIZE = max(1, int(os.getenv("SCHEDULER_BATCH_SIZE", "10")))
+SCHEDULER_PROJECT_TIMEOUT_SECONDS = max(1, int(os.getenv("SCHEDULER_PROJECT_TIMEOUT_SECONDS", "120")))
+
 scheduler = BackgroundScheduler()
 
 
 # ── Period calculation helpers ────────────────────────────────────────────────
 
-def _next_invoice_date(project, last_invoice_date: date | None = None) -> date | None:
+def _next_invoice_date(project, last_invoice_date: date | None = None, today: date | None = None) -> date | None:
     """
-    Return the next invoice generation date for a project based on its
-    billing_period, billing_day_of_period, and billing_anchor_date.
+    Return the next invoice generation date (on or after `today`, default the
+    current date) for a project based on its billing_period,
+    billing_day_of_period, and billing_anchor_date.
     Returns None if the project has no billing configuration.
     """
     period = getattr(project, 'billing_period', None) or 'monthly'
@@ -29,7 +43,7 @@ def _next_invoice_date(project, last_invoice_date: date | None = None) -> date |
     anchor = getattr(project, 'billing_anchor_date', None)
     custom_days = getattr(project, 'custom_period_days', None)
 
-    today = date.today()
+    today = today or date.today()
 
     if period == 'monthly':
         # Billing day of the current month; if already passed, next month
@@ -91,6 +105,33 @@ def _next_invoice_date(project, last_invoice_date: date | None = None) -> date |
     return None
 
 
+BILLING_SCHEDULE_FIELDS = ("billing_period", "billing_day_of_period", "billing_anchor_date", "custom_period_days")
+
+
+# Changing these can leave next_invoice_on stale (inactive projects are not advanced)
+NEXT_INVOICE_FIELDS = BILLING_SCHEDULE_FIELDS + ("is_active", "is_internal")
+
+
+def refresh_next_invoice_on(project, today: date | None = None, last_invoice_date: date | None = None) -> date | None:
+    """
+    Recompute and store projects.next_invoice_on, on or after `today`.
+    Weekly/biweekly/custom projects without an anchor count their cycle from
+    `last_invoice_date` (else from today). Does NOT commit.
+    """
+    project.next_invoice_on = _next_invoice_date(project, last_invoice_date=last_invoice_date, today=today)
+    return project.next_invoice_on
+
+
+def advance_next_invoice_on(project, processed_on: date) -> date | None:
+    """
+    Move a project past the generation date just processed (its current
+    next_invoice_on, or `processed_on` when unset). Counting from that date
+    rather than from tomorrow keeps unanchored cycles at their length.
+    """
+    last = project.next_invoice_on or processed_on
+    return refresh_next_invoice_on(project, today=processed_on + timedelta(days=1), last_invoice_date=last)
+
+
 def _days_in_month(year: int, month: int) -> int:
     import calendar
     return calendar.monthrange(year, month)[1]
@@ -144,66 +185,255 @@ def _period_bounds_for_project(project, today: date) -> tuple[date, date]:
 
 # ── Main scheduler job ────────────────────────────────────────────────────────
 
-def auto_generate_daily_invoices():
+def _chunks(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class ProjectTimeout(Exception):
+    pass
+
+
+class LeaseLost(Exception):
+    pass
+
+
+_project_deadline = threading.local()
+_deadline_hook_lock = threading.Lock()
+
+
+def _check_project_deadline(conn, cursor, statement, parameters, context, executemany):
+    deadline = getattr(_project_deadline, "at", None)
+    if deadline is not None and time.monotonic() > deadline:
+        raise ProjectTimeout(f"exceeded {SCHEDULER_PROJECT_TIMEOUT_SECONDS}s, rolled back")
+    lease = getattr(_project_deadline, "lease", None)
+    if lease is not None and lease.lost:
+        raise LeaseLost("scheduler lease lost, rolled back")
+
+
+def _run_shard(shard_index: int, project_ids: list[str], today: date, lease=None) -> dict:
     """
-    Runs every day at 08:00.
-    For each active, non-internal project: check if today is the invoice
-    generation day per its billing_period. If yes, generate a draft invoice
-    for its current billing period.
+    Generate invoices for one shard of due projects in its own session.
+    Projects due for the same period go to _generate_for_projects in batches
+    of SCHEDULER_BATCH_SIZE, so its lookups run once per batch; a batch whose
+    lookups fail is retried project by project.
+
+    Each project gets SCHEDULER_PROJECT_TIMEOUT_SECONDS (a batch's lookups get
+    one budget of their own): once they are spent, its next statement raises
+    ProjectTimeout and the project is rolled back and reported as an error.
+    On Postgres statement_timeout also caps a single statement at that budget,
+    so one slow query cannot hold the shard.
     """
-    from config.database import SessionLocal
-    from services.invoice_generator import generate_invoice_for_project_period
+    from config.database import SchedulerSessionLocal, scheduler_engine
+    from services.invoice_generator import _generate_for_projects
+    from models.projects import Project
+
+    started = time.monotonic()
+    generated = 0
+    skipped = 0
+    errors = []
+    current: dict = {}  # project being generated: id, started
+
+    def end_project():
+        if current:
+            elapsed = time.monotonic() - current["started"]
+            if elapsed > SCHEDULER_PROJECT_TIMEOUT_SECONDS:
+                # Overran after its last statement (e.g. a slow commit) — kept, not an error
+                logger.warning(f"[Scheduler] Project {current['id']} took {elapsed:.1f}s")
+            current.clear()
+        _project_deadline.at = None
+
+    def lease_lost() -> bool:
+        return lease is not None and lease.lost
+
+    def before_project(project_id: str) -> bool:
+        end_project()
+        if lease_lost():
+            return False
+        current.update(id=project_id, started=time.monotonic())
+        _project_deadline.at = current["started"] + SCHEDULER_PROJECT_TIMEOUT_SECONDS
+        return True
+
+    def run_batch(batch: list, period_start: date, period_end: date) -> dict:
+        _project_deadline.at = time.monotonic() + SCHEDULER_PROJECT_TIMEOUT_SECONDS
+        try:
+            return _generate_for_projects(db, batch, period_start, period_end, before_project)
+        finally:
+            end_project()
+
+    with _deadline_hook_lock:
+        if not event.contains(scheduler_engine, "before_cursor_execute", _check_project_deadline):
+            event.listen(scheduler_engine, "before_cursor_execute", _check_project_deadline)
+
+    db = SchedulerSessionLocal()
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+    try:
+        if is_postgres:
+            db.execute(text(f"SET statement_timeout = {SCHEDULER_PROJECT_TIMEOUT_SECONDS * 1000}"))
+            db.commit()
+
+        _project_deadline.lease = lease
+        # The cycle that was due: a caught-up day bills its own period
+        by_period: dict = {}
+        for project in db.query(Project).filter(Project.id.in_(project_ids)).all():
+            bounds = _period_bounds_for_project(project, project.next_invoice_on or today)
+            by_period.setdefault(bounds, []).append(project)
+        batches = [
+            (bounds, batch)
+            for bounds, projects in by_period.items()
+            for batch in _chunks(projects, SCHEDULER_BATCH_SIZE)
+        ]
+
+        for (period_start, period_end), batch in batches:
+            if lease_lost():
+                break
+            batch_ids = [project.id for project in batch]  # a rollback expires the instances
+            try:
+                results = [run_batch(batch, period_start, period_end)]
+            except LeaseLost:
+                raise
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"[Scheduler] Batch of {len(batch)} projects failed ({e}); retrying one by one")
+                results = []
+                for project_id, project in zip(batch_ids, batch):
+                    if lease_lost():
+                        break
+                    try:
+                        results.append(run_batch([project], period_start, period_end))
+                    except LeaseLost:
+                        raise
+                    except Exception as e:
+                        db.rollback()
+                        results.append({"generated": 0, "skipped": 0, "errors": [f"{project_id}: {e}"]})
+                        logger.error(f"[Scheduler] Error for project {project_id}: {e}")
+            for result in results:
+                generated += result["generated"]
+                skipped += result["skipped"]
+                errors.extend(result["errors"])
+        if lease_lost():
+            errors.append(f"shard {shard_index}: lease lost, remaining projects not run")
+    except Exception as e:
+        errors.append(f"shard {shard_index}: {e}")
+        logger.error(f"[Scheduler] Shard {shard_index} failed: {e}")
+    finally:
+        _project_deadline.at = None
+        _project_deadline.lease = None
+        if is_postgres:
+            # Session-level setting — don't leak it to the next pool checkout
+            try:
+                db.rollback()
+                db.execute(text("RESET statement_timeout"))
+                db.commit()
+            except Exception as e:
+                logger.warning(f"[Scheduler] Could not reset statement_timeout: {e}")
+        db.close()
+
+    return {
+        "shard": shard_index,
+        "projects": len(project_ids),
+        "generated": generated,
+        "skipped": skipped,
+        "errors": errors,
+        "duration_ms": int((time.monotonic() - started) * 1000),
+    }
+
+
+def auto_generate_daily_invoices(lease=None):
+    """
+    Runs every day at 08:00, called by run_as_leader with its lease.
+    Selects active, non-internal projects whose precomputed next_invoice_on
+    is today or a day missed since the last daily run. Due projects are split into shards
+    of SCHEDULER_SHARD_SIZE and processed on a pool of SCHEDULER_MAX_WORKERS
+    threads, each with its own session. One SchedulerLog row records the
+    totals plus per-shard timing.
+
+    If the lease is lost mid-run, shards stop and the run ends without moving
+    next_invoice_on or logging, so the process that takes over repeats it;
+    projects already invoiced for the period are skipped there.
+    """
+    from config.database import SchedulerSessionLocal
     from models.projects import Project
     from models.scheduler_log import SchedulerLog
 
-    db = SessionLocal()
+    started = time.monotonic()
+    db = SchedulerSessionLocal()
     today = date.today()
     total_generated = 0
     total_skipped = 0
     errors = []
+    shard_stats = []
 
     try:
-        active_projects = db.query(Project).filter(
-            Project.is_active == True,
-            Project.is_internal == False,
-        ).all()
-
-        for project in active_projects:
-            try:
-                next_date = _next_invoice_date(project)
-                if next_date != today:
-                    total_skipped += 1
-                    continue
-
-                period_start, period_end = _period_bounds_for_project(project, today)
-                result = generate_invoice_for_project_period(db, project, period_start, period_end)
-                if result.get('generated'):
-                    total_generated += 1
-                    logger.info(
-                        f"[Scheduler] Generated invoice for project {project.name} "
-                        f"({period_start} -> {period_end})"
-                    )
-                else:
-                    total_skipped += 1
-            except Exception as e:
-                errors.append(f"{project.id}: {e}")
-                logger.error(f"[Scheduler] Error for project {project.id}: {e}")
+        active = (Project.is_active == True) & (Project.is_internal == False)
+
+        # Projects created or edited outside the API have no schedule yet
+        for project in db.query(Project).filter(active, Project.next_invoice_on.is_(None)).all():
+            refresh_next_invoice_on(project, today)
+
+        # Catch up only the days since the last daily run. Older dates were
+        # not missed but left behind (e.g. while the project was inactive):
+        # move them to their next cycle instead of invoicing off-schedule
+        last_run = _last_daily_run(db, today)
+        catch_up_from = last_run + timedelta(days=1) if last_run else today
+        for project in db.query(Project).filter(active, Project.next_invoice_on < catch_up_from).all():
+            refresh_next_invoice_on(project, today, last_invoice_date=project.next_invoice_on)
+        db.commit()
 
+        # Index range scan on next_invoice_on
+        due_ids = [
+            row.id for row in db.query(Project.id).filter(
+                active,
+                Project.next_invoice_on >= catch_up_from,
+                Project.next_invoice_on <= today,
+            ).all()
+        ]
+        total_skipped += db.query(Project.id).filter(active).count() - len(due_ids)
+        db.rollback()
+
+        shards = _chunks(due_ids, SCHEDULER_SHARD_SIZE)
+        if shards:
+            workers = min(SCHEDULER_MAX_WORKERS, len(shards))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="invoice-shard") as pool:
+                futures = [pool.submit(_run_shard, i, ids, today, lease) for i, ids in enumerate(shards)]
+                for future in as_completed(futures):
+                    stats = future.result()
+                    total_generated += stats["generated"]
+                    total_skipped += stats["skipped"]
+                    errors.extend(stats["errors"])
+                    shard_stats.append({**stats, "errors": len(stats["errors"])})
+
+        if lease is not None and lease.lost:
+            db.rollback()
+            logger.warning(
+                f"[Scheduler] Lease lost mid-run after {total_generated} invoices; "
+                f"leaving the run to the next leader"
+            )
+            return
+
+        # Move every processed project to its next generation date
+        for project in db.query(Project).filter(Project.id.in_(due_ids)).all():
+            advance_next_invoice_on(project, today)
+
+        shard_stats.sort(key=lambda s: s["shard"])
         log = SchedulerLog(
             id=str(uuid.uuid4()),
             run_at=datetime.now(timezone.utc),
             period_start=str(today),
             period_end=str(today),
+            kind="daily",
             invoices_generated=total_generated,
             invoices_skipped=total_skipped,
             status="success" if not errors else "error",
             error_message="; ".join(errors) if errors else None,
+            duration_ms=int((time.monotonic() - started) * 1000),
+            shard_stats=json.dumps(shard_stats),
         )
         db.add(log)
         db.commit()
         logger.info(
             f"[Scheduler] Daily run complete: {total_generated} generated, "
-            f"{total_skipped} skipped, {len(errors)} errors"
+            f"{total_skipped} skipped, {len(errors)} errors "
+            f"({len(shard_stats)} shards, {log.duration_ms} ms)"
         )
     except Exception as e:
         logger.error(f"[Scheduler] Fatal error: {e}")
@@ -211,13 +441,51 @@ def auto_generate_daily_invoices():
         db.close()
 
 
+def _last_daily_run(db, today: date) -> date | None:
+    """Date of the latest daily run before `today`."""
+    from models.scheduler_log import SchedulerLog
+
+    last = db.query(func.max(SchedulerLog.period_start)).filter(
+        SchedulerLog.kind == "daily",
+        SchedulerLog.period_start < str(today),
+    ).scalar()
+    return date.fromisoformat(last) if last else None
+
+
+def _daily_run_completed() -> bool:
+    """True if a daily run already logged its result today (any replica)."""
+    from config.database import SchedulerSessionLocal
+    from models.scheduler_log import SchedulerLog
+
+    today = str(date.today())
+    db = SchedulerSessionLocal()
+    try:
+        return db.query(SchedulerLog.id).filter(
+            SchedulerLog.kind == "daily",
+            SchedulerLog.period_start == today,
+        ).first() is not None
+    finally:
+        db.close()
+
+
 def start_scheduler():
+    from services.scheduler_leader import leader_job
+
+    # Every worker schedules the job; leader_job makes sure only one runs it
     scheduler.add_job(
-        auto_generate_daily_invoices,
+        leader_job("auto_invoice_generation", auto_generate_daily_invoices, _daily_run_completed),
         CronTrigger(hour=8, minute=0),
         id="auto_invoice_generation",
         replace_existing=True,
     )
+
+    from services.export_jobs import evict_expired_exports_job
+    scheduler.add_job(
+        evict_expired_exports_job,
+        IntervalTrigger(hours=1),
+        id="export_artifact_eviction",
+        replace_existing=True,
+    )
     scheduler.start()
     logger.info("Invoice scheduler started — runs daily at 08:00")
 
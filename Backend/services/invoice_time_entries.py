@@ -1,4 +1,5 @@
-from typing import List
+from typing import List, Tuple
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from models.invoice_time_entries import InvoiceTimeEntry
@@ -13,16 +14,41 @@ def get_all_linked_entry_ids(db: Session) -> List[str]:
     return [r[0] for r in rows]
 
 
-def bulk_link_time_entries(db: Session, invoice_id: str, time_entry_ids: List[str]) -> List[InvoiceTimeEntry]:
+def _already_linked(db: Session, time_entry_ids: List[str]) -> List[str]:
+    rows = db.query(InvoiceTimeEntry.time_entry_id).filter(InvoiceTimeEntry.time_entry_id.in_(time_entry_ids)).all()
+    return sorted(r[0] for r in rows)
+
+
+def bulk_link_time_entries(
+    db: Session, invoice_id: str, time_entry_ids: List[str],
+) -> Tuple[List[InvoiceTimeEntry], List[str]]:
+    """
+    Link the entries to the invoice. An entry can be on one invoice only: if
+    any is already linked nothing is written. Returns (created links,
+    conflicting time_entry_ids).
+    """
+    time_entry_ids = list(dict.fromkeys(time_entry_ids))
+    conflicts = _already_linked(db, time_entry_ids)
+    if conflicts:
+        return [], conflicts
+
     created = []
     for entry_id in time_entry_ids:
         db_link = InvoiceTimeEntry(invoice_id=invoice_id, time_entry_id=entry_id)
         db.add(db_link)
         created.append(db_link)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Linked concurrently between the check and the insert
+        db.rollback()
+        conflicts = _already_linked(db, time_entry_ids)
+        if conflicts:
+            return [], conflicts
+        raise
     for link in created:
         db.refresh(link)
-    return created
+    return created, []
 
 
 def delete_invoice_time_entry(db: Session, link_id: str) -> bool:
@@ -1,4 +1,6 @@
 from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import uuid
 
@@ -40,11 +42,19 @@ def notify_invoice_generated(db: Session, invoice_id: str, invoice_number: str,
     )
 
 
-def get_notifications(db: Session, user_id: str, unread_only: bool = False) -> List[Notification]:
-    q = db.query(Notification).filter(Notification.user_id == user_id)
+def _notifications_stmt(user_id: str, unread_only: bool = False):
+    stmt = select(Notification).where(Notification.user_id == user_id)
     if unread_only:
-        q = q.filter(Notification.is_read == False)
-    return q.order_by(Notification.created_at.desc()).limit(50).all()
+        stmt = stmt.where(Notification.is_read == False)
+    return stmt.order_by(Notification.created_at.desc()).limit(50)
+
+
+def get_notifications(db: Session, user_id: str, unread_only: bool = False) -> List[Notification]:
+    return list(db.scalars(_notifications_stmt(user_id, unread_only)))
+
+
+async def get_notifications_async(db: AsyncSession, user_id: str, unread_only: bool = False) -> List[Notification]:
+    return list(await db.scalars(_notifications_stmt(user_id, unread_only)))
 
 
 def mark_read(db: Session, notification_id: str, user_id: str) -> Optional[Notification]:
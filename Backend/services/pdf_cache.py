@@ -0,0 +1,130 @@
+"""
+On-disk cache for rendered invoice PDFs.
+
+Entries are content-addressed: the key hashes the edit-data dict, the HTML
+template version, the company profile (address, bank details) and signatory
+config the invoice renders with, and the registry fingerprint (mtime + size)
+of every embedded image. Any change to the invoice, the template, that config
+or a logo/signature produces a new key, so a stale PDF is never served. Files are named <invoice_id>_<key>.pdf so
+patch_invoice can drop an invoice's old renders right away instead of waiting
+for LRU eviction.
+
+The directory is bounded by PDF_CACHE_MAX_MB; hits refresh the file mtime and
+the least recently used files are evicted first.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from services.asset_registry import assets
+from services.export_pdf import (
+    TEMPLATE_VERSION, generate_invoice_pdf, invoice_asset_paths, invoice_render_config,
+)
+
+logger = logging.getLogger(__name__)
+
+# Not under UPLOAD_DIR: that is served as static files without auth
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(os.path.dirname(__file__), "..", "artifacts", "pdf_cache"))
+PDF_CACHE_ENABLED = os.getenv("PDF_CACHE_ENABLED", "true").lower() == "true"
+PDF_CACHE_MAX_MB = max(1, int(os.getenv("PDF_CACHE_MAX_MB", "256")))
+
+_evict_lock = threading.Lock()
+
+
+def cache_key(edit_data: dict) -> str:
+    payload = json.dumps(edit_data, sort_keys=True, default=str)
+    h = hashlib.sha256()
+    h.update(TEMPLATE_VERSION.encode())
+    h.update(payload.encode("utf-8"))
+    h.update(json.dumps(invoice_render_config(edit_data), sort_keys=True).encode("utf-8"))
+    for path in invoice_asset_paths(edit_data):
+        h.update(assets.fingerprint(path).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _entry_path(invoice_id: str, key: str) -> str:
+    return os.path.join(PDF_CACHE_DIR, f"{invoice_id}_{key}.pdf")
+
+
+def get_invoice_pdf(edit_data: dict) -> bytes:
+    """Cached equivalent of generate_invoice_pdf(edit_data)."""
+    if not PDF_CACHE_ENABLED:
+        return generate_invoice_pdf(edit_data)
+
+    invoice_id = edit_data["invoice"]["id"]
+    path = _entry_path(invoice_id, cache_key(edit_data))
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+        os.utime(path)  # LRU touch
+        return content
+    except FileNotFoundError:
+        pass
+
+    content = generate_invoice_pdf(edit_data)
+    try:
+        _store(invoice_id, path, content)
+    except OSError as e:
+        logger.warning(f"[PdfCache] Could not store {path}: {e}")
+    return content
+
+
+def _store(invoice_id: str, path: str, content: bytes):
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+    # Older renders of this invoice can never be hit again
+    invalidate_invoice_pdf(invoice_id)
+    fd, tmp = tempfile.mkstemp(dir=PDF_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    _evict_over_budget()
+
+
+def invalidate_invoice_pdf(invoice_id: str) -> int:
+    """Remove every cached render of `invoice_id`. Returns the number of files removed."""
+    removed = 0
+    for path in glob.glob(os.path.join(PDF_CACHE_DIR, f"{glob.escape(invoice_id)}_*.pdf")):
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _evict_over_budget():
+    budget = PDF_CACHE_MAX_MB * 1024 * 1024
+    with _evict_lock:
+        entries = []
+        total = 0
+        with os.scandir(PDF_CACHE_DIR) as it:
+            for entry in it:
+                if not entry.name.endswith(".pdf"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= budget:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= budget:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        logger.info(f"[PdfCache] Evicted down to {total / 1024 / 1024:.1f} MB")
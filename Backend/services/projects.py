@@ -1,33 +1,181 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import List, Optional, Sequence, Tuple
+from datetime import date
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 
+from models.clients import Client
+from models.employee_projects import EmployeeProject
+from models.employee_skills import EmployeeSkill
+from models.employees import Employee
+from models.project_required_skill import ProjectRequiredSkill
 from models.projects import Project
-from schemas.projects import ProjectCreate, ProjectUpdate
+from models.skill_catalog import SkillCatalog
+from schemas.projects import ProjectCreate, ProjectUpdate, ProjectOut
+from services.invoice_scheduler import BILLING_SCHEDULE_FIELDS, NEXT_INVOICE_FIELDS, refresh_next_invoice_on
 
 
 def create_project(db: Session, project_in: ProjectCreate) -> Project:
     data = project_in.model_dump(exclude_unset=True)
     db_project = Project(**data)
+    refresh_next_invoice_on(db_project)
     db.add(db_project)
     db.commit()
     db.refresh(db_project)
     return db_project
 
 
+def _filter_projects(
+    stmt,
+    active: Optional[bool] = None,
+    client_id: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    if active is not None:
+        stmt = stmt.where(Project.is_active == active)
+    if client_id is not None:
+        stmt = stmt.where(Project.client_id == client_id)
+    if status is not None:
+        stmt = stmt.where(Project.status == status)
+    return stmt
+
+
+def _projects_stmt(
+    active: Optional[bool] = None,
+    client_id: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    return _filter_projects(select(Project), active, client_id, status).order_by(Project.name)
+
+
 def get_projects(
     db: Session,
     active: Optional[bool] = None,
     client_id: Optional[str] = None,
     status: Optional[str] = None,
 ) -> List[Project]:
-    query = db.query(Project)
+    return list(db.scalars(_projects_stmt(active, client_id, status)))
+
+
+# Fields the project listing can return: the ProjectOut columns plus the
+# joined manager_name / client_name
+PROJECT_LIST_FIELDS = tuple(ProjectOut.model_fields)
+
+
+def _project_rows_stmt(fields: Sequence[str], **filters):
+    """Only the requested columns; the manager / client joins only when asked for."""
+    manager = aliased(Employee)
+    joined = {"manager_name": manager.name, "client_name": Client.name}
+    columns = Project.__table__.c
+    stmt = select(*[(joined[f] if f in joined else columns[f]).label(f) for f in fields]).select_from(Project)
+    if "manager_name" in fields:
+        stmt = stmt.outerjoin(manager, manager.id == Project.manager_id)
+    if "client_name" in fields:
+        stmt = stmt.outerjoin(Client, Client.id == Project.client_id)
+    return _filter_projects(stmt, **filters)
+
+
+async def get_project_rows_async(
+    db: AsyncSession,
+    fields: Sequence[str] = PROJECT_LIST_FIELDS,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[str, str]] = None,
+    **filters,
+) -> Tuple[List[dict], Optional[Tuple[str, str]]]:
+    """
+    Projects ordered by (name, id) as dicts of `fields` (id always included),
+    in one query. With `limit`, one keyset page starting after the (name, id)
+    `after`; also returns the (name, id) to continue from, None on the last page.
+    """
+    out_fields = list(dict.fromkeys(("id", *fields)))
+    stmt = _project_rows_stmt(list(dict.fromkeys((*out_fields, "name"))), **filters)
+    if after:
+        after_name, after_id = after
+        stmt = stmt.where(or_(
+            Project.name > after_name,
+            and_(Project.name == after_name, Project.id > after_id),
+        ))
+    stmt = stmt.order_by(Project.name, Project.id)
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+
+    rows = (await db.execute(stmt)).mappings().all()
+    next_after = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_after = (rows[-1]["name"], rows[-1]["id"])
+    return [{f: row[f] for f in out_fields} for row in rows], next_after
+
+
+_NAME_SEP = "\x1f"  # joins names inside the coverage aggregates; never typed in a name
+
+
+def get_skill_coverage(
+    db: Session,
+    project_id: Optional[str] = None,
+    active: Optional[bool] = None,
+) -> List[dict]:
+    """
+    Coverage of required skills by the employees assigned to each project, in
+    one grouped query: per required skill, who holds it at min_level or above
+    (covered), who holds it below (partial). Rows are ordered by project name,
+    then skill name; required skills missing from the catalog are left out.
+    """
+    min_level = func.coalesce(ProjectRequiredSkill.min_level, 2)
+    qualifying = case((EmployeeSkill.proficiency_level >= min_level, Employee.name))
+    below = case((EmployeeSkill.proficiency_level < min_level, Employee.name))
+    stmt = (
+        select(
+            Project.id.label("project_id"),
+            Project.name.label("project_name"),
+            ProjectRequiredSkill.skill_id,
+            SkillCatalog.name.label("skill_name"),
+            SkillCatalog.category.label("skill_category"),
+            min_level.label("min_level"),
+            func.aggregate_strings(qualifying, _NAME_SEP).label("qualifying"),
+            func.aggregate_strings(below, _NAME_SEP).label("partial"),
+        )
+        .select_from(ProjectRequiredSkill)
+        .join(Project, Project.id == ProjectRequiredSkill.project_id)
+        .join(SkillCatalog, SkillCatalog.id == ProjectRequiredSkill.skill_id)
+        .outerjoin(EmployeeProject, EmployeeProject.project_id == ProjectRequiredSkill.project_id)
+        .outerjoin(EmployeeSkill, and_(
+            EmployeeSkill.employee_id == EmployeeProject.user_id,
+            EmployeeSkill.skill_catalog_id == ProjectRequiredSkill.skill_id,
+        ))
+        .outerjoin(Employee, Employee.id == EmployeeSkill.employee_id)
+        .group_by(
+            ProjectRequiredSkill.id, Project.id, Project.name, ProjectRequiredSkill.skill_id,
+            SkillCatalog.name, SkillCatalog.category, ProjectRequiredSkill.min_level,
+        )
+        .order_by(Project.name, Project.id, SkillCatalog.name)
+    )
+    if project_id is not None:
+        stmt = stmt.where(ProjectRequiredSkill.project_id == project_id)
     if active is not None:
-        query = query.filter(Project.is_active == active)
-    if client_id is not None:
-        query = query.filter(Project.client_id == client_id)
-    if status is not None:
-        query = query.filter(Project.status == status)
-    return query.order_by(Project.name).all()
+        stmt = stmt.where(Project.is_active == active)
+
+    result = []
+    for row in db.execute(stmt).mappings():
+        data = dict(row)
+        qualifying_names, partial_names = (
+            sorted(set(names.split(_NAME_SEP))) if names else []
+            for names in (data.pop("qualifying"), data.pop("partial"))
+        )
+        data["coverage_status"] = "covered" if qualifying_names else ("partial" if partial_names else "missing")
+        data["covered_by_names"] = qualifying_names or partial_names
+        result.append(data)
+    return result
+
+
+def get_upcoming_invoice_projects(db: Session, date_from: date, date_to: date) -> List[Project]:
+    """Active billable projects whose next generation date falls in the range."""
+    return db.query(Project).filter(
+        Project.is_active == True,
+        Project.is_internal == False,
+        Project.next_invoice_on >= date_from,
+        Project.next_invoice_on <= date_to,
+    ).order_by(Project.next_invoice_on, Project.name).all()
 
 
 def get_project(db: Session, project_id: str) -> Optional[Project]:
@@ -41,6 +189,13 @@ def update_project(db: Session, project_id: str, project_in: ProjectUpdate) -> O
     data = project_in.model_dump(exclude_unset=True)
     for field, value in data.items():
         setattr(db_project, field, value)
+    if any(field in data for field in BILLING_SCHEDULE_FIELDS):
+        refresh_next_invoice_on(db_project)
+    elif any(field in data for field in NEXT_INVOICE_FIELDS):
+        # Reactivated: a date that passed while the project was skipped moves
+        # to its next cycle rather than being invoiced on the next run
+        if db_project.next_invoice_on is None or db_project.next_invoice_on < date.today():
+            refresh_next_invoice_on(db_project, last_invoice_date=db_project.next_invoice_on)
     db.commit()
     db.refresh(db_project)
     return db_project
@@ -0,0 +1,193 @@
+"""
+Scheduler leadership.
+
+Every uvicorn worker / replica starts the APScheduler jobs, but only the
+process holding a job's lock actually runs it.
+
+Backends:
+  postgres — session-level pg_try_advisory_lock on a dedicated connection.
+             The lease is renewed by a heartbeat on that connection; if the
+             leader process dies the server drops the session and the lock.
+  local    — in-process threading.Lock. Used for SQLite / tests / single
+             process dev, where there is nothing to coordinate with.
+
+Failover: replicas that lose the race keep polling for
+SCHEDULER_FAILOVER_WINDOW_SECONDS. When the lock frees up they take it and ask
+the job's `done_check` whether the leader finished; if not (leader died
+mid-run) they run the job themselves.
+
+The job is called with the held lock as its lease. Once `lease.lost` is set
+(the heartbeat connection failed, so the server has dropped the lock and a
+standby may take over) the job must stop before committing more work.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LEADER_BACKEND = os.getenv("SCHEDULER_LEADER_BACKEND", "auto")  # auto | postgres | local
+SCHEDULER_LEASE_RENEW_SECONDS = max(1, int(os.getenv("SCHEDULER_LEASE_RENEW_SECONDS", "15")))
+SCHEDULER_FAILOVER_WINDOW_SECONDS = max(0, int(os.getenv("SCHEDULER_FAILOVER_WINDOW_SECONDS", "1800")))
+SCHEDULER_FAILOVER_POLL_SECONDS = max(1, int(os.getenv("SCHEDULER_FAILOVER_POLL_SECONDS", "30")))
+
+
+def _lock_key(job_id: str) -> int:
+    """Stable signed 64-bit key for pg advisory locks."""
+    return int.from_bytes(hashlib.sha1(f"h_tracker:{job_id}".encode()).digest()[:8], "big", signed=True)
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+
+class PostgresLeaderLock:
+    """Advisory lock held on a dedicated AUTOCOMMIT connection."""
+
+    def __init__(self, engine, job_id: str):
+        self.engine = engine
+        self.job_id = job_id
+        self.key = _lock_key(job_id)
+        self._conn = None
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+        self.lost = False
+
+    def acquire(self) -> bool:
+        conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            got = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": self.key}).scalar()
+        except Exception:
+            conn.invalidate()
+            conn.close()
+            raise
+        if not got:
+            conn.close()
+            return False
+        self._conn = conn
+        self.lost = False
+        self._stop.clear()
+        self._heartbeat = threading.Thread(
+            target=self._renew, name=f"leader-lease-{self.job_id}", daemon=True,
+        )
+        self._heartbeat.start()
+        return True
+
+    def _renew(self):
+        while not self._stop.wait(SCHEDULER_LEASE_RENEW_SECONDS):
+            try:
+                # The lock lives as long as this server session does, so a
+                # live connection is a live lease (also defeats idle timeouts)
+                self._conn.execute(text("SELECT 1"))
+            except Exception as e:
+                self.lost = True
+                logger.error(f"[Leader] Lease for '{self.job_id}' lost: {e}")
+                return
+
+    def release(self):
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.join(timeout=5)
+            self._heartbeat = None
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": self.key})
+        except Exception as e:
+            # Dropping the server session is the only other way to free the lock
+            logger.warning(f"[Leader] Unlock of '{self.job_id}' failed, invalidating connection: {e}")
+            conn.invalidate()
+        finally:
+            conn.close()
+
+
+_local_locks: dict[str, threading.Lock] = {}
+_local_locks_guard = threading.Lock()
+
+
+class LocalLeaderLock:
+    """In-process stand-in with the same interface as PostgresLeaderLock."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        with _local_locks_guard:
+            self._lock = _local_locks.setdefault(job_id, threading.Lock())
+        self.lost = False
+
+    def acquire(self) -> bool:
+        return self._lock.acquire(blocking=False)
+
+    def release(self):
+        if self._lock.locked():
+            self._lock.release()
+
+
+def get_leader_lock(job_id: str):
+    from config.database import scheduler_engine
+
+    backend = SCHEDULER_LEADER_BACKEND
+    if backend == "auto":
+        backend = "postgres" if scheduler_engine.dialect.name == "postgresql" else "local"
+    if backend == "postgres":
+        return PostgresLeaderLock(scheduler_engine, job_id)
+    return LocalLeaderLock(job_id)
+
+
+# ── Job wrapper ───────────────────────────────────────────────────────────────
+
+@contextmanager
+def leadership(job_id: str):
+    """Yield the held lock, or None if another process is the leader."""
+    lock = get_leader_lock(job_id)
+    if not lock.acquire():
+        yield None
+        return
+    try:
+        yield lock
+    finally:
+        lock.release()
+
+
+def run_as_leader(job_id: str, job: Callable[..., None], done_check: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Run `job(lease)` only if this process wins (or inherits) the lock for `job_id`.
+    `done_check` is consulted once the lock is held so a run another process
+    already completed (or a late-firing replica) does not repeat it.
+    Returns True if this process ran the job.
+    """
+    deadline = time.monotonic() + SCHEDULER_FAILOVER_WINDOW_SECONDS
+    standby = False
+    while True:
+        with leadership(job_id) as lock:
+            if lock is not None:
+                if done_check and done_check():
+                    logger.info(f"[Leader] '{job_id}' already completed by another process")
+                    return False
+                logger.info(f"[Leader] Running '{job_id}' as leader (pid {os.getpid()})")
+                job(lock)
+                if lock.lost:
+                    logger.warning(f"[Leader] '{job_id}' stopped early: its lease was lost")
+                return True
+
+        if not standby:
+            logger.info(f"[Leader] '{job_id}' is held by another process — standing by")
+            standby = True
+        if time.monotonic() + SCHEDULER_FAILOVER_POLL_SECONDS > deadline:
+            return False
+        time.sleep(SCHEDULER_FAILOVER_POLL_SECONDS)
+
+
+def leader_job(job_id: str, job: Callable[..., None], done_check: Optional[Callable[[], bool]] = None) -> Callable[[], None]:
+    """Wrap `job` for APScheduler so only the elected leader executes it."""
+    def _run():
+        try:
+            run_as_leader(job_id, job, done_check)
+        except Exception as e:
+            logger.error(f"[Leader] '{job_id}' failed: {e}")
+    _run.__name__ = getattr(job, "__name__", job_id)
+    return _run
@@ -0,0 +1,154 @@
+"""
+Cross-entity search behind GET /search.
+
+Name mode matches employee, client, project and skill names; text mode
+matches employee and client notes and project descriptions. Each requested
+kind is one SELECT of a single UNION ALL, so a search is one round trip.
+
+On Postgres with pg_trgm (migration 029) names match by substring or by
+trigram word similarity, so typos still hit, ranked by word_similarity; text
+mode ranks websearch_to_tsquery matches with ts_rank. Both are served by the
+GIN indexes of migration 029. Without pg_trgm, and on SQLite, names match by
+substring only and a few times `limit` candidates are ranked here with the
+same trigram measure; text mode then requires every query word and ranks by
+occurrences.
+"""
+import re
+from typing import Dict, List, Sequence
+
+from sqlalchemy import Float, and_, func, literal, literal_column, or_, select, text, union_all
+from sqlalchemy.orm import Session
+
+from models.clients import Client
+from models.employees import Employee
+from models.projects import Project
+from models.skill_catalog import SkillCatalog
+
+SEARCH_KINDS = ("employees", "clients", "projects", "skills")
+TEXT_SEARCH_KINDS = ("employees", "clients", "projects")
+
+# Must match the expressions of the migration 029 full-text indexes
+_TS_CONFIG = literal_column("'english'")
+
+# Unranked fallback: candidates fetched per kind, as a multiple of `limit`
+_FALLBACK_CANDIDATES = 5
+
+# kind: (model, name column, detail column, full-text column)
+_SOURCES = {
+    "employees": (Employee, Employee.name, Employee.title, Employee.notes),
+    "clients": (Client, Client.name, Client.client_code, Client.notes),
+    "projects": (Project, Project.name, Project.project_code, Project.description),
+    "skills": (SkillCatalog, SkillCatalog.name, SkillCatalog.category, None),
+}
+
+_trigram_support: Dict[str, bool] = {}
+
+
+def _has_trigram(db: Session) -> bool:
+    """pg_trgm installed in this database; checked once per engine URL."""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+    key = str(bind.url)
+    if key not in _trigram_support:
+        found = db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+        _trigram_support[key] = found is not None
+    return _trigram_support[key]
+
+
+def _contains(column, term: str):
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.ilike(f"%{escaped}%", escape="\\")
+
+
+def _kind_stmt(kind: str, q: str, mode: str, limit: int, ranked: bool):
+    model, name, detail, body = _SOURCES[kind]
+    if mode == "text":
+        if ranked:
+            vector = func.to_tsvector(_TS_CONFIG, func.coalesce(body, literal_column("''")))
+            query = func.websearch_to_tsquery(_TS_CONFIG, q)
+            matches, score = vector.op("@@")(query), func.ts_rank(vector, query)
+        else:
+            matches = and_(*[_contains(body, word) for word in q.split()])
+            score = literal(0.0, Float)
+    elif ranked:
+        matches = or_(_contains(name, q), literal(q).op("<%")(name))
+        score = func.word_similarity(q, name)
+    else:
+        matches, score = _contains(name, q), literal(0.0, Float)
+
+    stmt = (
+        select(
+            literal(kind).label("kind"),
+            model.id.label("id"),
+            name.label("name"),
+            detail.label("detail"),
+            score.label("score"),
+        )
+        .where(matches)
+        .order_by(*([score.desc(), name] if ranked else [name]))
+        .limit(limit if ranked else limit * _FALLBACK_CANDIDATES)
+    )
+    if mode == "text" and not ranked:
+        stmt = stmt.add_columns(body.label("body"))  # scored in Python
+    # Wrapped so each kind keeps its own ORDER BY / LIMIT inside the UNION ALL
+    return select(stmt.subquery())
+
+
+def _trigrams(value: str) -> set:
+    """pg_trgm's trigrams: per lower-cased word, padded with two spaces in front and one behind."""
+    grams = set()
+    for word in re.findall(r"\w+", value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _similarity(a: str, b: str) -> float:
+    ta, tb = _trigrams(a), _trigrams(b)
+    return len(ta & tb) / len(ta | tb) if ta | tb else 0.0
+
+
+def _fallback_score(q: str, mode: str, hit: dict, body) -> float:
+    if mode == "text":
+        body = (body or "").lower()
+        return float(sum(body.count(word.lower()) for word in q.split()))
+    # Best of the whole name and its single words, close to word_similarity
+    return max([_similarity(q, hit["name"])] + [_similarity(q, w) for w in hit["name"].split()])
+
+
+def search(
+    db: Session,
+    q: str,
+    kinds: Sequence[str] = SEARCH_KINDS,
+    mode: str = "name",
+    limit: int = 10,
+) -> Dict[str, List[dict]]:
+    """
+    {kind: [{id, name, detail, score}, ...]} best first, at most `limit` per
+    kind. Kinds without a full-text column are skipped in text mode.
+    """
+    q = q.strip()
+    kinds = [k for k in kinds if mode == "name" or k in TEXT_SEARCH_KINDS]
+    results: Dict[str, List[dict]] = {k: [] for k in kinds}
+    if not q or not kinds:
+        return results
+
+    if mode == "text":
+        ranked = db.get_bind().dialect.name == "postgresql"
+    else:
+        ranked = _has_trigram(db)
+    stmts = [_kind_stmt(kind, q, mode, limit, ranked) for kind in kinds]
+    stmt = union_all(*stmts) if len(stmts) > 1 else stmts[0]
+
+    for row in db.execute(stmt).mappings():
+        hit = {"id": row["id"], "name": row["name"], "detail": row["detail"], "score": float(row["score"])}
+        if not ranked:
+            hit["score"] = _fallback_score(q, mode, hit, row.get("body"))
+        results[row["kind"]].append(hit)
+
+    if not ranked:
+        for kind, hits in results.items():
+            hits.sort(key=lambda h: (-h["score"], h["name"]))
+            del hits[limit:]
+    return results
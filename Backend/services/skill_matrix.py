@@ -0,0 +1,284 @@
+"""
+In-memory skill matrix for staffing searches.
+
+One bulk load builds an employees × catalog-skills matrix of proficiency
+levels (0 = does not have the skill) and a same-shaped matrix of the skill
+category each level was recorded under. The assignable-employees filters
+(skill_match all/any, min_level, category) and match_score are then array
+operations over every employee at once instead of per-employee queries.
+
+Employees, employee skills and catalog entries committed through any Session
+in this process mark the matrix dirty: touched employees are reloaded on the
+next search (one query for all of them), a catalog change rebuilds it. Writes
+from other processes (seed scripts, a second worker) are picked up by the
+full rebuild every SKILL_MATRIX_MAX_AGE_SECONDS.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from models.employee_skills import EmployeeSkill
+from models.employees import Employee
+from models.skill_catalog import SkillCatalog
+
+logger = logging.getLogger(__name__)
+
+SKILL_MATRIX_MAX_AGE_SECONDS = max(0.0, float(os.getenv("SKILL_MATRIX_MAX_AGE_SECONDS", "300")))
+
+_REBUILD = object()  # dirty marker for changes that need a full rebuild
+
+
+@dataclass
+class Candidate:
+    id: str
+    name: str
+    title: Optional[str]
+    skills: list            # _SkillRow, already filtered by category
+    match_score: int
+    matched_skills: List[str] = field(default_factory=list)
+    missing_skills: List[str] = field(default_factory=list)
+
+
+class _SkillRow:
+    """The EmployeeSkill columns the search returns, detached from any session."""
+
+    __slots__ = ("skill_catalog_id", "skill_name", "category", "proficiency_level", "years_experience")
+
+    def __init__(self, s):
+        for name in self.__slots__:
+            setattr(self, name, getattr(s, name))
+
+
+class SkillMatrix:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built_at = float("-inf")
+        self._dirty: set = set()
+        self.rebuilds = 0
+        self.row_reloads = 0
+        self._reset()
+
+    def _reset(self):
+        self.employee_ids: List[str] = []
+        self.names: List[str] = []
+        self.titles: List[Optional[str]] = []
+        self.row_skills: List[list] = []
+        self.row_of: dict = {}
+        self.present = np.zeros(0, dtype=bool)            # False once an employee is deleted
+        self.col_of: dict = {}                            # catalog id -> column
+        self.catalog_names: dict = {}
+        self.category_codes: dict = {}                    # category -> code, 0 = none
+        self.levels = np.zeros((0, 0), dtype=np.int8)
+        self.categories = np.zeros((0, 0), dtype=np.int16)
+
+    # ── Loading ──────────────────────────────────────────────────────────────
+
+    def invalidate(self, keys):
+        """Employee ids to reload, or _REBUILD; called after commits that touch skills."""
+        with self._lock:
+            self._dirty.update(keys)
+
+    def _refresh(self):
+        if time.monotonic() - self._built_at >= SKILL_MATRIX_MAX_AGE_SECONDS or _REBUILD in self._dirty:
+            self._rebuild()
+        elif self._dirty:
+            if not self._reload_rows(self._dirty):
+                self._rebuild()
+        self._dirty = set()
+
+    def _rebuild(self):
+        install_hooks()
+        start = time.perf_counter()
+        # The primary, not the replica: a lagging replica would make a reload
+        # right after a commit read the old skills and mark them clean
+        with SessionLocal() as db:
+            self._reset()
+            catalog = db.execute(select(SkillCatalog.id, SkillCatalog.name)).all()
+            self.col_of = {sid: i for i, (sid, _) in enumerate(catalog)}
+            self.catalog_names = dict(catalog)
+            employees = db.execute(
+                select(Employee.id, Employee.name, Employee.title).order_by(Employee.name)
+            ).all()
+            n = len(employees)
+            self.employee_ids = [e.id for e in employees]
+            self.names = [e.name for e in employees]
+            self.titles = [e.title for e in employees]
+            self.row_skills = [[] for _ in range(n)]
+            self.row_of = {eid: i for i, eid in enumerate(self.employee_ids)}
+            self.present = np.ones(n, dtype=bool)
+            self.levels = np.zeros((n, len(catalog)), dtype=np.int8)
+            self.categories = np.zeros((n, len(catalog)), dtype=np.int16)
+            self._fill(db.scalars(select(EmployeeSkill)))
+        self._built_at = time.monotonic()
+        self.rebuilds += 1
+        logger.info(
+            f"[SkillMatrix] Built {self.levels.shape[0]} employees x {self.levels.shape[1]} skills "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+
+    def _reload_rows(self, employee_ids) -> bool:
+        """Reload the given employees in place. False if a full rebuild is needed instead."""
+        with SessionLocal() as db:
+            employees = {
+                e.id: e for e in db.execute(
+                    select(Employee.id, Employee.name, Employee.title).where(Employee.id.in_(employee_ids))
+                )
+            }
+            skills = list(db.scalars(select(EmployeeSkill).where(EmployeeSkill.employee_id.in_(employee_ids))))
+        if any(s.skill_catalog_id and s.skill_catalog_id not in self.col_of for s in skills):
+            return False
+
+        new_ids = [eid for eid in employees if eid not in self.row_of]
+        if new_ids:
+            extra = len(new_ids)
+            self.present = np.concatenate([self.present, np.ones(extra, dtype=bool)])
+            self.levels = np.vstack([self.levels, np.zeros((extra, self.levels.shape[1]), dtype=np.int8)])
+            self.categories = np.vstack([self.categories, np.zeros((extra, self.levels.shape[1]), dtype=np.int16)])
+            for eid in new_ids:
+                self.row_of[eid] = len(self.employee_ids)
+                self.employee_ids.append(eid)
+                self.names.append("")
+                self.titles.append(None)
+                self.row_skills.append([])
+
+        for eid in employee_ids:
+            row = self.row_of.get(eid)
+            if row is None:
+                continue
+            self.levels[row] = 0
+            self.categories[row] = 0
+            self.row_skills[row] = []
+            emp = employees.get(eid)
+            self.present[row] = emp is not None
+            if emp is not None:
+                self.names[row], self.titles[row] = emp.name, emp.title
+        self._fill(skills)
+        self.row_reloads += len(employee_ids)
+        return True
+
+    def _fill(self, skills):
+        for s in skills:
+            row = self.row_of.get(s.employee_id)
+            if row is None:
+                continue
+            self.row_skills[row].append(_SkillRow(s))
+            col = self.col_of.get(s.skill_catalog_id)
+            # Several records for one catalog skill: the highest level counts
+            if col is not None and s.proficiency_level > self.levels[row, col]:
+                self.levels[row, col] = s.proficiency_level
+                self.categories[row, col] = self.category_codes.setdefault(s.category, len(self.category_codes) + 1)
+
+    # ── Search ───────────────────────────────────────────────────────────────
+
+    def search(
+        self,
+        skill_ids: Sequence[str] = (),
+        skill_match: str = "all",
+        min_level: int = 1,
+        category: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> List[Candidate]:
+        """
+        Employees ordered by name, filtered and scored like the
+        assignable-employees search: a requested skill is matched when held at
+        min_level or above (and under `category`, if given). Unknown skill ids
+        are reported missing under their id.
+        """
+        with self._lock:
+            self._refresh()
+            rows = np.flatnonzero(self.present)
+            if name:
+                needle = name.lower()
+                rows = rows[[needle in self.names[r].lower() for r in rows]]
+
+            skill_ids = list(dict.fromkeys(skill_ids))
+            matched = np.zeros((len(rows), len(skill_ids)), dtype=bool)
+            known = [(i, self.col_of[sid]) for i, sid in enumerate(skill_ids) if sid in self.col_of]
+            if known and len(rows):
+                positions, cols = map(list, zip(*known))
+                levels = self.levels[np.ix_(rows, cols)]
+                hit = levels >= min_level
+                if category is not None:
+                    code = self.category_codes.get(category, -1)
+                    hit &= self.categories[np.ix_(rows, cols)] == code
+                matched[:, positions] = hit
+
+            counts = matched.sum(axis=1)
+            if skill_ids:
+                scores = np.rint(counts / len(skill_ids) * 100).astype(int)
+                if skill_match == "all":
+                    keep = counts == len(skill_ids)
+                elif skill_match == "any":
+                    keep = counts > 0
+                else:
+                    keep = np.ones(len(rows), dtype=bool)
+                rows, matched, scores = rows[keep], matched[keep], scores[keep]
+            else:
+                scores = np.full(len(rows), 100)
+
+            display = [self.catalog_names.get(sid, sid) for sid in skill_ids]
+            result = []
+            for row, hits, score in zip(rows.tolist(), matched.tolist(), scores.tolist()):
+                skills = self.row_skills[row]
+                if category is not None:
+                    skills = [s for s in skills if s.category == category]
+                result.append(Candidate(
+                    id=self.employee_ids[row],
+                    name=self.names[row],
+                    title=self.titles[row],
+                    skills=skills,
+                    match_score=score,
+                    matched_skills=[d for d, h in zip(display, hits) if h],
+                    missing_skills=[d for d, h in zip(display, hits) if not h],
+                ))
+        # Rows reloaded incrementally are appended, not in name order
+        result.sort(key=lambda c: c.name)
+        return result
+
+
+skill_matrix = SkillMatrix()
+
+
+# ── Invalidation ─────────────────────────────────────────────────────────────
+
+def _collect(session, flush_context):
+    touched = session.info.setdefault("skill_matrix_dirty", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, EmployeeSkill):
+            touched.add(obj.employee_id)
+        elif isinstance(obj, Employee):
+            touched.add(obj.id)
+        elif isinstance(obj, SkillCatalog):
+            touched.add(_REBUILD)
+
+
+def _after_commit(session):
+    touched = session.info.pop("skill_matrix_dirty", None)
+    if touched:
+        skill_matrix.invalidate(touched)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    session.info.pop("skill_matrix_dirty", None)
+
+
+_hooks_installed = False
+
+
+def install_hooks():
+    """Track skill changes on every Session. Idempotent; done on the first build."""
+    global _hooks_installed
+    if not _hooks_installed:
+        event.listen(Session, "after_flush", _collect)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_soft_rollback", _after_soft_rollback)
+        _hooks_installed = True
@@ -1,9 +1,19 @@
-from typing import List, Optional
-from datetime import date
+import uuid
+from typing import Any, List, Optional, Tuple
+from datetime import date, datetime, timezone
+from pydantic import ValidationError
+from sqlalchemy import and_, func, or_, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from models.employees import Employee
+from models.project_roles import ProjectRole
+from models.projects import Project
 from models.time_entries import TimeEntry
-from schemas.time_entries import TimeEntryCreate, TimeEntryUpdate
+from schemas.time_entries import BulkTimeEntryRow, TimeEntryCreate, TimeEntryUpdate
+
+BULK_INSERT_PAGE_SIZE = 1000
+_BULK_COLUMNS = ("id", "user_id", "project_id", "role_id", "date", "hours", "billable", "notes", "status", "created_at")
 
 
 def create_time_entry(db: Session, entry_in: TimeEntryCreate) -> TimeEntry:
@@ -15,29 +25,67 @@ def create_time_entry(db: Session, entry_in: TimeEntryCreate) -> TimeEntry:
     return db_entry
 
 
-def get_time_entries(
-    db: Session,
+def _filtered_stmt(
     user_id: Optional[str] = None,
     project_id: Optional[str] = None,
     date_gte: Optional[date] = None,
     date_lte: Optional[date] = None,
     billable: Optional[bool] = None,
     status: Optional[str] = None,
-) -> List[TimeEntry]:
-    query = db.query(TimeEntry)
+):
+    stmt = select(TimeEntry)
     if user_id is not None:
-        query = query.filter(TimeEntry.user_id == user_id)
+        stmt = stmt.where(TimeEntry.user_id == user_id)
     if project_id is not None:
-        query = query.filter(TimeEntry.project_id == project_id)
+        stmt = stmt.where(TimeEntry.project_id == project_id)
     if date_gte is not None:
-        query = query.filter(TimeEntry.date >= date_gte)
+        stmt = stmt.where(TimeEntry.date >= date_gte)
     if date_lte is not None:
-        query = query.filter(TimeEntry.date <= date_lte)
+        stmt = stmt.where(TimeEntry.date <= date_lte)
     if billable is not None:
-        query = query.filter(TimeEntry.billable == billable)
+        stmt = stmt.where(TimeEntry.billable == billable)
     if status is not None:
-        query = query.filter(TimeEntry.status == status)
-    return query.order_by(TimeEntry.date.desc()).all()
+        stmt = stmt.where(TimeEntry.status == status)
+    return stmt
+
+
+def get_time_entries(db: Session, **filters) -> List[TimeEntry]:
+    return list(db.scalars(_filtered_stmt(**filters).order_by(TimeEntry.date.desc())))
+
+
+async def get_time_entries_async(db: AsyncSession, limit: Optional[int] = None, **filters) -> List[TimeEntry]:
+    """Ordered like get_time_entries_page (date desc, id desc); at most `limit` rows when given."""
+    stmt = _filtered_stmt(**filters).order_by(TimeEntry.date.desc(), TimeEntry.id.desc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return list(await db.scalars(stmt))
+
+
+def get_time_entries_page(
+    db: Session,
+    limit: int,
+    after: Optional[Tuple[date, str]] = None,
+    include_total: bool = False,
+    **filters,
+) -> Tuple[List[TimeEntry], bool, Optional[int]]:
+    """
+    Keyset page ordered by (date desc, id desc), starting after the
+    (date, id) of the previous page's last row. Returns (items, has_more, total);
+    total is only counted when include_total is set since it scans every
+    matching row.
+    """
+    stmt = _filtered_stmt(**filters)
+    total = db.scalar(select(func.count()).select_from(stmt.subquery())) if include_total else None
+
+    if after:
+        after_date, after_id = after
+        stmt = stmt.where(or_(
+            TimeEntry.date < after_date,
+            and_(TimeEntry.date == after_date, TimeEntry.id < after_id),
+        ))
+
+    rows = list(db.scalars(stmt.order_by(TimeEntry.date.desc(), TimeEntry.id.desc()).limit(limit + 1)))
+    return rows[:limit], len(rows) > limit, total
 
 
 def get_time_entry(db: Session, entry_id: str) -> Optional[TimeEntry]:
@@ -63,3 +111,156 @@ def delete_time_entry(db: Session, entry_id: str) -> bool:
     db.delete(db_entry)
     db.commit()
     return True
+
+
+# ── Bulk ingestion ────────────────────────────────────────────────────────────
+
+def bulk_create_time_entries(
+    db: Session,
+    rows: List[Any],
+    on_existing: str = "skip",
+    all_or_nothing: bool = False,
+) -> dict:
+    """
+    Validate and insert many time entries in one transaction.
+
+    - Rows are validated individually against BulkTimeEntryRow, then employees,
+      projects and roles are checked with one query each.
+    - Rows sharing (user_id, project_id, date, role_id) are deduped: the last
+      one in the payload wins.
+    - A row whose key already exists in the table is skipped, or updates the
+      existing entry when on_existing="update".
+    - New rows go in through psycopg2 execute_values (Core executemany on
+      other drivers).
+
+    With all_or_nothing, any invalid row aborts the whole batch.
+    Returns: {"received", "inserted", "updated", "skipped", "errors": [{"index", "status", "detail"}]}
+    """
+    errors: List[dict] = []
+    valid: dict = {}  # key -> (index, BulkTimeEntryRow)
+
+    for index, raw in enumerate(rows):
+        try:
+            entry = BulkTimeEntryRow.model_validate(raw)
+        except ValidationError as e:
+            errors.append({"index": index, "status": "invalid", "detail": _validation_message(e)})
+            continue
+        key = (entry.user_id, entry.project_id, entry.date, entry.role_id)
+        if key in valid:
+            errors.append({"index": valid[key][0], "status": "duplicate", "detail": f"superseded by row {index}"})
+        valid[key] = (index, entry)
+
+    valid = _drop_unknown_references(db, valid, errors)
+
+    if all_or_nothing and any(e["status"] == "invalid" for e in errors):
+        return {"received": len(rows), "inserted": 0, "updated": 0, "skipped": len(rows), "errors": _sorted(errors)}
+
+    existing = _existing_entry_ids(db, list(valid))
+    now = datetime.now(timezone.utc)
+    to_insert, to_update = [], []
+    for key, (index, entry) in valid.items():
+        existing_id = existing.get(key)
+        if existing_id is None:
+            to_insert.append({"id": str(uuid.uuid4()), **entry.model_dump(), "created_at": now})
+        elif on_existing == "update":
+            to_update.append({"id": existing_id, **entry.model_dump()})
+        else:
+            errors.append({"index": index, "status": "exists", "detail": f"time entry {existing_id} already exists"})
+
+    try:
+        _insert_rows(db, to_insert)
+        if to_update:
+            db.execute(update(TimeEntry), to_update)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {
+        "received": len(rows),
+        "inserted": len(to_insert),
+        "updated": len(to_update),
+        "skipped": len(rows) - len(to_insert) - len(to_update),
+        "errors": _sorted(errors),
+    }
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+    )
+
+
+def _sorted(errors: List[dict]) -> List[dict]:
+    return sorted(errors, key=lambda e: e["index"])
+
+
+def _drop_unknown_references(db: Session, valid: dict, errors: List[dict]) -> dict:
+    """Set-based FK check: one query each for employees, projects and roles."""
+    entries = [entry for _, entry in valid.values()]
+    user_ids = {e.user_id for e in entries}
+    project_ids = {e.project_id for e in entries}
+    role_ids = {e.role_id for e in entries if e.role_id}
+
+    known_users = {r[0] for r in db.query(Employee.id).filter(Employee.id.in_(user_ids))} if user_ids else set()
+    known_projects = {r[0] for r in db.query(Project.id).filter(Project.id.in_(project_ids))} if project_ids else set()
+    role_project = dict(
+        db.query(ProjectRole.id, ProjectRole.project_id).filter(ProjectRole.id.in_(role_ids))
+    ) if role_ids else {}
+
+    kept = {}
+    for key, (index, entry) in valid.items():
+        if entry.user_id not in known_users:
+            detail = f"unknown user_id {entry.user_id}"
+        elif entry.project_id not in known_projects:
+            detail = f"unknown project_id {entry.project_id}"
+        elif entry.role_id and role_project.get(entry.role_id) != entry.project_id:
+            detail = f"role_id {entry.role_id} does not belong to project {entry.project_id}"
+        else:
+            kept[key] = (index, entry)
+            continue
+        errors.append({"index": index, "status": "invalid", "detail": detail})
+    return kept
+
+
+def _existing_entry_ids(db: Session, keys: list) -> dict:
+    """Returns: {(user_id, project_id, date, role_id): id} for keys already in time_entries."""
+    if not keys:
+        return {}
+    user_ids = {k[0] for k in keys}
+    dates = [k[2] for k in keys]
+    wanted = set(keys)
+    rows = db.query(
+        TimeEntry.id, TimeEntry.user_id, TimeEntry.project_id, TimeEntry.date, TimeEntry.role_id,
+    ).filter(
+        TimeEntry.user_id.in_(user_ids),
+        TimeEntry.date >= min(dates),
+        TimeEntry.date <= max(dates),
+    )
+    found = {}
+    for r in rows:
+        key = (r.user_id, r.project_id, r.date, r.role_id)
+        if key in wanted:
+            found.setdefault(key, r.id)
+    return found
+
+
+def _insert_rows(db: Session, rows: List[dict]):
+    if not rows:
+        return
+    conn = db.connection()
+    if conn.dialect.driver != "psycopg2":
+        db.execute(insert(TimeEntry), rows)
+        return
+
+    from psycopg2.extras import execute_values
+    cursor = conn.connection.cursor()
+    try:
+        execute_values(
+            cursor,
+            f"INSERT INTO time_entries ({', '.join(_BULK_COLUMNS)}) VALUES %s",
+            [tuple(row[c] for c in _BULK_COLUMNS) for row in rows],
+            page_size=BULK_INSERT_PAGE_SIZE,
+        )
+    finally:
+        cursor.close()
@@ -0,0 +1,63 @@
+"""
+Reads over the unbilled_hours ledger (see models/unbilled_hours.py).
+
+On Postgres the ledger is kept current by triggers, so these are single
+indexed aggregates. Other dialects (SQLite dev/tests) have no triggers and
+fall back to the equivalent anti-join over time_entries.
+"""
+from datetime import date
+from typing import Iterable, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from models.invoice_time_entries import InvoiceTimeEntry
+from models.time_entries import TimeEntry
+from models.unbilled_hours import UnbilledHours, UNBILLED_LEDGER_REBUILD_SQL
+
+
+def unbilled_by_project(
+    db: Session,
+    project_ids: Optional[Iterable[str]] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> dict:
+    """
+    Returns: {project_id: (hours, entry_count)} for projects with unbilled
+    billable hours in the range. `project_ids=None` means every project.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        project_col, day_col = UnbilledHours.project_id, UnbilledHours.day
+        query = db.query(project_col, func.sum(UnbilledHours.hours), func.sum(UnbilledHours.entry_count))
+    else:
+        linked = db.query(InvoiceTimeEntry.id).filter(InvoiceTimeEntry.time_entry_id == TimeEntry.id).exists()
+        project_col, day_col = TimeEntry.project_id, TimeEntry.date
+        query = db.query(project_col, func.sum(TimeEntry.hours), func.count(TimeEntry.id)).filter(
+            TimeEntry.billable == True,
+            TimeEntry.status == 'normal',
+            ~linked,
+        )
+
+    if project_ids is not None:
+        project_ids = list(project_ids)
+        if not project_ids:
+            return {}
+        query = query.filter(project_col.in_(project_ids))
+    if date_from is not None:
+        query = query.filter(day_col >= date_from)
+    if date_to is not None:
+        query = query.filter(day_col <= date_to)
+
+    return {
+        project_id: (float(hours or 0), int(count or 0))
+        for project_id, hours, count in query.group_by(project_col).all()
+    }
+
+
+def rebuild_unbilled_ledger(db: Session) -> int:
+    """Recompute the whole ledger from time_entries. Returns the number of ledger rows."""
+    db.execute(text("LOCK TABLE time_entries, invoice_time_entries IN SHARE ROW EXCLUSIVE MODE"))
+    db.query(UnbilledHours).delete(synchronize_session=False)
+    db.execute(text(UNBILLED_LEDGER_REBUILD_SQL))
+    db.commit()
+    return db.query(func.count()).select_from(UnbilledHours).scalar()
@@ -0,0 +1,119 @@
+"""
+Application-lifetime HTTP clients for the external integrations.
+
+One httpx.AsyncClient per integration, opened on startup and closed on
+shutdown (main.py), so FreshSales and Expensify calls reuse pooled keep-alive
+connections (HTTP/2 where the server negotiates it) instead of paying a TCP
+and TLS handshake per call. Limits and timeouts are per integration:
+
+    HTTP_<NAME>_MAX_CONNECTIONS, HTTP_<NAME>_TIMEOUT_SECONDS
+
+and HTTP_KEEPALIVE_EXPIRY_SECONDS / HTTP_CLIENT_HTTP2 apply to all of them.
+stats() reports requests, new connections and HTTP/2 responses per client.
+
+Tests swap the network out with an httpx.MockTransport, before the app
+starts (e.g. before entering TestClient):
+
+    http_clients.use_transport(httpx.MockTransport(handler))   # all integrations
+    http_clients.use_transport(None)                           # back to the network
+"""
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+INTEGRATION_DEFAULTS = {
+    # name: (max_connections, timeout_seconds)
+    "freshsales": (10, 15.0),
+    "expensify": (4, 30.0),
+}
+
+
+class _ClientStats:
+    __slots__ = ("requests", "connections", "http2_responses")
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.http2_responses = 0
+
+
+class ClientRegistry:
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._stats = {name: _ClientStats() for name in INTEGRATION_DEFAULTS}
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+
+    async def start(self):
+        for name in INTEGRATION_DEFAULTS:
+            self.get(name)
+        logger.info(f"[HTTP] Clients ready: {', '.join(self._clients)}")
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """The shared client for an integration; created on first use outside the app (scripts)."""
+        client = self._clients.get(name)
+        if client is None:
+            client = self._clients[name] = self._build(name)
+        return client
+
+    def use_transport(self, transport: Optional[httpx.AsyncBaseTransport]):
+        """Route every integration through `transport` (None: the network). Clients are rebuilt lazily."""
+        self._transport = transport
+        self._clients = {}
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        max_connections, timeout = INTEGRATION_DEFAULTS[name]
+        prefix = f"HTTP_{name.upper()}_"
+        max_connections = int(os.getenv(prefix + "MAX_CONNECTIONS", str(max_connections)))
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60")),
+        )
+        return httpx.AsyncClient(
+            timeout=float(os.getenv(prefix + "TIMEOUT_SECONDS", str(timeout))),
+            limits=limits,
+            http2=os.getenv("HTTP_CLIENT_HTTP2", "true").lower() == "true",
+            transport=self._transport,
+            event_hooks=_event_hooks(self._stats[name]),
+        )
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "name": name,
+                "open": name in self._clients,
+                "requests": s.requests,
+                "connections_opened": s.connections,
+                "connections_reused": max(0, s.requests - s.connections),
+                "http2_responses": s.http2_responses,
+            }
+            for name, s in self._stats.items()
+        ]
+
+
+def _event_hooks(stats: _ClientStats) -> dict:
+    async def trace(event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.complete":
+            stats.connections += 1
+
+    async def on_request(request: httpx.Request):
+        stats.requests += 1
+        request.extensions["trace"] = trace
+
+    async def on_response(response: httpx.Response):
+        if response.http_version == "HTTP/2":
+            stats.http2_responses += 1
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+http_clients = ClientRegistry()
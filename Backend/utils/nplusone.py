@@ -0,0 +1,136 @@
+"""
+N+1 query detection.
+
+Records every SQL statement run in a scope, reduces it to its shape (literals,
+bind parameters and IN-lists replaced by "?") and flags shapes executed more
+than `threshold` times — the signature of a per-row lookup inside a loop.
+
+Two ways in:
+
+  with detect_n_plus_one(threshold=3):      # tests calling services directly
+      build_edit_data(db, invoice_id)
+
+  N_PLUS_ONE_DETECTION=raise                 # every request through main.app
+      log   — warn with the report, response unchanged
+      raise — raise NPlusOneError after the request (TestClient re-raises it,
+              so a pytest test hitting the route fails with the report)
+
+Both raise NPlusOneError, an AssertionError, so pytest shows the report as the
+failure message. check_n_plus_one.py runs every GET route against seeded data.
+"""
+import contextvars
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+_SELECT_LIST = re.compile(r"^SELECT .+? FROM ")
+
+
+def statement_shape(statement: str) -> str:
+    shape = _STRING.sub("?", statement)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+class QueryShapes:
+    """Statement shapes seen in one scope, with how often each ran."""
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.counts: Counter = Counter()
+
+    def add(self, statement: str):
+        self.counts[statement_shape(statement)] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def offenders(self) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.counts.most_common() if n > self.threshold]
+
+    def report(self, label: str) -> str:
+        lines = [f"N+1 suspects in {label}: {self.total} statements, shapes repeated more than {self.threshold}x:"]
+        for shape, n in self.offenders():
+            # The column list is noise in a report; the FROM / WHERE shows the loop
+            lines.append(f"  {n:>4}x  {_SELECT_LIST.sub('SELECT ... FROM ', shape)[:240]}")
+        return "\n".join(lines)
+
+
+_current: contextvars.ContextVar[Optional[QueryShapes]] = contextvars.ContextVar("n_plus_one_shapes", default=None)
+
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    shapes = _current.get()
+    if shapes is not None:
+        shapes.add(statement)
+
+
+_hooks_installed = False
+
+
+def install_hooks():
+    global _hooks_installed
+    if not _hooks_installed:
+        event.listen(Engine, "before_cursor_execute", _record)
+        _hooks_installed = True
+
+
+@contextmanager
+def detect_n_plus_one(threshold: int = 5, label: str = "block"):
+    """Raise NPlusOneError on exit if any statement shape ran more than `threshold` times."""
+    install_hooks()
+    shapes = QueryShapes(threshold)
+    token = _current.set(shapes)
+    try:
+        yield shapes
+    finally:
+        _current.reset(token)
+    if shapes.offenders():
+        raise NPlusOneError(shapes.report(label))
+
+
+class NPlusOneMiddleware:
+    """Per-request detection; mode is "log" or "raise" (see module docstring)."""
+
+    def __init__(self, app, mode: str = "log", threshold: int = 5):
+        install_hooks()
+        self.app = app
+        self.mode = mode
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        shapes = QueryShapes(self.threshold)
+        token = _current.set(shapes)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+
+        if shapes.offenders():
+            route = scope.get("route")
+            report = shapes.report(f"{scope['method']} {getattr(route, 'path', scope['path'])}")
+            if self.mode == "raise":
+                raise NPlusOneError(report)
+            logger.warning(f"[NPlusOne] {report}")
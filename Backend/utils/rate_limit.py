@@ -0,0 +1,57 @@
+"""
+Token-bucket rate limiter for outbound API calls.
+
+`rate` tokens per second refill a bucket of `burst` tokens; acquire() takes
+one, sleeping until it is available. pause() empties the bucket and holds
+every caller for a while — used when the remote side answers 429 with a
+Retry-After, or reports its own quota as spent.
+
+Reservations are made without awaiting, so the bucket needs no lock and can
+be shared by any number of tasks (and event loops, in scripts).
+"""
+import asyncio
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._tolerance = (self.burst - 1) * self._interval
+        self._next_at = 0.0          # theoretical arrival time of the next token
+        self._paused_until = 0.0
+        self.waits = 0
+        self.pauses = 0
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            next_at = max(self._next_at, now)
+            start = max(now, next_at - self._tolerance, self._paused_until)
+            self._next_at = max(next_at, start) + self._interval
+            if start > now:
+                self.waits += 1
+                await asyncio.sleep(start - now)
+            # A pause that began while we slept applies to us too
+            if self._paused_until <= time.monotonic():
+                return
+
+    def pause(self, seconds: float) -> bool:
+        """
+        Hold every caller for `seconds`, then resume at the normal rate from an
+        empty bucket. True if this started a pause rather than extending one.
+        """
+        now = time.monotonic()
+        until = now + max(0.0, seconds)
+        started = self._paused_until <= now
+        if until > self._paused_until:
+            self._paused_until = until
+            self._next_at = until + self._tolerance
+        if started:
+            self.pauses += 1
+        return started
+
+    @property
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
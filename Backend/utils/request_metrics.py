@@ -0,0 +1,187 @@
+"""
+Per-route request and SQL metrics in Prometheus text format.
+
+RequestMetricsMiddleware (pure ASGI, no body buffering) records for every
+request its latency, status and the SQL it ran; install_query_hooks() counts
+statements and cursor time on every engine through a context variable, so
+sync routes in the threadpool and async routes are attributed alike. Routes
+are labelled by their template ("/invoices/{invoice_id}"), never the raw
+path, to keep cardinality bounded. render() produces the /metrics body.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class _QueryStats:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+_current: contextvars.ContextVar[Optional[_QueryStats]] = contextvars.ContextVar("request_query_stats", default=None)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: dict[tuple, int] = {}          # (method, route, status) -> count
+        self.latency: dict[tuple, _Histogram] = {}    # (method, route)
+        self.statements: dict[tuple, _Histogram] = {}  # (method, route)
+        self.db_seconds: dict[tuple, float] = {}      # (method, route)
+        self.in_progress: dict[str, int] = {}         # method
+
+    def started(self, method: str):
+        with self._lock:
+            self.in_progress[method] = self.in_progress.get(method, 0) + 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float, query_stats: _QueryStats):
+        key = (method, route)
+        with self._lock:
+            self.in_progress[method] -= 1
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+            if key not in self.latency:
+                self.latency[key] = _Histogram(LATENCY_BUCKETS)
+                self.statements[key] = _Histogram(STATEMENT_BUCKETS)
+                self.db_seconds[key] = 0.0
+            self.latency[key].observe(seconds)
+            self.statements[key].observe(query_stats.statements)
+            self.db_seconds[key] += query_stats.seconds
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP http_requests_total Requests by method, route template and status code.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), n in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {n}')
+
+            lines += [
+                "# HELP http_requests_in_progress Requests currently being served.",
+                "# TYPE http_requests_in_progress gauge",
+            ]
+            for method, n in sorted(self.in_progress.items()):
+                lines.append(f'http_requests_in_progress{{method="{method}"}} {n}')
+
+            _render_histograms(lines, "http_request_duration_seconds",
+                               "Request latency by route template.", self.latency)
+            _render_histograms(lines, "http_request_db_statements",
+                               "SQL statements executed per request.", self.statements)
+
+            lines += [
+                "# HELP http_request_db_seconds_total Time spent in SQL cursor execution.",
+                "# TYPE http_request_db_seconds_total counter",
+            ]
+            for (method, route), seconds in sorted(self.db_seconds.items()):
+                lines.append(f'http_request_db_seconds_total{{method="{method}",route="{_escape(route)}"}} {seconds}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _render_histograms(lines: list, name: str, help_text: str, histograms: dict):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), h in sorted(histograms.items()):
+        labels = f'method="{method}",route="{_escape(route)}"'
+        cumulative = 0
+        for bound, n in zip(h.buckets, h.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+        lines.append(f"{name}_sum{{{labels}}} {h.sum}")
+        lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+
+registry = MetricsRegistry()
+
+
+# ── SQLAlchemy hooks ──────────────────────────────────────────────────────────
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("request_metrics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("request_metrics_start")
+    if stats is not None and starts:
+        stats.statements += 1
+        stats.seconds += time.perf_counter() - starts.pop()
+
+
+_hooks_installed = False
+
+
+def install_query_hooks():
+    """Listen on every Engine (sync and the sync side of async engines). Idempotent."""
+    global _hooks_installed
+    if not _hooks_installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _hooks_installed = True
+
+
+# ── ASGI middleware ───────────────────────────────────────────────────────────
+
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status_code = 500
+        stats = _QueryStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.started(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            registry.finished(
+                method, getattr(route, "path", None) or "unmatched", status_code,
+                time.perf_counter() - start, stats,
+            )
+            _current.reset(token)